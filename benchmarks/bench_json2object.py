@@ -0,0 +1,80 @@
+"""
+Compares json2object with a record type created per object (as it used to
+be), with memoized record types, and with lazy objects, on the product
+pages recorded in the test cassettes.
+
+    python -m benchmarks.bench_json2object
+"""
+import glob
+import json
+import os
+import timeit
+from collections import namedtuple
+
+import yaml
+
+from pyakeneo.utils import json2object
+
+CASSETTES = os.path.join(os.path.dirname(__file__), "..", "tests", "cassettes")
+
+
+def load_product_pages():
+    pages = set()
+    for path in glob.glob(os.path.join(CASSETTES, "*.yaml")):
+        with open(path) as f:
+            cassette = yaml.safe_load(f)
+        for interaction in cassette["interactions"]:
+            body = interaction["response"]["body"].get("string") or ""
+            uri = interaction["request"]["uri"]
+            if "/products" in uri and '"_embedded"' in body:
+                pages.add(body)
+    return sorted(pages)
+
+
+def _uncached_hook(data):
+    if "_links" in data:
+        data["links"] = data.pop("_links")
+    if "_embedded" in data:
+        data["embedded"] = data.pop("_embedded")
+    return namedtuple("X", data.keys())(*data.values())
+
+
+def uncached(page):
+    return json.loads(page, object_hook=_uncached_hook)
+
+
+def memoized(page):
+    return json2object(page)
+
+
+def lazy(page):
+    return json2object(page, lazy=True)
+
+
+def read_identifiers(result):
+    return [item.identifier for item in result.embedded.items]
+
+
+def main(number=20):
+    pages = load_product_pages()
+    size = sum(len(page) for page in pages)
+    print("{0} product pages, {1} KB".format(len(pages), size // 1024))
+    baseline = None
+    for decode in (uncached, memoized, lazy):
+        seconds = min(
+            timeit.repeat(
+                lambda: [read_identifiers(decode(page)) for page in pages],
+                number=number,
+                repeat=3,
+            )
+        ) / number
+        baseline = baseline or seconds
+        print(
+            "{0:<10} {1:8.2f} ms per pass  x{2:.1f}".format(
+                decode.__name__, seconds * 1000, baseline / seconds
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
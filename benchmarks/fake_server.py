@@ -0,0 +1,294 @@
+"""
+In-process fake Akeneo server for the benchmarks. It serves generated
+products, product models and media files, with a configurable latency, and
+optionally answers some requests with 503 (error_rate), 429 (throttle_rate)
+or 413 (bodies larger than max_body_size) responses. It accepts gzipped
+request bodies, and gzips its JSON responses with compress_responses.
+
+    with FakeAkeneo(products=10000, latency=0.005) as server:
+        client = server.client()
+"""
+import gzip
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from pyakeneo.client import Client
+
+API_PATH = "/api/rest/v1/"
+
+
+def make_product(index: int, values: int = 20) -> dict:
+    identifier = "sku-{0:08d}".format(index)
+    return {
+        "identifier": identifier,
+        "enabled": True,
+        "family": "family_{0}".format(index % 10),
+        "categories": ["category_{0}".format(index % 50), "master"],
+        "groups": [],
+        "parent": None,
+        "values": {
+            "attribute_{0}".format(i): [
+                {
+                    "locale": "en_US" if i % 2 else None,
+                    "scope": "ecommerce" if i % 3 else None,
+                    "data": "{0} value {1}".format(identifier, i),
+                }
+            ]
+            for i in range(values)
+        },
+        "created": "2024-01-01T00:00:00+00:00",
+        "updated": "2024-01-01T00:00:00+00:00",
+        "associations": {},
+    }
+
+
+def make_client(url: str, **kwargs) -> Client:
+    """Returns a client of the fake server at url"""
+    return Client(
+        url,
+        client_id="client",
+        secret="secret",
+        username="user",
+        password="password",
+        **kwargs
+    )
+
+
+class FakeAkeneo(object):
+    def __init__(
+        self,
+        products: int = 1000,
+        values: int = 20,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        max_body_size: int | None = None,
+        media_size: int = 1024 * 1024,
+        token_lifetime: int = 3600,
+        compress_responses: bool = False,
+        seed: int = 0,
+    ):
+        """
+        :param products: number of products served
+        :param values: number of values per product
+        :param latency: seconds waited before answering each request
+        :param error_rate: share of API requests answered with a 503
+        :param throttle_rate: share of API requests answered with a 429
+        :param max_body_size: bodies larger than that are answered with a 413
+        :param media_size: size of the downloaded media files, in bytes
+        :param compress_responses: gzip the JSON responses, when accepted
+        """
+        self.products = [make_product(i, values) for i in range(products)]
+        self.index = {p["identifier"]: i for i, p in enumerate(self.products)}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_body_size = max_body_size
+        self.media = bytes(random.Random(seed).getrandbits(8) for _ in range(1024))
+        self.media_size = media_size
+        self.token_lifetime = token_lifetime
+        self.compress_responses = compress_responses
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.token_requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return "http://{0}:{1}".format(host, port)
+
+    def start(self) -> "FakeAkeneo":
+        handler = type("Handler", (_Handler,), {"akeneo": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-akeneo", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def client(self, **kwargs) -> Client:
+        return make_client(self.url, **kwargs)
+
+    def draw_failure(self) -> int | None:
+        """Returns the status of an injected failure, if any"""
+        with self._lock:
+            self.requests += 1
+            draw = self.random.random()
+        if draw < self.throttle_rate:
+            return 429
+        if draw < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    akeneo: FakeAkeneo = None
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super(_Handler, self).setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return body
+
+    def _send(
+        self, status: int, body=b"", content_type="application/json", **headers
+    ):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode("utf-8")
+        if (
+            self.akeneo.compress_responses
+            and content_type != "application/octet-stream"
+            and "gzip" in self.headers.get("Accept-Encoding", "")
+        ):
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content_Encoding"] = "gzip"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        # headers and body are sent at once
+        self._headers_buffer.append(b"\r\n" + body)
+        self.flush_headers()
+
+    def _handle(self, method: str):
+        akeneo = self.akeneo
+        body = self._read_body()
+        if akeneo.latency:
+            time.sleep(akeneo.latency)
+
+        url = urlsplit(self.path)
+        if url.path == "/api/oauth/v1/token":
+            with akeneo._lock:
+                akeneo.token_requests += 1
+            return self._send(
+                200,
+                {
+                    "access_token": "token",
+                    "refresh_token": "refresh",
+                    "expires_in": akeneo.token_lifetime,
+                    "token_type": "bearer",
+                    "scope": None,
+                },
+            )
+
+        if not url.path.startswith(API_PATH):
+            return self._send(404, {"code": 404, "message": "Not found"})
+        if akeneo.max_body_size is not None and len(body) > akeneo.max_body_size:
+            return self._send(413, {"code": 413, "message": "Request too large"})
+        failure = akeneo.draw_failure()
+        if failure == 429:
+            return self._send(
+                429, {"code": 429, "message": "Too many requests"}, Retry_After="0"
+            )
+        if failure:
+            return self._send(failure, {"code": failure, "message": "Unavailable"})
+
+        path = url.path[len(API_PATH):].strip("/").split("/")
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if path[0] == "products":
+            if method == "GET" and len(path) == 1:
+                return self._list_products(params)
+            if method == "GET":
+                return self._get_product(path[1])
+            if method == "PATCH" and len(path) == 1:
+                return self._upsert_products(body)
+            if method == "PATCH":
+                return self._send(204)
+        if path[0] == "media-files" and method == "GET" and path[-1] == "download":
+            return self._download()
+        return self._send(404, {"code": 404, "message": "Not found"})
+
+    def _list_products(self, params: dict):
+        akeneo = self.akeneo
+        limit = min(int(params.get("limit", 10)), 100)
+        base = self.akeneo.url + API_PATH + "products"
+        if params.get("pagination_type") == "search_after":
+            after = params.get("search_after")
+            start = akeneo.index[after] + 1 if after else 0
+        else:
+            start = (int(params.get("page", 1)) - 1) * limit
+        items = akeneo.products[start : start + limit]
+        links = {
+            "self": {"href": base + "?" + urlencode(params)},
+            "first": {"href": base + "?" + urlencode(dict(params, page=1))},
+        }
+        if start + limit < len(akeneo.products):
+            if params.get("pagination_type") == "search_after":
+                following = dict(params, search_after=items[-1]["identifier"])
+            else:
+                following = dict(params, page=int(params.get("page", 1)) + 1)
+            links["next"] = {"href": base + "?" + urlencode(following)}
+        page = {"_links": links, "current_page": None, "_embedded": {"items": items}}
+        return self._send(200, page)
+
+    def _get_product(self, identifier: str):
+        if identifier not in self.akeneo.index:
+            return self._send(404, {"code": 404, "message": "Not found"})
+        return self._send(200, self.akeneo.products[self.akeneo.index[identifier]])
+
+    def _upsert_products(self, body: bytes):
+        lines = []
+        for number, line in enumerate(body.splitlines(), 1):
+            item = json.loads(line)
+            lines.append(
+                json.dumps(
+                    {
+                        "line": number,
+                        "identifier": item.get("identifier"),
+                        "status_code": 204,
+                    }
+                )
+            )
+        return self._send(
+            200,
+            "\n".join(lines).encode("utf-8"),
+            content_type="application/vnd.akeneo.collection+json",
+        )
+
+    def _download(self):
+        akeneo = self.akeneo
+        repeats, rest = divmod(akeneo.media_size, len(akeneo.media))
+        body = akeneo.media * repeats + akeneo.media[:rest]
+        return self._send(200, body, content_type="application/octet-stream")
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
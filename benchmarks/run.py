@@ -0,0 +1,217 @@
+"""
+Throughput benchmarks of the client against a local fake Akeneo server
+(see fake_server.py). Each scenario runs in its own process, and its server
+in another one, so that the peak RSS reported is the client's own. Reports
+items/s, requests/s, the p50/p99 latency of the requests and the peak RSS.
+
+    python -m benchmarks.run
+    python -m benchmarks.run list bulk_upsert --products 20000 --latency 0.005
+    python -m benchmarks.run list --throttle-rate 0.05 --json
+    python -m benchmarks.run bulk_upsert list --compress-requests --compress-responses
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+from pyakeneo.retry import RetryPolicy
+from benchmarks.fake_server import FakeAkeneo, make_client, make_product
+
+
+class Timings(object):
+    """Records the latency of every response of the sessions"""
+
+    def __init__(self, *sessions):
+        self.latencies = []
+        self._lock = threading.Lock()
+        for session in sessions:
+            session.hooks["response"].append(self._record)
+
+    def _record(self, response, *args, **kwargs):
+        with self._lock:
+            self.latencies.append(response.elapsed.total_seconds())
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+
+def scenario_list(client, options):
+    """Iterates over all the products, page by page"""
+    return sum(1 for _ in client.products.fetch_list({"limit": options.page_size}))
+
+
+def scenario_list_prefetch(client, options):
+    """Iterates over all the products, downloading 2 pages ahead"""
+    args = {"limit": options.page_size}
+    return sum(1 for _ in client.products.fetch_list(args, prefetch=2))
+
+
+def scenario_list_stream(client, options):
+    """Iterates over all the products, parsing pages while downloading them"""
+    args = {"limit": options.page_size}
+    return sum(1 for _ in client.products.fetch_list(args, stream=True))
+
+
+def scenario_get(client, options):
+    """Fetches products one by one, over a thread pool"""
+    codes = ["sku-{0:08d}".format(i) for i in range(min(options.products, 2000))]
+    results = client.products.fetch_items(codes, max_workers=options.workers)
+    return sum(1 for result in results if result.error is None)
+
+
+def scenario_bulk_upsert(client, options):
+    """Upserts products by batches of 100"""
+    items = (make_product(i, options.values) for i in range(options.products))
+    results = client.products.iter_update_create_list(
+        items, max_workers=options.workers
+    )
+    return sum(1 for _ in results)
+
+
+def scenario_media_download(client, options):
+    """Downloads media files into memory, one at a time"""
+    for i in range(options.media):
+        client.media_files.download("a/b/c/d/{0}.jpg".format(i), io.BytesIO())
+    return options.media
+
+
+def scenario_auth(client, options):
+    """Requests many tokens, to measure the authentication overhead"""
+    auth = client._session.auth
+    for _ in range(200):
+        auth._request_a_token()
+    return 200
+
+
+SCENARIOS = {
+    name[len("scenario_"):]: function
+    for name, function in sorted(globals().items())
+    if name.startswith("scenario_")
+}
+
+
+def serve(options, connection):
+    """Runs the fake server of the options until told to stop, sending its
+    url first and its request counts last"""
+    server = FakeAkeneo(
+        products=options.products,
+        values=options.values,
+        latency=options.latency,
+        error_rate=options.error_rate,
+        throttle_rate=options.throttle_rate,
+        max_body_size=options.max_body_size,
+        media_size=options.media_size,
+        compress_responses=options.compress_responses,
+    )
+    with server:
+        connection.send(server.url)
+        connection.recv()
+    connection.send((server.requests, server.token_requests))
+
+
+def run_scenario(name: str, options) -> dict:
+    connection, server_connection = multiprocessing.Pipe()
+    server = multiprocessing.get_context("spawn").Process(
+        target=serve, args=(options, server_connection), daemon=True
+    )
+    server.start()
+    try:
+        client = make_client(
+            connection.recv(),
+            pool_maxsize=options.workers,
+            retry_policy=RetryPolicy(backoff_factor=0.01, jitter=False),
+            compress_requests=options.compress_requests,
+        )
+        timings = Timings(client._session, client._session.auth.session)
+        started = time.perf_counter()
+        items = SCENARIOS[name](client, options)
+        elapsed = time.perf_counter() - started
+    finally:
+        connection.send("stop")
+    requests = sum(connection.recv())
+    server.join()
+    return {
+        "scenario": name,
+        "items": items,
+        "seconds": round(elapsed, 3),
+        "items_per_s": round(items / elapsed, 1),
+        "requests": requests,
+        "requests_per_s": round(requests / elapsed, 1),
+        "p50_ms": round(timings.percentile(0.50) * 1000, 2),
+        "p99_ms": round(timings.percentile(0.99) * 1000, 2),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "scenarios", nargs="*", help="among {0}".format(", ".join(SCENARIOS))
+    )
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--values", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--media", type=int, default=50)
+    parser.add_argument("--media-size", type=int, default=1024 * 1024)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--max-body-size", type=int, default=None)
+    parser.add_argument("--compress-requests", action="store_true")
+    parser.add_argument("--compress-responses", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    parser.add_argument("--in-process", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+    for name in options.scenarios:
+        if name not in SCENARIOS:
+            parser.error("unknown scenario {0}".format(name))
+    return options
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    options = parse_args(argv)
+    if options.in_process:
+        print(json.dumps(run_scenario(options.scenarios[0], options)))
+        return
+
+    forwarded = [arg for arg in argv if arg not in SCENARIOS]
+    columns = [
+        "scenario",
+        "items_per_s",
+        "requests_per_s",
+        "p50_ms",
+        "p99_ms",
+        "peak_rss_mb",
+    ]
+    if not options.json:
+        print("".join("{0:>16}".format(column) for column in columns))
+    for name in options.scenarios or list(SCENARIOS):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", name, "--in-process"]
+            + forwarded,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        report = json.loads(output)
+        if options.json:
+            print(json.dumps(report))
+        else:
+            print("".join("{0:>16}".format(report[column]) for column in columns))
+
+
+if __name__ == "__main__":
+    main()
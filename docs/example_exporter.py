@@ -1,10 +1,8 @@
 # -*- coding: utf-8 -*-
-"""Will export the data from a PIM and pickle it to files."""
+"""Will export the data from a PIM to NDJSON files, and log the throughput of
+every resource."""
 
-# Reduce the amount of logs:
-import logging
 import os
-import pickle
 import structlog
 
 logger = structlog.get_logger()
@@ -12,11 +10,13 @@ logger = structlog.get_logger()
 # import Akeneo API Client
 try:
     from pyakeneo.client import Client
+    from pyakeneo.export import Exporter
 except ModuleNotFoundError as e:
     import sys
 
     sys.path.append("..")
     from pyakeneo.client import Client
+    from pyakeneo.export import Exporter
 
 # Import your API keys from environment variables
 # which may be inflated from a .env file for example
@@ -41,78 +41,22 @@ AKENEO_PASSWORD = os.environ.get("AKENEO_PASSWORD")
 AKENEO_BASE_URL = os.environ.get("AKENEO_BASE_URL")
 
 
-class Exporter:
-    @staticmethod
-    def extract_all_resources(client, directory, request_limit=100, chunk_size=10000):
-        for name, pool in client.resources.items():
-            Exporter.extract_resource(
-                pool,
-                os.path.join(directory, name),
-                request_limit=request_limit,
-                chunk_size=chunk_size,
-            )
-
-    @staticmethod
-    def extract_resource(pool, directory, request_limit=100, chunk_size=10000):
-        """Extract all items offered by the given endpoint. Saves them in
-        files in the given directory, in buckets."""
-
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-
-        try:
-            result = pool.fetch_list({"limit": request_limit})
-        except Exception as e:
-            logger.warning(
-                """Skipping {name} :
-                Does the version of the server support this endpoint?
-                {error}""".format(
-                    name=pool.get_url(), error=e
-                )
-            )
-        else:
-
-            def save(directory, count, chunk, link):
-                """Save a chunk to a file, as well as the next link of the last page."""
-                if link:  # save the link, if there is a next page
-                    link_filename = os.path.join(
-                        directory, "{0:07d}_next_link.txt".format(count)
-                    )
-                    with open(link_filename, "w") as of:
-                        of.write(link)
-
-                chunk_filename = os.path.join(
-                    directory, "{0:07d}_chunk.p".format(count)
-                )
-                logger.info("Saving to {0}".format(chunk_filename))
-                with open(chunk_filename, "wb") as of:
-                    pickle.dump(chunk, of)
-
-                return chunk_filename
-
-            try:
-                count = 0
-                chunk = []
-                chunk_filenames = []  # name of chunks saved to files
-                logger.info("Fetching from {0}".format(pool.get_url()))
-
-                go_on = True
-                while go_on:
-                    chunk += result.get_page_items()
-                    count += len(result.get_page_items())
-                    go_on = result.fetch_next_page()
-                    if (chunk and not go_on) or (len(chunk) >= chunk_size):
-                        chunk_filenames.append(
-                            save(directory, count, chunk, result.get_next_link())
-                        )
-                        chunk = []
-            except Exception as e:
-                logger.error(
-                    "Error while fetching {name}...:\n{next_link}\n{error}\n".format(
-                        name=pool.get_url(), next_link=result.get_next_link(), error=e
-                    )
-                )
-                raise e
+def export(client, directory, max_workers=4, request_limit=100):
+    """Exports all the listable resources in the given directory. Running it
+    again resumes an interrupted export."""
+    exporter = Exporter(
+        client, directory, max_workers=max_workers, page_size=request_limit
+    )
+    report = exporter.run()
+    for name, stats in sorted(report.by_resource().items()):
+        logger.info("exported", resource=name, **stats)
+    for part in report.failed:
+        # eg the version of the server does not support this endpoint
+        logger.warning(
+            "export failed", resource=part.resource, part=part.part, error=part.error
+        )
+    logger.info("export done", items=report.items, seconds=report.seconds)
+    return report
 
 
 if __name__ == "__main__":
@@ -123,4 +67,4 @@ if __name__ == "__main__":
         AKENEO_USERNAME,
         AKENEO_PASSWORD,
     )
-    Exporter.extract_all_resources(client, "extract")
+    export(client, "extract")
@@ -0,0 +1,188 @@
+import gzip
+from time import monotonic, sleep
+
+from requests.adapters import HTTPAdapter
+
+from pyakeneo.instrumentation import Instrumentation, RequestInfo
+from pyakeneo.retry import RateLimiter, RetryPolicy
+
+
+def _body_size(body) -> int | None:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    if hasattr(body, "__len__"):
+        return len(body)
+    return None
+
+
+def _content_length(response) -> int | None:
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _wire_size(response) -> int | None:
+    """Returns the bytes of the body received, before decompression"""
+    try:
+        # bytes pulled from the connection by urllib3
+        return response.raw.tell()
+    except AttributeError:
+        return _content_length(response)
+
+
+class AkeneoAdapter(HTTPAdapter):
+    """
+    Transport adapter of the sessions created by Client.
+    On top of connection pooling, it waits for the rate limiter before every
+    request, retries requests according to the retry policy, compresses the
+    request bodies if asked to, and reports requests to the instrumentation.
+    """
+
+    # Bodies smaller than that are not worth compressing
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_LEVEL = 6
+    COMPRESSED_METHODS = ("POST", "PATCH", "PUT")
+
+    def __init__(
+        self,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+        auth=None,
+        instrumentation: Instrumentation | None = None,
+        compress_requests: bool = False,
+        accept_encoding: str | None = None,
+        **kwargs
+    ):
+        """
+        :param auth: if given, it is applied again to a request before it is
+            retried, so that a retry after a long wait uses a valid token
+        :param instrumentation: Instrumentation whose hooks are called for
+            every request
+        :param compress_requests: gzip the bodies of POST, PATCH and PUT
+            requests of at least COMPRESS_MIN_SIZE bytes. Servers must accept
+            them: once a compressed request is answered with a 415, it is
+            sent again uncompressed, and compression is turned off.
+        :param accept_encoding: Accept-Encoding header of the requests, eg
+            "gzip", or "identity" for uncompressed responses. By default,
+            the one of requests is kept.
+        """
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.auth = auth
+        self.instrumentation = instrumentation
+        self.compress_requests = compress_requests
+        self.accept_encoding = accept_encoding
+        super(AkeneoAdapter, self).__init__(**kwargs)
+
+    @staticmethod
+    def _can_resend(request):
+        return request.body is None or isinstance(request.body, (str, bytes))
+
+    def _compress(self, request):
+        """Returns a copy of request with a gzipped body, or request itself
+        when it is not worth (or not possible) compressing"""
+        body = request.body
+        if (
+            not self.compress_requests
+            or request.method not in self.COMPRESSED_METHODS
+            or not isinstance(body, (str, bytes))
+            or len(body) < self.COMPRESS_MIN_SIZE
+            or "Content-Encoding" in request.headers
+        ):
+            return request
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        compressed = request.copy()
+        compressed.body = gzip.compress(body, compresslevel=self.COMPRESS_LEVEL)
+        compressed.headers["Content-Encoding"] = "gzip"
+        compressed.headers["Content-Length"] = str(len(compressed.body))
+        return compressed
+
+    def send(self, request, **kwargs):
+        if self.accept_encoding is not None:
+            request.headers["Accept-Encoding"] = self.accept_encoding
+        if self.instrumentation is None:
+            return self._send_compressed(request, None, **kwargs)
+
+        info = RequestInfo(request.method, request.url, _body_size(request.body))
+        info.request_decoded_bytes = info.request_bytes
+        self.instrumentation.before_request(info)
+        started = monotonic()
+        try:
+            response = self._send_compressed(request, info, **kwargs)
+            # the error of a retried attempt, if any, is not this one's
+            info.status, info.error = response.status_code, None
+            info.latency = monotonic() - started
+            if kwargs.get("stream"):
+                info.response_bytes = _content_length(response)
+            else:
+                # read now rather than by the session, to measure it
+                info.response_decoded_bytes = len(response.content)
+                info.response_bytes = _wire_size(response)
+            return response
+        except Exception as e:
+            info.status = None
+            info.error = e
+            raise
+        finally:
+            if info.latency is None:
+                info.latency = monotonic() - started
+            self.instrumentation.after_request(info)
+
+    def _send_compressed(self, request, info: RequestInfo | None, **kwargs):
+        compressed = self._compress(request)
+        if info is not None:
+            info.request_bytes = _body_size(compressed.body)
+        response = self._send(compressed, info, **kwargs)
+        if compressed is not request and response.status_code == 415:
+            # Unsupported Media Type: the server does not accept compressed
+            # bodies
+            self.compress_requests = False
+            response.close()
+            if info is not None:
+                info.request_bytes = info.request_decoded_bytes
+            response = self._send(request, info, **kwargs)
+        return response
+
+    def _send(self, request, info: RequestInfo | None, **kwargs):
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                response = super(AkeneoAdapter, self).send(request, **kwargs)
+            except Exception as e:
+                if not (
+                    self.retry_policy
+                    and self._can_resend(request)
+                    and self.retry_policy.should_retry_error(request.method, e, attempt)
+                ):
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+                if info is not None:
+                    info.status, info.error = None, e
+                    self.instrumentation.on_retry(info, delay)
+            else:
+                if not (
+                    self.retry_policy
+                    and self._can_resend(request)
+                    and self.retry_policy.should_retry_response(
+                        request.method, response, attempt
+                    )
+                ):
+                    return response
+                delay = self.retry_policy.backoff(attempt, response)
+                response.close()
+                if info is not None:
+                    info.status, info.error = response.status_code, None
+                    self.instrumentation.on_retry(info, delay)
+
+            sleep(delay)
+            attempt += 1
+            if info is not None:
+                info.retries = attempt
+            if self.auth:
+                request = self.auth(request)
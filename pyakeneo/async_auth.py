@@ -0,0 +1,52 @@
+import asyncio
+
+try:
+    import httpx
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "The asyncio client requires httpx. Install it with: pip install pyakeneo[async]"
+    ) from e
+
+from pyakeneo.auth import Auth
+
+
+class AsyncAuth(httpx.Auth):
+    """
+    httpx authentication flow relying on the same tokens as Auth.
+    Token requests are sent through the client being authenticated, and a
+    lock makes sure only one of them is in flight at a time.
+    """
+
+    requires_response_body = True
+
+    def __init__(self, auth: Auth):
+        self._auth = auth
+        self._lock = None
+
+    @property
+    def auth(self):
+        return self._auth
+
+    def _token_request(self, grant_type):
+        url, headers, data = self._auth._token_request(grant_type)
+        return httpx.Request("POST", url, headers=headers, content=data)
+
+    def _store_token(self, response):
+        response.raise_for_status()
+        self._auth._store_token(response.content)
+
+    async def async_auth_flow(self, request):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if not self._auth._token or not self._auth._refresh_token:
+                response = yield self._token_request("password")
+                self._store_token(response)
+
+            if self._auth._should_refresh_token():
+                response = yield self._token_request("refresh_token")
+                self._store_token(response)
+
+        request.headers["Authorization"] = self._auth.authorization
+        yield request
@@ -0,0 +1,188 @@
+try:
+    import httpx
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "The asyncio client requires httpx. Install it with: pip install pyakeneo[async]"
+    ) from e
+
+from pyakeneo.async_auth import AsyncAuth
+from pyakeneo.async_resources import (AsyncAssetFamilyPool,
+                                      AsyncAssociationTypesPool,
+                                      AsyncAttributeGroupsPool,
+                                      AsyncAttributesPool, AsyncCategoriesPool,
+                                      AsyncChannelsPool, AsyncCurrenciesPool,
+                                      AsyncFamiliesPool, AsyncLocalesPool,
+                                      AsyncMeasureFamiliesPool,
+                                      AsyncMediaFilesPool,
+                                      AsyncProductModelsPool,
+                                      AsyncProductsPool,
+                                      AsyncPublishedProductsPool,
+                                      AsyncReferenceEntityPool)
+from pyakeneo.auth import Auth
+from pyakeneo.codec import JSONCodec, get_codec
+from pyakeneo.utils import urljoin
+
+
+class AsyncClient:
+    """
+    asyncio counterpart of Client: every pool method performing a request is
+    a coroutine, and fetch_list returns an AsyncResult to be consumed with
+    `async for`. Requests are sent with an httpx.AsyncClient, so that many of
+    them can be in flight on a single event loop.
+
+    Use it as an async context manager, or call aclose() once done.
+    """
+
+    BASIC_API_PATH = "/api/rest/v1/"
+
+    def __init__(
+            self,
+            base_url: str,
+            client_id: str = None,
+            secret: str = None,
+            username: str = None,
+            password: str = None,
+            session: httpx.AsyncClient = None,
+            max_connections: int = 100,
+            json_codec: JSONCodec | str = None,
+    ):
+        if not session and not (client_id and secret and username and password):
+            # No credentials provided neither via client_id+secret+username+password nor via session
+            raise ValueError(
+                "Expect credentials via "
+                + "1) as client_id+secret+username+password, or "
+                + "2) as session having an authentication."
+            )
+
+        self._codec = get_codec(json_codec)
+
+        if not session:
+            session = httpx.AsyncClient(
+                auth=self._make_auth(base_url, client_id, secret, username, password),
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            )
+
+        self._init(base_url, session)
+
+    def _make_auth(self, base_url, client_id, secret, username, password) -> AsyncAuth:
+        return AsyncAuth(
+            Auth(base_url, client_id, secret, username, password, codec=self._codec)
+        )
+
+    def _init(self, base_url, session):
+        self._base_url = base_url
+        self._session = session
+        self._session.headers.update({"Content-Type": "application/json"})
+        self._resources = {
+            "association_types": self._make_pool(
+                AsyncAssociationTypesPool, "association-types/"
+            ),
+            "attributes": self._make_pool(AsyncAttributesPool, "attributes/"),
+            "attribute_groups": self._make_pool(
+                AsyncAttributeGroupsPool, "attribute-groups/"
+            ),
+            "categories": self._make_pool(AsyncCategoriesPool, "categories/"),
+            "channels": self._make_pool(AsyncChannelsPool, "channels/"),
+            "currencies": self._make_pool(AsyncCurrenciesPool, "currencies/"),
+            "families": self._make_pool(AsyncFamiliesPool, "families/"),
+            "locales": self._make_pool(AsyncLocalesPool, "locales/"),
+            "measure_families": self._make_pool(
+                AsyncMeasureFamiliesPool, "measure-families/"
+            ),
+            "media_files": self._make_pool(AsyncMediaFilesPool, "media-files/"),
+            "products": self._make_pool(AsyncProductsPool, "products/"),
+            "product_models": self._make_pool(
+                AsyncProductModelsPool, "product-models/"
+            ),
+            "published_products": self._make_pool(
+                AsyncPublishedProductsPool, "published-products/"
+            ),
+            "asset_families": self._make_pool(AsyncAssetFamilyPool, "asset-families/"),
+            "reference_entities": self._make_pool(
+                AsyncReferenceEntityPool, "reference-entities/"
+            ),
+        }
+
+    def _make_pool(self, pool_class, path):
+        return pool_class(
+            urljoin(self._base_url, self.BASIC_API_PATH, path),
+            self._session,
+            codec=self._codec,
+        )
+
+    async def aclose(self):
+        await self._session.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    @property
+    def resources(self):
+        """Return all resources as a list of Resources"""
+        return self._resources
+
+    @property
+    def association_types(self):
+        return self._resources["association_types"]
+
+    @property
+    def attributes(self):
+        return self._resources["attributes"]
+
+    @property
+    def attribute_groups(self):
+        return self._resources["attribute_groups"]
+
+    @property
+    def categories(self):
+        return self._resources["categories"]
+
+    @property
+    def channels(self):
+        return self._resources["channels"]
+
+    @property
+    def currencies(self):
+        return self._resources["currencies"]
+
+    @property
+    def families(self):
+        return self._resources["families"]
+
+    @property
+    def locales(self):
+        return self._resources["locales"]
+
+    @property
+    def measure_families(self):
+        return self._resources["measure_families"]
+
+    @property
+    def media_files(self):
+        return self._resources["media_files"]
+
+    @property
+    def products(self):
+        return self._resources["products"]
+
+    @property
+    def product_models(self):
+        return self._resources["product_models"]
+
+    @property
+    def published_products(self):
+        return self._resources["published_products"]
+
+    @property
+    def asset_families(self):
+        return self._resources["asset_families"]
+
+    @property
+    def reference_entities(self):
+        return self._resources["reference_entities"]
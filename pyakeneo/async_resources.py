@@ -0,0 +1,431 @@
+import asyncio
+import math
+
+from typing import Any
+from pyakeneo import interfaces
+from pyakeneo.async_result import AsyncResult
+from pyakeneo.codec import JSONCodec, get_codec
+from pyakeneo.resources import (
+    CodeBasedResource,
+    EnterpriseEditionResource,
+    IdentifierBasedResource,
+    UpdatableListResource,
+)
+from pyakeneo.utils import urljoin
+from pyakeneo.utils import serialize_structured_params
+
+
+class AsyncCreatableResource(interfaces.CreatableResourceInterface):
+    async def create_item(self, item):
+        url = self._endpoint
+        r = await self._session.post(url, content=self._codec.dumps(item))
+
+        r.raise_for_status()
+
+
+class AsyncListableResource(interfaces.ListableResourceInterface):
+    async def fetch_list(self, args=None):
+        """Send a request with search, etc.
+        Returns an asynchronous iterable list (AsyncResult)"""
+        if args:
+            args = serialize_structured_params(params=args)
+
+        url = self._endpoint
+        r = await self._session.get(url, params=args)
+        r.raise_for_status()
+
+        return AsyncResult.from_json_text(
+            self._session, json_text=r.content, codec=self._codec
+        )
+
+
+class AsyncSearchAfterListableResource(AsyncListableResource):
+    async def fetch_list(self, args=None):
+        """Send a request with search, etc.
+        Returns an asynchronous iterable list (AsyncResult)"""
+        params = args
+        if not params:
+            params = {"pagination_type": "search_after"}
+        elif "pagination_type" not in params:
+            params["pagination_type"] = "search_after"
+
+        return await super(AsyncSearchAfterListableResource, self).fetch_list(params)
+
+
+class AsyncGettableResource(interfaces.GettableResourceInterface):
+    async def fetch_item(self, code_or_item, args: dict[str, Any] | None = None):
+        """Returns a unique item object. code_or_item should be the code
+        of the desired item, or an item with the proper code."""
+        code = code_or_item
+        if not isinstance(code_or_item, str):
+            # if code_or_item is item, then fetch the code
+            code = self.get_code(code_or_item)
+
+        if args:
+            args = serialize_structured_params(params=args)
+
+        url = urljoin(self._endpoint, code)
+        r = await self._session.get(url, params=args)
+        r.raise_for_status()
+
+        return self._codec.loads(r.content)  # returns item as a dict
+
+
+class AsyncDeletableResource(interfaces.DeletableResourceInterface):
+    async def delete_item(self, code_or_item):
+        """code_or_item should be the code
+        of the desired item, or an item with the proper code."""
+        code = code_or_item
+        if not isinstance(code_or_item, str):
+            # if code_or_item is item, then fetch the code
+            code = self.get_code(code_or_item)
+        url = urljoin(self._endpoint, code)
+        r = await self._session.delete(url)
+
+        r.raise_for_status()
+
+
+class AsyncUpdatableResource(interfaces.UpdatableResourceInterface):
+    async def update_create_item(self, item_values, code=None):
+        if not code:
+            code = self.get_code(item_values)
+
+        url = urljoin(self._endpoint, code)
+        r = await self._session.patch(url, content=self._codec.dumps(item_values))
+        r.raise_for_status()
+
+        return r.headers.get("Location")
+
+
+class AsyncUpdatableListResource(interfaces.UpdatableResourceInterface):
+    MAX_ITEMS_PER_REQUEST = UpdatableListResource.MAX_ITEMS_PER_REQUEST
+    MAX_LINE_SIZE = UpdatableListResource.MAX_LINE_SIZE
+    MAX_REQUEST_SIZE = UpdatableListResource.MAX_REQUEST_SIZE
+    COLLECTION_CONTENT_TYPE = UpdatableListResource.COLLECTION_CONTENT_TYPE
+
+    batch_encoder = UpdatableListResource.batch_encoder
+
+    async def update_create_list(self, items, code=None, max_workers: int = 4):
+        """Creates or updates the given items, by chunks of
+        MAX_ITEMS_PER_REQUEST, up to max_workers chunks at once. Returns the
+        list of statuses returned by the server, in the order of the items.
+        Items longer than MAX_LINE_SIZE raise an ItemTooLargeError before
+        any chunk is sent."""
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def patch(lines):
+            async with semaphore:
+                return await self._patch_lines(lines)
+
+        chunks = list(self.batch_encoder().batches(items))
+        results = await asyncio.gather(*[patch(lines) for lines in chunks])
+        return [status for statuses in results for status in statuses]
+
+    async def _patch_lines(self, lines):
+        r = await self._session.patch(
+            self._endpoint,
+            content=b"".join(lines),
+            headers={"Content-type": self.COLLECTION_CONTENT_TYPE},
+        )
+
+        if r.status_code == 413 and len(lines) > 1:
+            # Request Entity Too Large: split the chunk in two
+            half = math.ceil(len(lines) / 2)
+            return await self._patch_lines(lines[:half]) + await self._patch_lines(
+                lines[half:]
+            )
+
+        r.raise_for_status()
+
+        return [self._codec.loads(line) for line in r.content.split(b"\n") if line]
+
+
+class AsyncResourcePool:
+    def __init__(self, endpoint, session, codec: JSONCodec | None = None):
+        """Initialize the AsyncResourcePool to the given endpoint. Eg: products
+        session is expected to be an httpx.AsyncClient"""
+        self._endpoint = endpoint
+        self._session = session
+        self._codec = get_codec(codec)
+
+    def get_url(self):
+        return self._endpoint
+
+    def _make_sub_pool(self, pool_class, *path):
+        return pool_class(
+            urljoin(self._endpoint, *path), self._session, codec=self._codec
+        )
+
+
+class AsyncProductsPool(
+    AsyncResourcePool,
+    IdentifierBasedResource,
+    AsyncCreatableResource,
+    AsyncDeletableResource,
+    AsyncGettableResource,
+    AsyncSearchAfterListableResource,
+    AsyncUpdatableResource,
+    AsyncUpdatableListResource,
+):
+    """https://api.akeneo.com/api-reference.html#Products"""
+
+    pass
+
+
+class AsyncProductModelsPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncCreatableResource,
+    AsyncGettableResource,
+    AsyncSearchAfterListableResource,
+    AsyncUpdatableResource,
+    AsyncUpdatableListResource,
+):
+    """https://api.akeneo.com/api-reference.html#Productmodel"""
+
+    pass
+
+
+class AsyncPublishedProductsPool(
+    AsyncResourcePool,
+    IdentifierBasedResource,
+    AsyncGettableResource,
+    AsyncSearchAfterListableResource,
+    EnterpriseEditionResource,
+):
+    """https://api.akeneo.com/api-reference.html#Publishedproduct"""
+
+    pass
+
+
+class AsyncCategoriesPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncCreatableResource,
+    AsyncGettableResource,
+    AsyncListableResource,
+    AsyncUpdatableResource,
+    AsyncUpdatableListResource,
+):
+    """https://api.akeneo.com/api-reference.html#Category"""
+
+    pass
+
+
+class AsyncFamilyVariantsPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncCreatableResource,
+    AsyncGettableResource,
+    AsyncListableResource,
+    AsyncUpdatableListResource,
+):
+    """https://api.akeneo.com/api-reference.html#Familyvariant"""
+
+    pass
+
+
+class AsyncFamiliesPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncCreatableResource,
+    AsyncDeletableResource,
+    AsyncGettableResource,
+    AsyncListableResource,
+    AsyncUpdatableResource,
+    AsyncUpdatableListResource,
+):
+    """https://api.akeneo.com/api-reference.html#Family"""
+
+    def variants(self, code):
+        return self._make_sub_pool(AsyncFamilyVariantsPool, code, "variants/")
+
+
+class AsyncAttributeOptionsPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncCreatableResource,
+    AsyncGettableResource,
+    AsyncListableResource,
+    AsyncUpdatableResource,
+    AsyncUpdatableListResource,
+):
+    """https://api.akeneo.com/api-reference.html#Attributeoptions"""
+
+    pass
+
+
+class AsyncAttributesPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncCreatableResource,
+    AsyncGettableResource,
+    AsyncListableResource,
+    AsyncUpdatableResource,
+    AsyncUpdatableListResource,
+):
+    """https://api.akeneo.com/api-reference.html#Attributes"""
+
+    def options(self, code):
+        return self._make_sub_pool(AsyncAttributeOptionsPool, code, "options/")
+
+
+class AsyncAttributeGroupsPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncListableResource,
+    AsyncCreatableResource,
+    AsyncUpdatableListResource,
+    AsyncGettableResource,
+    AsyncUpdatableResource,
+):
+    """https://api.akeneo.com/api-reference.html#Attributegroups"""
+
+    pass
+
+
+class AsyncMediaFilesPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncListableResource,
+    AsyncCreatableResource,
+    AsyncGettableResource,
+):
+    """https://api.akeneo.com/api-reference.html#Mediafiles"""
+
+    pass
+
+
+class AsyncLocalesPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncListableResource,
+    AsyncGettableResource,
+):
+    """https://api.akeneo.com/api-reference.html#Locales"""
+
+    pass
+
+
+class AsyncChannelsPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncListableResource,
+    AsyncUpdatableListResource,
+    AsyncGettableResource,
+    AsyncUpdatableResource,
+):
+    """https://api.akeneo.com/api-reference.html#Channels"""
+
+    pass
+
+
+class AsyncCurrenciesPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncListableResource,
+    AsyncCreatableResource,
+):
+    """https://api.akeneo.com/api-reference.html#Currencies"""
+
+    pass
+
+
+class AsyncMeasureFamiliesPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncListableResource,
+    AsyncGettableResource,
+):
+    """https://api.akeneo.com/api-reference.html#Measurefamilies"""
+
+    pass
+
+
+class AsyncAssociationTypesPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncListableResource,
+    AsyncCreatableResource,
+    AsyncUpdatableListResource,
+    AsyncGettableResource,
+    AsyncUpdatableResource,
+):
+    """https://api.akeneo.com/api-reference.html#Associationtypes"""
+
+    pass
+
+
+class AsyncAssetsPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncGettableResource,
+    AsyncListableResource,
+    AsyncUpdatableResource,
+    AsyncUpdatableListResource,
+    AsyncDeletableResource,
+):
+    pass
+
+
+class AsyncAssetFamilyPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncGettableResource,
+    AsyncListableResource,
+    AsyncUpdatableResource,
+):
+    def assets(self, code):
+        return self._make_sub_pool(AsyncAssetsPool, code, "assets/")
+
+
+class AsyncReferenceEntityRecordPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncGettableResource,
+    AsyncListableResource,
+    AsyncUpdatableResource,
+    AsyncUpdatableListResource,
+):
+    pass
+
+
+class AsyncReferenceEntityAttributeOptionsPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncGettableResource,
+    AsyncListableResource,
+    AsyncUpdatableResource,
+):
+    pass
+
+
+class AsyncReferenceEntityAttributePool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncGettableResource,
+    AsyncListableResource,
+    AsyncUpdatableResource,
+):
+    def options(self, code):
+        return self._make_sub_pool(
+            AsyncReferenceEntityAttributeOptionsPool, code, "options/"
+        )
+
+
+class AsyncReferenceEntityPool(
+    AsyncResourcePool,
+    CodeBasedResource,
+    AsyncGettableResource,
+    AsyncListableResource,
+    AsyncUpdatableResource,
+):
+    def records(self, entity_code):
+        return self._make_sub_pool(
+            AsyncReferenceEntityRecordPool, entity_code, "records/"
+        )
+
+    def attributes(self, entity_code):
+        return self._make_sub_pool(
+            AsyncReferenceEntityAttributePool, entity_code, "attributes/"
+        )
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from pyakeneo.codec import JSONCodec, get_codec
+from pyakeneo.result import Result
+
+
+class AsyncResult(object):
+    """
+    Asynchronous counterpart of Result, to be iterated with `async for`.
+    Search results are paginated: https://api.akeneo.com/documentation/pagination.html
+
+    The next page will be loaded once the user iterated over the whole current page.
+    The content of the new page will replace the content of the previous page.
+    """
+
+    def __init__(
+        self,
+        session,
+        *,
+        items: list | dict,
+        count: int,
+        link_first: str,
+        link_next: str,
+        link_self: str,
+        codec: JSONCodec | None = None,
+    ):
+        self._session = session
+        self._codec = get_codec(codec)
+        self._items = items
+        self._count = count
+        self._link_next = link_next
+        self._link_self = link_self
+        self._link_first = link_first
+
+        self._page_iterator = iter(self._items)
+        self._reached_the_end = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = next(self._page_iterator, StopAsyncIteration)
+        while item is StopAsyncIteration and await self.fetch_next_page():
+            item = next(self._page_iterator, StopAsyncIteration)
+        if item is StopAsyncIteration:
+            raise StopAsyncIteration
+        return item
+
+    def get_page_items(self):
+        return self._items
+
+    async def fetch_next_page(self):
+        """Return True if a next page exists. Returns False otherwise.
+        Throws if the next page could not be fetched."""
+        next_page = None
+        if self._link_next:
+            response = await self._session.get(self._link_next)
+            response.raise_for_status()
+            next_page = Result.parse_page(self._codec.loads(response.content))
+
+        if next_page is not None:
+            self._items = next_page["items"]
+            self._count = next_page["count"]
+            self._link_next = next_page["link_next"]
+            self._link_self = next_page["link_self"]
+            self._link_first = next_page["link_first"]
+
+            self._page_iterator = iter(self._items)
+            self._reached_the_end = False
+        else:
+            self._reached_the_end = True
+        return not self._reached_the_end
+
+    def get_count(self):
+        return self._count
+
+    def get_next_link(self):
+        return self._link_next
+
+    def get_self_link(self):
+        return self._link_self
+
+    def get_first_link(self):
+        return self._link_first
+
+    @classmethod
+    def parse_result(cls, session, json_data: dict | list, codec=None):
+        if Result.is_paginated(json_data):
+            page = Result.parse_page(json_data)
+        else:
+            page = Result.parse_non_paginated(json_data)
+        return cls(session, codec=codec, **page)
+
+    @classmethod
+    def from_json_text(
+        cls, session, json_text: str | bytes, codec: JSONCodec | None = None
+    ) -> "AsyncResult":
+        json_data = get_codec(codec).loads(json_text)
+        return cls.parse_result(session, json_data, codec=codec)
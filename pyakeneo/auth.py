@@ -1,20 +1,50 @@
 import base64
+import contextlib
+import hashlib
 import json
-from time import time
+import threading
+from time import monotonic, time
 
 import requests
+import structlog
 from requests.auth import AuthBase
 
+from pyakeneo.codec import get_codec
 from pyakeneo.utils import urljoin
 
+logger = structlog.get_logger("pyakeneo")
+
 
 class Auth(AuthBase):
     TOKEN_PATH = "api/oauth/v1/token"
     TOKEN_EXPIRY_SECURITY = 60 * 2
+    TOKEN_BACKGROUND_REFRESH = 60 * 5
+    TOKEN_BACKGROUND_RETRY = 30
 
-    def __init__(self, base_url, client_id, secret, username, password):
+    def __init__(
+        self,
+        base_url,
+        client_id,
+        secret,
+        username,
+        password,
+        background_refresh=True,
+        token_store=None,
+        codec=None,
+        instrumentation=None,
+    ):
         """
         :param base_url: eg http://localhost:8088/
+        :param token_store: a pyakeneo.token_store.TokenStore used to share
+            tokens with other instances, processes or runs.
+        :param codec: JSONCodec (or its name) decoding the token responses
+        :param instrumentation: Instrumentation told about every token request
+        :param background_refresh: refresh the token on a background thread
+            once less than TOKEN_BACKGROUND_REFRESH seconds are left (or half
+            of its lifetime), so that requests don't wait for the token
+            endpoint before TOKEN_EXPIRY_SECURITY is reached. A failed
+            background refresh is retried TOKEN_BACKGROUND_RETRY seconds
+            later at the earliest.
         """
         self._base_url = base_url
         self._client_id = client_id
@@ -24,7 +54,18 @@ class Auth(AuthBase):
         self._token = None
         self._refresh_token = None
         self._expiry_date = None
+        self._expires_in = None
         self._session = requests.Session()
+        self._background_refresh = background_refresh
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._background_failed_at = None
+        self._token_store = token_store
+        self._codec = get_codec(codec)
+        self._instrumentation = instrumentation
+        self._token_store_key = hashlib.sha256(
+            "{0}|{1}|{2}".format(base_url, client_id, username).encode("utf-8")
+        ).hexdigest()
 
     @property
     def authorization(self):
@@ -38,8 +79,8 @@ class Auth(AuthBase):
     def session(self, session):
         self._session = session
 
-    def _request_a_token(self, grant_type="password"):
-        """Requests a token. Throws in case of error"""
+    def _token_request(self, grant_type="password"):
+        """Returns the url, headers and body of a token request."""
         authorization = "Basic {0}".format(
             base64.b64encode(
                 "{0}:{1}".format(self._client_id, self._secret).encode("ascii")
@@ -67,14 +108,15 @@ class Auth(AuthBase):
             )
 
         url = urljoin(self._base_url, self.TOKEN_PATH)
-        r = self._session.post(url, data=data, headers=headers)
-        r.raise_for_status()
+        return url, headers, data
 
+    def _store_token(self, text):
+        """Parses the answer of the token endpoint. Throws in case of error"""
         try:
-            json_data = json.loads(r.text)
-        except json.decoder.JSONDecodeError as e:
+            json_data = self._codec.loads(text)
+        except ValueError as e:
             raise SyntaxError(
-                "The server did not return expected json: {0}".format(r.text)
+                "The server did not return expected json: {0}".format(text)
             )
 
         try:
@@ -86,14 +128,62 @@ class Auth(AuthBase):
             )
 
         try:
-            self._expiry_date = time() + float(json_data["expires_in"])
+            self._expires_in = float(json_data["expires_in"])
+            self._expiry_date = time() + self._expires_in
         except KeyError:
+            self._expires_in = None
             self._expiry_date = None
         except ValueError:
             raise SyntaxError(
                 "The server did not return a valid expires_in: {0}".format(json_data)
             )
 
+    def _request_a_token(self, grant_type="password"):
+        """Requests a token. Throws in case of error"""
+        started = monotonic()
+        error = None
+        try:
+            url, headers, data = self._token_request(grant_type)
+            r = self._session.post(url, data=data, headers=headers)
+            r.raise_for_status()
+
+            self._store_token(r.content)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if self._instrumentation is not None:
+                self._instrumentation.on_token(grant_type, monotonic() - started, error)
+
+    def _store_lock(self):
+        if not self._token_store:
+            return contextlib.nullcontext()
+        return self._token_store.lock(self._token_store_key)
+
+    def _load_stored_token(self):
+        """Adopts the token of the store, if it is more recent than ours."""
+        if not self._token_store:
+            return
+        token = self._token_store.load(self._token_store_key)
+        if token and (token.get("expiry_date") or 0) > (self._expiry_date or 0):
+            self._token = token["access_token"]
+            self._refresh_token = token["refresh_token"]
+            self._expiry_date = token.get("expiry_date")
+            self._expires_in = token.get("expires_in")
+
+    def _save_stored_token(self):
+        if not self._token_store:
+            return
+        self._token_store.save(
+            self._token_store_key,
+            {
+                "access_token": self._token,
+                "refresh_token": self._refresh_token,
+                "expiry_date": self._expiry_date,
+                "expires_in": self._expires_in,
+            },
+        )
+
     def _should_refresh_token(self):
         """Returns True if the token is expired / about to expire"""
         if not self._expiry_date:
@@ -101,16 +191,78 @@ class Auth(AuthBase):
         else:
             return time() > self._expiry_date - self.TOKEN_EXPIRY_SECURITY
 
+    def _should_refresh_in_background(self):
+        """Returns True if the token is still valid but will expire soon,
+        and the last background refresh did not fail just before"""
+        if not self._expiry_date or not self._expires_in:
+            return False
+        if (
+            self._background_failed_at is not None
+            and monotonic() - self._background_failed_at < self.TOKEN_BACKGROUND_RETRY
+        ):
+            return False
+        margin = min(self.TOKEN_BACKGROUND_REFRESH, self._expires_in / 2)
+        return time() > self._expiry_date - margin
+
     def _refresh_the_token(self):
         """Requests a new token based on refresh token."""
         return self._request_a_token(grant_type="refresh_token")
 
+    def _ensure_token(self):
+        """Makes sure a valid token is available. Only one thread requests
+        a token at a time, the others wait for it and reuse it."""
+        if self._token and self._refresh_token and not self._should_refresh_token():
+            return
+
+        with self._lock, self._store_lock():
+            self._load_stored_token()
+            token = self._token
+
+            if not self._token or not self._refresh_token:
+                self._request_a_token()
+
+            if self._should_refresh_token():
+                self._refresh_the_token()
+
+            if self._token != token:
+                self._save_stored_token()
+
+    def _start_background_refresh(self):
+        if not self._lock.acquire(blocking=False):
+            return  # a token is being requested already
+        try:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_in_background,
+                name="pyakeneo-token-refresh",
+                daemon=True,
+            )
+            self._refresh_thread.start()
+        finally:
+            self._lock.release()
+
+    def _refresh_in_background(self):
+        with self._lock, self._store_lock():
+            self._load_stored_token()
+            if not self._should_refresh_in_background():
+                return
+            try:
+                self._refresh_the_token()
+                self._save_stored_token()
+            except Exception as e:
+                # The token is refreshed synchronously by the next request
+                # once it is about to expire, raising the error if any.
+                self._background_failed_at = monotonic()
+                logger.warning("akeneo.token_refresh_failed", error=repr(e))
+            else:
+                self._background_failed_at = None
+
     def __call__(self, r):
-        if not self._token or not self._refresh_token:
-            self._request_a_token()
+        self._ensure_token()
 
-        if self._should_refresh_token():
-            self._refresh_the_token()
+        if self._background_refresh and self._should_refresh_in_background():
+            self._start_background_refresh()
 
         r.headers["Authorization"] = self.authorization
         return r
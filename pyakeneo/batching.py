@@ -0,0 +1,110 @@
+"""
+Encoding of the items of update_create_list into NDJSON batches which fit
+the limits of Akeneo: at most 100 items per request, and at most 1,000,000
+characters per item.
+
+Every item is encoded once, into bytes, and measured: the items which are too
+large are rejected without being sent, and the batches are packed up to the
+limits. Batches are lists of encoded lines, so that they can be split
+(on a 413 response) without encoding their items again.
+"""
+from typing import Callable, Iterable, Iterator
+
+from pyakeneo.codec import JSONCodec, get_codec
+
+
+class ItemTooLargeError(ValueError):
+    """Raised for the items whose encoded line is longer than Akeneo accepts"""
+
+    def __init__(self, size: int, max_size: int, code=None):
+        super(ItemTooLargeError, self).__init__(
+            "Item {0}is {1} characters long once encoded, more than the {2} "
+            "accepted by Akeneo".format(
+                "{0!r} ".format(code) if code is not None else "", size, max_size
+            )
+        )
+        self.size = size
+        self.max_size = max_size
+        self.code = code
+
+
+class Batch(object):
+    """Encoded lines to send in one request, and their total size"""
+
+    __slots__ = ("lines", "size")
+
+    def __init__(self):
+        self.lines = []
+        self.size = 0
+
+    def add(self, line: bytes):
+        self.lines.append(line)
+        self.size += len(line)
+
+    def __len__(self):
+        return len(self.lines)
+
+
+class BatchEncoder(object):
+    """
+    Encodes items into lines, and packs them into batches of at most
+    max_items lines and, if set, max_batch_size bytes. get_code returns the
+    code of an item, given in the errors.
+    """
+
+    def __init__(
+        self,
+        codec: JSONCodec | str | None = None,
+        max_items: int = 100,
+        max_line_size: int = 1000000,
+        max_batch_size: int | None = None,
+        get_code: Callable | None = None,
+    ):
+        self.codec = get_codec(codec)
+        self.max_items = max_items
+        self.max_line_size = max_line_size
+        self.max_batch_size = max_batch_size
+        self.get_code = get_code
+
+    def encode(self, item) -> bytes:
+        """Returns the NDJSON line of item, raising ItemTooLargeError if it
+        is longer than max_line_size characters"""
+        line = self.codec.dumps(item)
+        size = len(line)
+        if size > self.max_line_size:
+            # utf-8 sequences count as a single character
+            size = len(line.decode("utf-8"))
+            if size > self.max_line_size:
+                raise ItemTooLargeError(size, self.max_line_size, self._code(item))
+        return line + b"\n"
+
+    def _code(self, item):
+        try:
+            return self.get_code(item) if self.get_code else None
+        except (KeyError, TypeError):
+            return None
+
+    def fits(self, batch: Batch, line: bytes) -> bool:
+        """Returns whether line can be added to batch"""
+        if len(batch) >= self.max_items:
+            return False
+        if self.max_batch_size is None or not batch.lines:
+            return True
+        return batch.size + len(line) <= self.max_batch_size
+
+    def pack(self, lines: Iterable[bytes]) -> Iterator[list[bytes]]:
+        """Packs encoded lines into batches, yielded as lists of lines"""
+        batch = Batch()
+        for line in lines:
+            if not self.fits(batch, line):
+                yield batch.lines
+                batch = Batch()
+            batch.add(line)
+        if batch.lines:
+            yield batch.lines
+
+    def batches(self, items: Iterable) -> Iterator[list[bytes]]:
+        """Encodes items, and packs them into batches. Items are encoded as
+        the batches are consumed: an ItemTooLargeError is raised once the
+        item is reached, after the previous batches were yielded."""
+        return self.pack(self.encode(item) for item in items)
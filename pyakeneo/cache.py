@@ -0,0 +1,202 @@
+"""
+Bounded response cache for the reference data (families, attributes,
+channels...) which is read much more often than it changes.
+"""
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+import requests
+
+
+class CacheEntry(object):
+    __slots__ = ("content", "headers", "etag", "last_modified", "expires_at")
+
+    def __init__(self, content: bytes, headers: dict, expires_at: float):
+        self.content = content
+        self.headers = headers
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+        self.expires_at = expires_at
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def can_revalidate(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class ResponseCache(object):
+    """
+    LRU cache of GET responses bodies, keyed by URL (query string included).
+    It holds at most max_entries responses and max_bytes of bodies; the least
+    recently used ones are evicted first.
+    Entries are fresh for ttl seconds, or ttls[name] for the pools of the
+    given name (eg {"families": 3600, "attribute_options": 600}). Stale
+    entries having an ETag or a Last-Modified date are revalidated with a
+    conditional request instead of being downloaded again.
+    It is safe to share it between threads and pools.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl: float = 300,
+        ttls: dict[str, float] | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached bodies, in bytes"""
+        return self._size
+
+    def ttl_for(self, name: str | None) -> float:
+        return self.ttls.get(name, self.ttl)
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, content: bytes, headers: dict, ttl: float):
+        if len(content) > self.max_bytes:
+            self.discard(key)
+            return
+        entry = CacheEntry(content, headers, monotonic() + ttl)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.content)
+            self._entries[key] = entry
+            self._size += len(content)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.content)
+
+    def touch(self, key: str, ttl: float):
+        """Marks the entry as fresh again, once revalidated"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = monotonic() + ttl
+
+    def discard(self, key: str):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= len(entry.content)
+
+    def invalidate(self, prefix: str = ""):
+        """Drops the entries whose URL starts with prefix (all by default)"""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._size -= len(self._entries.pop(key).content)
+
+    def clear(self):
+        self.invalidate()
+
+
+class CachingSession(object):
+    """
+    Wraps the session of a pool to answer its GET requests from a
+    ResponseCache. Any other request (POST, PATCH, DELETE...) goes through,
+    then drops the cached responses of the pool (and of its sub-pools) since
+    they may be outdated. Streamed requests are not cached.
+    Other attributes are the ones of the wrapped session.
+    """
+
+    def __init__(
+        self, session: requests.Session, cache: ResponseCache, endpoint: str, ttl
+    ):
+        self.session = session
+        self.cache = cache
+        self.endpoint = endpoint
+        self.ttl = ttl
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def request(self, method, url, **kwargs):
+        if method.upper() == "GET" and not kwargs.get("stream"):
+            return self._cached_get(url, **kwargs)
+        try:
+            return self.session.request(method, url, **kwargs)
+        finally:
+            self.cache.invalidate(self.endpoint)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        return self.request("POST", url, data=data, json=json, **kwargs)
+
+    def put(self, url, data=None, **kwargs):
+        return self.request("PUT", url, data=data, **kwargs)
+
+    def patch(self, url, data=None, **kwargs):
+        return self.request("PATCH", url, data=data, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def _cached_get(self, url, params=None, headers=None, **kwargs):
+        key = requests.Request("GET", url, params=params).prepare().url
+        entry = self.cache.get(key)
+        if entry is not None and entry.is_fresh(monotonic()):
+            self.cache.hits += 1
+            return self._make_response(key, entry)
+
+        headers = dict(headers or {})
+        if entry is not None and entry.can_revalidate():
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        response = self.session.get(url, params=params, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache.revalidations += 1
+            self.cache.touch(key, self.ttl)
+            return self._make_response(key, entry)
+
+        self.cache.misses += 1
+        if response.status_code == 200:
+            self.cache.put(
+                key, response.content, self._kept_headers(response), self.ttl
+            )
+        return response
+
+    @staticmethod
+    def _kept_headers(response) -> dict:
+        return {
+            name: response.headers[name]
+            for name in ("Content-Type", "ETag", "Last-Modified")
+            if name in response.headers
+        }
+
+    @staticmethod
+    def _make_response(url, entry: CacheEntry) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers.update(entry.headers)
+        response._content = entry.content
+        response._content_consumed = True
+        response.encoding = "utf-8"
+        return response
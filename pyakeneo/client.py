@@ -1,5 +1,7 @@
 import requests
+from pyakeneo.adapters import AkeneoAdapter
 from pyakeneo.auth import Auth
+from pyakeneo.cache import ResponseCache
 from pyakeneo.resources import (AssetFamilyPool, AssociationTypesPool,
                                 AttributeGroupsPool, AttributesPool,
                                 CategoriesPool, ChannelsPool, CurrenciesPool,
@@ -7,6 +9,11 @@ from pyakeneo.resources import (AssetFamilyPool, AssociationTypesPool,
                                 MediaFilesPool, ProductModelsPool,
                                 ProductsPool, PublishedProductsPool,
                                 ReferenceEntityPool)
+from pyakeneo.codec import JSONCodec, get_codec
+from pyakeneo.instrumentation import Instrumentation, Instrumentations
+from pyakeneo.schema import CatalogSchema
+from pyakeneo.retry import RateLimiter, RetryPolicy
+from pyakeneo.token_store import TokenStore
 from pyakeneo.utils import urljoin
 
 
@@ -21,7 +28,51 @@ class Client:
             username: str = None,
             password: str = None,
             session: requests.Session = None,
+            token_store: TokenStore = None,
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+            pool_block: bool = False,
+            max_retries: int = 0,
+            keep_alive: bool = True,
+            retry_policy: RetryPolicy = None,
+            rate_limiter: RateLimiter = None,
+            json_codec: JSONCodec | str = None,
+            cache: ResponseCache = None,
+            instrumentation: Instrumentation | list[Instrumentation] = None,
+            compress_requests: bool = False,
+            accept_encoding: str = None,
     ):
+        """
+        Connections options only apply to the sessions created by the client
+        (the API one, and the one of Auth), not to a given session:
+        :param pool_connections: number of hosts to keep a connection pool for
+        :param pool_maxsize: connections kept open per host; set it to the
+            number of threads sharing the client
+        :param pool_block: wait for a free connection instead of opening
+            (and then discarding) extra ones once pool_maxsize is reached
+        :param max_retries: int or urllib3 Retry, applied by the adapters to
+            connection errors
+        :param keep_alive: keep connections open between requests
+        :param retry_policy: how to retry throttled (429) or failed (5XX)
+            requests, RetryPolicy() by default. RetryPolicy(max_retries=0)
+            disables retries.
+        :param rate_limiter: a RateLimiter capping the rate of API requests
+        :param json_codec: JSONCodec, or the name of one ("json", "orjson",
+            "ujson"), encoding and decoding all the bodies
+        :param cache: a ResponseCache of the reference data (families,
+            attributes, channels...) responses, shared by their pools. The
+            writes made through the client invalidate it.
+        :param instrumentation: Instrumentation, or list of them, whose hooks
+            are called for every request and token request (see
+            pyakeneo.instrumentation). It only applies to the sessions
+            created by the client.
+        :param compress_requests: gzip the bodies of the API requests
+            writing data (eg the NDJSON of update_create_list), for the
+            servers accepting compressed requests. It is turned off as soon
+            as the server answers a compressed request with a 415.
+        :param accept_encoding: Accept-Encoding of the API requests, eg
+            "gzip", or "identity" to receive uncompressed responses
+        """
         if not session and not (client_id and secret and username and password):
             # No credentials provided neither via client_id+secret+username+password nor via session
             raise ValueError(
@@ -30,72 +81,110 @@ class Client:
                 + "2) as session having an authentication."
             )
 
+        self._codec = get_codec(json_codec)
+        self._cache = cache
+        self._instrumentation = Instrumentations.coerce(instrumentation)
+
         if not session:
             session = requests.Session()
-            session.auth = self._make_auth(base_url, client_id, secret, username, password)
+            session.auth = self._make_auth(
+                base_url, client_id, secret, username, password, token_store
+            )
+            if retry_policy is None:
+                retry_policy = RetryPolicy()
+            adapter_options = dict(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                max_retries=max_retries,
+                retry_policy=retry_policy,
+                instrumentation=self._instrumentation,
+            )
+            self._configure_session(
+                session,
+                AkeneoAdapter(
+                    rate_limiter=rate_limiter,
+                    auth=session.auth,
+                    compress_requests=compress_requests,
+                    accept_encoding=accept_encoding,
+                    **adapter_options
+                ),
+                keep_alive,
+            )
+            self._configure_session(
+                session.auth.session, AkeneoAdapter(**adapter_options), keep_alive
+            )
 
         self._init(base_url, session)
 
-    def _make_auth(self, base_url, client_id, secret, username, password) -> Auth:
-        return Auth(base_url, client_id, secret, username, password)
+    def _make_auth(
+        self, base_url, client_id, secret, username, password, token_store=None
+    ) -> Auth:
+        return Auth(
+            base_url,
+            client_id,
+            secret,
+            username,
+            password,
+            token_store=token_store,
+            codec=self._codec,
+            instrumentation=self._instrumentation,
+        )
+
+    @staticmethod
+    def _configure_session(session, adapter, keep_alive):
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not keep_alive:
+            session.headers["Connection"] = "close"
 
     def _init(self, base_url, session):
         self._base_url = base_url
         self._session = session
         self._session.headers.update({"Content-Type": "application/json"})
         self._resources = {
-            "association_types": AssociationTypesPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "association-types/"),
-                session,
-            ),
-            "attributes": AttributesPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "attributes/"), session
-            ),
-            "attribute_groups": AttributeGroupsPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "attribute-groups/"),
-                session,
-            ),
-            "categories": CategoriesPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "categories/"), session
+            "association_types": self._make_pool(
+                AssociationTypesPool, "association-types/"
             ),
-            "channels": ChannelsPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "channels/"), session
+            "attributes": self._make_pool(AttributesPool, "attributes/"),
+            "attribute_groups": self._make_pool(
+                AttributeGroupsPool, "attribute-groups/"
             ),
-            "currencies": CurrenciesPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "currencies/"), session
+            "categories": self._make_pool(CategoriesPool, "categories/"),
+            "channels": self._make_pool(ChannelsPool, "channels/"),
+            "currencies": self._make_pool(CurrenciesPool, "currencies/"),
+            "families": self._make_pool(FamiliesPool, "families/"),
+            "locales": self._make_pool(LocalesPool, "locales/"),
+            "measure_families": self._make_pool(
+                MeasureFamiliesPool, "measure-families/"
             ),
-            "families": FamiliesPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "families/"), session
+            "media_files": self._make_pool(MediaFilesPool, "media-files/"),
+            "products": self._make_pool(ProductsPool, "products/"),
+            "product_models": self._make_pool(ProductModelsPool, "product-models/"),
+            "published_products": self._make_pool(
+                PublishedProductsPool, "published-products/"
             ),
-            "locales": LocalesPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "locales/"), session
-            ),
-            "measure_families": MeasureFamiliesPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "measure-families/"),
-                session,
-            ),
-            "media_files": MediaFilesPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "media-files/"), session
-            ),
-            "products": ProductsPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "products/"), session
-            ),
-            "product_models": ProductModelsPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "product-models/"), session
-            ),
-            "published_products": PublishedProductsPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "published-products/"),
-                session,
-            ),
-            "asset_families": AssetFamilyPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "asset-families/"), session
-            ),
-            "reference_entities": ReferenceEntityPool(
-                urljoin(self._base_url, self.BASIC_API_PATH, "reference-entities/"),
-                session,
+            "asset_families": self._make_pool(AssetFamilyPool, "asset-families/"),
+            "reference_entities": self._make_pool(
+                ReferenceEntityPool, "reference-entities/"
             ),
         }
 
+    def _make_pool(self, pool_class, path):
+        return pool_class(
+            urljoin(self._base_url, self.BASIC_API_PATH, path),
+            self._session,
+            codec=self._codec,
+            cache=self._cache,
+        )
+
+    def load_schema(self, max_workers: int = 8) -> CatalogSchema:
+        """Downloads the attributes (and the options of the select ones), the
+        families (and their variants), the categories, the channels and the
+        locales, with up to max_workers requests at once, into an indexed
+        CatalogSchema. Call its refresh() method to update it."""
+        return CatalogSchema.load(self, max_workers)
+
     @property
     def resources(self):
         """Return all resources as a list of Resources"""
@@ -0,0 +1,79 @@
+"""
+JSON codecs used to encode request bodies and decode responses.
+The stdlib json module is used by default; orjson or ujson may be plugged in
+when installed, eg Client(..., json_codec="orjson").
+"""
+import json
+
+
+class JSONCodec(object):
+    """Codec based on the stdlib json module"""
+
+    name = "json"
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes | str):
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec based on orjson (https://github.com/ijl/orjson)"""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, data: bytes | str):
+        return self._orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """Codec based on ujson (https://github.com/ultrajson/ultrajson)"""
+
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+
+        self._ujson = ujson
+
+    def dumps(self, obj) -> bytes:
+        return self._ujson.dumps(
+            obj, ensure_ascii=False, escape_forward_slashes=False
+        ).encode("utf-8")
+
+    def loads(self, data: bytes | str):
+        return self._ujson.loads(data)
+
+
+CODECS = {
+    JSONCodec.name: JSONCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+}
+
+DEFAULT_CODEC = JSONCodec()
+
+
+def get_codec(codec=None) -> JSONCodec:
+    """Returns a codec from its name, a codec, or the default one if None."""
+    if codec is None:
+        return DEFAULT_CODEC
+    if isinstance(codec, str):
+        try:
+            return CODECS[codec]()
+        except KeyError:
+            raise ValueError(
+                "Unknown json codec {0}, expected one of {1}".format(
+                    codec, ", ".join(CODECS)
+                )
+            )
+    return codec
@@ -0,0 +1,214 @@
+"""
+Compact representation of products and product models, for the processes
+holding many of them in memory. See ListableResource.fetch_list(item_class=).
+
+Compared to the dicts decoded from the API:
+- the fields are slots instead of dict entries,
+- the codes (family, categories, attributes, locales, channels) are interned,
+  so that they are shared by all the items instead of being repeated,
+- the values block, which holds most of the data, is kept encoded until it
+  is first accessed.
+"""
+from sys import intern
+
+from pyakeneo.codec import DEFAULT_CODEC, JSONCodec
+
+
+def _intern_codes(codes) -> tuple:
+    return tuple(intern(code) for code in codes or ())
+
+
+def _intern_value(value: dict) -> dict:
+    interned = {}
+    for key, data in value.items():
+        if key in ("locale", "scope") and data is not None:
+            data = intern(data)
+        interned[intern(key)] = data
+    return interned
+
+
+def intern_values(values: dict) -> dict:
+    """Returns the values block of an item with its keys, locales and scopes
+    interned"""
+    return {
+        intern(attribute): [_intern_value(value) for value in attribute_values]
+        for attribute, attribute_values in values.items()
+    }
+
+
+class CompactItem(object):
+    """
+    Base class of the compact items. FIELDS are stored in slots, with the
+    codes of CODE_FIELDS and CODES_FIELDS (lists of codes) interned. Other
+    fields, if any, are kept in a dict. Fields missing from the item read as
+    None, but are left out of to_dict().
+    Items can still be read as dicts (item["family"], item.get("parent")),
+    and to_dict() returns them the way the API does.
+    """
+
+    FIELDS = ()
+    CODE_FIELDS = ()
+    CODES_FIELDS = ()
+
+    __slots__ = ("_encoded_values", "_values", "_codec", "_extra")
+
+    def __init__(self, data: dict, codec: JSONCodec | None = None):
+        data = dict(data)
+        for field in self.FIELDS:
+            if field not in data:
+                continue
+            value = data.pop(field)
+            if field in self.CODE_FIELDS and value is not None:
+                value = intern(value)
+            elif field in self.CODES_FIELDS and value is not None:
+                value = _intern_codes(value)
+            setattr(self, field, value)
+
+        self._codec = codec or DEFAULT_CODEC
+        values = data.pop("values", None)
+        self._values = None
+        self._encoded_values = (
+            self._codec.dumps(values) if values is not None else None
+        )
+        self._extra = {intern(key): value for key, value in data.items()} or None
+
+    def __getattr__(self, name):
+        # only called for the slots which were not set
+        if name in self.FIELDS:
+            return None
+        raise AttributeError(name)
+
+    def _get_field(self, field):
+        """Returns the field, raising KeyError if the item has none"""
+        try:
+            return object.__getattribute__(self, field)
+        except AttributeError:
+            raise KeyError(field)
+
+    @property
+    def values(self) -> dict | None:
+        """The values block, decoded on first access"""
+        if self._values is None and self._encoded_values is not None:
+            self._values = intern_values(self._codec.loads(self._encoded_values))
+            self._encoded_values = None
+        return self._values
+
+    @values.setter
+    def values(self, values: dict | None):
+        self._values = values
+        self._encoded_values = None
+
+    def to_dict(self) -> dict:
+        result = {}
+        for field in self.FIELDS:
+            try:
+                value = self._get_field(field)
+            except KeyError:
+                continue
+            if field in self.CODES_FIELDS and value is not None:
+                value = list(value)
+            result[field] = value
+        if self._values is not None or self._encoded_values is not None:
+            result["values"] = self.values
+        result.update(self._extra or {})
+        return result
+
+    def __getitem__(self, key):
+        if key == "values":
+            if self._values is None and self._encoded_values is None:
+                raise KeyError(key)
+            return self.values
+        if key in self.FIELDS:
+            return self._get_field(key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getstate__(self) -> dict:
+        # only the slots which are set, so that the fields missing from the
+        # item are still missing from its copies, rather than None
+        state = {}
+        for slot in CompactItem.__slots__ + self.FIELDS:
+            try:
+                state[slot] = object.__getattribute__(self, slot)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self, state: dict):
+        for slot, value in state.items():
+            # unpickled strings are not interned
+            if slot in self.CODE_FIELDS and value is not None:
+                value = intern(value)
+            elif slot in self.CODES_FIELDS and value is not None:
+                value = _intern_codes(value)
+            setattr(self, slot, value)
+
+    def __eq__(self, other):
+        if isinstance(other, CompactItem):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "<{0} {1}>".format(self.__class__.__name__, self.get_code())
+
+    def get_code(self):
+        raise NotImplementedError()
+
+
+class CompactProduct(CompactItem):
+    """https://api.akeneo.com/api-reference.html#Products"""
+
+    FIELDS = (
+        "uuid",
+        "identifier",
+        "enabled",
+        "family",
+        "categories",
+        "groups",
+        "parent",
+        "associations",
+        "quantified_associations",
+        "created",
+        "updated",
+        "metadata",
+    )
+    CODE_FIELDS = ("family", "parent")
+    CODES_FIELDS = ("categories", "groups")
+
+    __slots__ = FIELDS
+
+    def get_code(self):
+        return self.identifier
+
+
+class CompactProductModel(CompactItem):
+    """https://api.akeneo.com/api-reference.html#Productmodel"""
+
+    FIELDS = (
+        "code",
+        "family",
+        "family_variant",
+        "parent",
+        "categories",
+        "associations",
+        "quantified_associations",
+        "created",
+        "updated",
+        "metadata",
+    )
+    CODE_FIELDS = ("family", "family_variant", "parent")
+    CODES_FIELDS = ("categories",)
+
+    __slots__ = FIELDS
+
+    def get_code(self):
+        return self.code
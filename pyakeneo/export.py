@@ -0,0 +1,259 @@
+"""
+Bulk export of the resources of a PIM into NDJSON files.
+
+    from pyakeneo.export import Exporter
+    from pyakeneo import partitions
+    exporter = Exporter(
+        client,
+        "export/",
+        partitions={"products": partitions.by_family(["shoes", "shirts"], 2)},
+    )
+    report = exporter.run()
+
+Every resource, and every partition of a resource, is exported on its own
+thread, into directory/<resource>/part-<n>.ndjson.gz, one item per line.
+Pages are appended as they are received; once a page is written, the cursor
+to the next one is checkpointed next to the file. Running an export again
+in the same directory resumes the unfinished parts from their checkpoint,
+and skips the finished ones.
+"""
+import gzip
+import json
+import os
+from time import monotonic
+from typing import Iterable
+
+from pyakeneo.codec import JSONCodec, get_codec
+from pyakeneo.partitions import merge_search
+from pyakeneo.result import Cursor
+from pyakeneo.utils import concurrent_map
+
+
+class PartReport(object):
+    """Outcome of the export of a part (a partition of a resource)"""
+
+    __slots__ = ("resource", "part", "path", "items", "pages", "seconds", "error")
+
+    def __init__(self, resource: str, part: int, path: str):
+        self.resource = resource
+        self.part = part
+        self.path = path
+        self.items = 0
+        self.pages = 0
+        self.seconds = 0.0
+        self.error = None
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return "<PartReport {0}#{1} {2} items in {3:.1f}s{4}>".format(
+            self.resource,
+            self.part,
+            self.items,
+            self.seconds,
+            " failed: {0!r}".format(self.error) if self.error else "",
+        )
+
+
+class ExportReport(object):
+    """Reports of all the parts of an export"""
+
+    def __init__(self, parts: list[PartReport], seconds: float):
+        self.parts = parts
+        self.seconds = seconds
+
+    @property
+    def failed(self) -> list[PartReport]:
+        return [part for part in self.parts if part.error is not None]
+
+    @property
+    def items(self) -> int:
+        return sum(part.items for part in self.parts)
+
+    def by_resource(self) -> dict[str, dict]:
+        """Returns the items, pages, time spent (by all its parts) and
+        throughput of each resource"""
+        resources = {}
+        for part in self.parts:
+            stats = resources.setdefault(
+                part.resource, {"items": 0, "pages": 0, "seconds": 0.0, "errors": 0}
+            )
+            stats["items"] += part.items
+            stats["pages"] += part.pages
+            stats["seconds"] = max(stats["seconds"], part.seconds)
+            stats["errors"] += part.error is not None
+        for stats in resources.values():
+            seconds = stats["seconds"]
+            stats["items_per_second"] = stats["items"] / seconds if seconds else 0.0
+        return resources
+
+
+class Exporter(object):
+    """
+    Exports the listable resources of a client into a directory, with up to
+    max_workers parts at once. See the module documentation.
+    """
+
+    CHECKPOINT_SUFFIX = ".checkpoint.json"
+
+    def __init__(
+        self,
+        client,
+        directory: str,
+        resources: Iterable[str] | None = None,
+        partitions: dict[str, list[dict]] | None = None,
+        max_workers: int = 4,
+        page_size: int = 100,
+        prefetch: int = 1,
+        compress: bool = True,
+        codec: JSONCodec | str | None = None,
+    ):
+        """
+        :param resources: names of the resources (as in client.resources) to
+            export, all the listable ones by default
+        :param partitions: search filters splitting a resource in parts
+            exported in parallel, by resource name (see pyakeneo.partitions)
+        :param prefetch: pages downloaded ahead of the one being written
+        :param compress: write gzip files (ndjson.gz), or plain ndjson files
+        :param codec: JSONCodec (or its name) encoding the items
+        """
+        self.client = client
+        self.directory = directory
+        if resources is None:
+            resources = [
+                name
+                for name, pool in client.resources.items()
+                if hasattr(pool, "fetch_list")
+            ]
+        self.resources = list(resources)
+        self.partitions = dict(partitions or {})
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.compress = compress
+        self.codec = get_codec(codec)
+
+    def parts(self) -> list[tuple[str, int, dict | None]]:
+        """Returns the (resource, part number, search filters) to export"""
+        parts = []
+        for resource in self.resources:
+            for i, search in enumerate(self.partitions.get(resource) or [None]):
+                parts.append((resource, i, search))
+        return parts
+
+    def part_path(self, resource: str, part: int) -> str:
+        extension = "ndjson.gz" if self.compress else "ndjson"
+        return os.path.join(
+            self.directory, resource, "part-{0:04d}.{1}".format(part, extension)
+        )
+
+    def run(self, resume: bool = True) -> ExportReport:
+        """Exports all the parts, and returns their reports. Errors don't stop
+        the other parts: they are reported, and the failed parts are resumed
+        by the next run. With resume False, the export starts over."""
+        started = monotonic()
+        reports = []
+        for _, future in concurrent_map(
+            lambda part: self.export_part(*part, resume=resume),
+            self.parts(),
+            max_workers=self.max_workers,
+            ordered=False,
+        ):
+            reports.append(future.result())
+        reports.sort(key=lambda report: (report.resource, report.part))
+        return ExportReport(reports, monotonic() - started)
+
+    def export_part(
+        self, resource: str, part: int, search: dict | None, resume: bool = True
+    ) -> PartReport:
+        path = self.part_path(resource, part)
+        report = PartReport(resource, part, path)
+        started = monotonic()
+        try:
+            self._export_part(resource, search, path, resume, report)
+        except Exception as e:
+            report.error = e
+        report.seconds = monotonic() - started
+        return report
+
+    def _export_part(self, resource, search, path, resume, report):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        checkpoint = self._load_checkpoint(path) if resume else None
+        if checkpoint is not None and checkpoint.get("search") != search:
+            checkpoint = None  # the partitions changed
+        if checkpoint is not None and checkpoint["done"]:
+            return
+
+        pool = self.client.resources[resource]
+        if checkpoint is not None:
+            # drops anything written after the last checkpoint
+            with open(path, "ab") as f:
+                f.truncate(checkpoint["offset"])
+            result = pool.fetch_list(
+                prefetch=self.prefetch,
+                resume_from=Cursor.from_dict(checkpoint["cursor"]),
+            )
+        else:
+            with open(path, "wb"):
+                pass  # starts over
+            args = {"limit": self.page_size}
+            if search:
+                args["search"] = merge_search(None, search)
+            result = pool.fetch_list(args, prefetch=self.prefetch)
+
+        try:
+            while True:
+                items = result.get_page_items()
+                offset = self._append(path, items)
+                report.items += len(items)
+                report.pages += 1
+                cursor = result.get_cursor()
+                self._save_checkpoint(
+                    path,
+                    {
+                        "search": search,
+                        "cursor": cursor.to_dict() if cursor else None,
+                        "offset": offset,
+                        "done": cursor is None,
+                    },
+                )
+                if cursor is None or not result.fetch_next_page():
+                    break
+        finally:
+            result.close()
+
+    def _append(self, path: str, items: list) -> int:
+        """Appends the items to the file, and returns its new size. With gzip,
+        each page is a member of the file, so that the file can be truncated
+        back to any checkpoint."""
+        data = b"".join(self.codec.dumps(item) + b"\n" for item in items)
+        if self.compress:
+            data = gzip.compress(data)
+        with open(path, "ab") as f:
+            f.write(data)
+            return f.tell()
+
+    def _load_checkpoint(self, path: str) -> dict | None:
+        try:
+            with open(path + self.CHECKPOINT_SUFFIX) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _save_checkpoint(self, path: str, checkpoint: dict):
+        temporary = path + self.CHECKPOINT_SUFFIX + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(temporary, path + self.CHECKPOINT_SUFFIX)
+
+
+def read_part(path: str, codec: JSONCodec | str | None = None):
+    """Yields the items of an exported file"""
+    codec = get_codec(codec)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield codec.loads(line)
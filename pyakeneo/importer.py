@@ -0,0 +1,484 @@
+"""
+Bulk import of NDJSON or CSV files, or of iterables of items, into the pools
+offering update_create_list.
+
+    from pyakeneo.importer import Importer, export_sources
+    importer = Importer(client, max_workers=4, log="import.log")
+    report = importer.run({
+        "attributes": "attributes.ndjson",
+        "attribute_options": "options.csv",
+        "products": ["products-1.ndjson.gz", "products-2.ndjson.gz"],
+    })
+    # or, the files written by pyakeneo.export.Exporter
+    report = importer.run(export_sources("export/"))
+
+Resources are imported in the order of their dependencies (see
+pyakeneo.planner), so that what the items refer to exists before them:
+attributes before their options, families before the product models, product
+models before the products... The resources which don't depend on each other
+are imported at once. Categories and product models are also imported level
+by level, parents first.
+
+Items are read, encoded and batched on the calling thread, while up to
+max_workers batches are sent at once: at most twice as many batches are held
+in memory, whatever the size of the sources. For the categories and product
+models, the code and parent of every item are kept too, and the source is
+read once more per level; sources which can only be read once (iterators,
+unseekable files) are held in memory instead.
+
+NDJSON files hold an item per line. CSV files hold an item per row, with a
+column per field: cells holding JSON objects, arrays, booleans or null are
+decoded, empty cells are left out of the items, and other cells are kept as
+strings.
+
+Family variants are nested in families: their items hold the code of their
+family in a "family" field, which is removed before they are sent.
+
+The result of every line is appended to the log, as NDJSON:
+{"resource": ..., "source": ..., "line": ..., "code": ..., "status_code": ...}
+with the message and errors returned by the server, if any. Lines which
+could not be read or sent have a null status_code.
+"""
+import csv
+import glob
+import gzip
+import io
+import json
+import os
+import threading
+from time import monotonic
+from typing import Iterable
+
+from pyakeneo.batching import Batch, BatchEncoder
+from pyakeneo.codec import JSONCodec, get_codec
+from pyakeneo.planner import ResourcePlan
+from pyakeneo.resources import UpdatableListResource
+from pyakeneo.utils import concurrent_map
+
+# Resources imported into a sub-pool of another resource: the resource, the
+# method returning the sub-pool, and the field of the items naming it
+NESTED_RESOURCES = {
+    "attribute_options": ("attributes", "options", "attribute"),
+    "family_variants": ("families", "variants", "family"),
+}
+
+# Nested resources whose field naming the parent is not part of their items
+DETACHED_FIELDS = {"family_variants"}
+
+# Resources whose items may have a parent item of the same resource
+PARENT_FIELDS = {"categories": "parent", "product_models": "parent"}
+
+# Fields of the items identifying them in the log
+CODE_FIELDS = ("code", "identifier", "uuid")
+
+CSV_EXTENSIONS = (".csv", ".csv.gz")
+
+
+class ResourceReport(object):
+    """Outcome of the import of a resource"""
+
+    __slots__ = ("resource", "lines", "created", "updated", "failed", "seconds")
+
+    def __init__(self, resource: str):
+        self.resource = resource
+        self.lines = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.seconds = 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+    def add(self, status_code: int | None):
+        self.lines += 1
+        if status_code == 201:
+            self.created += 1
+        elif status_code == 204:
+            self.updated += 1
+        else:
+            self.failed += 1
+
+    def __repr__(self):
+        return "<ResourceReport {0} {1} lines, {2} failed in {3:.1f}s>".format(
+            self.resource, self.lines, self.failed, self.seconds
+        )
+
+
+class ImportReport(object):
+    """Reports of all the resources of an import"""
+
+    def __init__(
+        self,
+        resources: list[ResourceReport],
+        seconds: float,
+        errors: dict[str, Exception] | None = None,
+    ):
+        self.resources = resources
+        self.seconds = seconds
+        # errors of the resources which could not be imported, or were
+        # skipped because a dependency could not be imported
+        self.errors = errors or {}
+
+    @property
+    def lines(self) -> int:
+        return sum(report.lines for report in self.resources)
+
+    @property
+    def failed(self) -> int:
+        return sum(report.failed for report in self.resources)
+
+    def by_resource(self) -> dict[str, ResourceReport]:
+        return {report.resource: report for report in self.resources}
+
+
+def export_sources(directory: str) -> dict[str, list[str]]:
+    """Returns the files written by pyakeneo.export.Exporter in directory, by
+    resource, as sources of Importer.run"""
+    sources = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*", "part-*.ndjson*"))):
+        resource = os.path.basename(os.path.dirname(path))
+        sources.setdefault(resource, []).append(path)
+    return sources
+
+
+def read_items(source, format: str | None = None, codec: JSONCodec | None = None):
+    """
+    Yields (source name, line number, item) for the items of source, that is
+    a path, a file, an iterable of items (dicts), or a list of them. format
+    is "ndjson" or "csv"; it defaults to the extension of the paths, and to
+    ndjson for files. Lines which cannot be read are yielded with the error
+    raised instead of an item.
+    """
+    codec = get_codec(codec)
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        if format is None:
+            format = "csv" if path.endswith(CSV_EXTENSIONS) else "ndjson"
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            yield from _read_file(f, path, format, codec)
+    elif hasattr(source, "read"):
+        name = getattr(source, "name", "<file>")
+        yield from _read_file(source, str(name), format or "ndjson", codec)
+    else:
+        line = 0
+        for element in source:
+            if isinstance(element, dict):
+                line += 1
+                yield "<items>", line, element
+            else:
+                yield from read_items(element, format, codec)
+
+
+def _read_file(f, name: str, format: str, codec: JSONCodec):
+    if format == "csv":
+        text = f
+        if not isinstance(f, io.TextIOBase):
+            text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+        reader = csv.DictReader(text)
+        try:
+            for row in reader:
+                try:
+                    yield name, reader.line_num, _parse_row(row)
+                except ValueError as e:
+                    yield name, reader.line_num, e
+        finally:
+            if text is not f:
+                text.detach()  # leaves f open
+    elif format == "ndjson":
+        for line, data in enumerate(f, 1):
+            if not data.strip():
+                continue
+            try:
+                yield name, line, codec.loads(data)
+            except ValueError as e:
+                yield name, line, e
+    else:
+        raise ValueError("Unknown format {0}, expected ndjson or csv".format(format))
+
+
+def _parse_row(row: dict) -> dict:
+    item = {}
+    for field, cell in row.items():
+        if field is None:
+            raise ValueError("More cells than columns")
+        if cell is None or cell == "":
+            continue
+        if cell[0] in "[{" or cell in ("true", "false", "null"):
+            cell = json.loads(cell)
+        item[field] = cell
+    return item
+
+
+def _rereadable(source) -> bool:
+    """Returns whether read_items(source) reads the same items at every
+    call: files and iterators are consumed by the first one"""
+    if isinstance(source, (str, os.PathLike, dict)):
+        return True
+    if hasattr(source, "read") or iter(source) is source:
+        return False
+    return all(_rereadable(element) for element in source)
+
+
+def _depth(entry: tuple, depths: dict) -> int:
+    item = entry[2]
+    if isinstance(item, dict) and "code" in item:
+        return depths[item["code"]]
+    return 0
+
+
+def _get_code(item: dict):
+    for field in CODE_FIELDS:
+        if field in item:
+            return item[field]
+    return None
+
+
+class Importer(object):
+    """
+    Imports items into the pools of a client, by batches of up to batch_size
+    items, with up to max_workers batches sent at once. See the module
+    documentation.
+    """
+
+    # Most groups of a nested resource (eg options of distinct attributes)
+    # buffered before they are sent, whatever their size
+    MAX_GROUPS = 100
+
+    def __init__(
+        self,
+        client,
+        max_workers: int = 4,
+        batch_size: int = UpdatableListResource.MAX_ITEMS_PER_REQUEST,
+        log=None,
+        codec: JSONCodec | str | None = None,
+    ):
+        """
+        :param log: path or text file the result of every line is appended
+            to, as NDJSON. No log is written by default.
+        :param codec: JSONCodec (or its name) decoding the NDJSON sources and
+            encoding the items
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.batch_size = min(batch_size, UpdatableListResource.MAX_ITEMS_PER_REQUEST)
+        self.log = log
+        self.codec = get_codec(codec)
+        self._log_lock = threading.Lock()
+
+    def run(
+        self, sources: dict, format: str | None = None, max_resources: int = 2
+    ) -> ImportReport:
+        """Imports the sources (see read_items) of every resource, in the
+        order of their dependencies, with up to max_resources resources at
+        once. The resources which fail, and those depending on them, are
+        reported in the errors of the report."""
+        started = monotonic()
+        log = self._open_log()
+        try:
+            results = ResourcePlan(sources).run(
+                lambda resource: self._import_resource(
+                    resource, sources[resource], format, log
+                ),
+                max_workers=max_resources,
+            )
+        finally:
+            self._close_log(log)
+        reports = [result.result for result in results.values() if not result.error]
+        errors = {
+            resource: result.error
+            for resource, result in results.items()
+            if result.error is not None
+        }
+        return ImportReport(reports, monotonic() - started, errors)
+
+    def import_resource(
+        self, resource: str, source, format: str | None = None
+    ) -> ResourceReport:
+        """Imports the items of source (see read_items) into a resource, named
+        as in client.resources or NESTED_RESOURCES"""
+        log = self._open_log()
+        try:
+            return self._import_resource(resource, source, format, log)
+        finally:
+            self._close_log(log)
+
+    def _import_resource(self, resource, source, format, log) -> ResourceReport:
+        if resource not in NESTED_RESOURCES and not isinstance(
+            self.client.resources.get(resource), UpdatableListResource
+        ):
+            raise ValueError("{0} cannot be imported".format(resource))
+        report = ResourceReport(resource)
+        started = monotonic()
+        if resource in PARENT_FIELDS:
+            self._import_levels(resource, source, format, report, log)
+        else:
+            self._import(resource, read_items(source, format, self.codec), report, log)
+        report.seconds = monotonic() - started
+        return report
+
+    def _open_log(self):
+        if self.log is None or hasattr(self.log, "write"):
+            return self.log
+        return open(self.log, "a", encoding="utf-8")
+
+    def _close_log(self, log):
+        if log is not None and log is not self.log:
+            log.close()
+
+    def _passes(self, source, format):
+        """Returns a function reading source again at every call, or None
+        if source can only be read once"""
+        if hasattr(source, "read"):
+            if not source.seekable():
+                return None
+            position = source.tell()
+
+            def read():
+                source.seek(position)
+                return read_items(source, format, self.codec)
+
+            return read
+        if not _rereadable(source):
+            return None
+        return lambda: read_items(source, format, self.codec)
+
+    def _import_levels(self, resource, source, format, report, log):
+        """Imports the items level by level, each item coming after its
+        parent when its parent is imported too. Only the codes and parents
+        are kept in memory: the source is read again for every level, unless
+        it can only be read once."""
+        read = self._passes(source, format)
+        if read is None:
+            entries = list(read_items(source, format, self.codec))
+
+            def read():
+                return iter(entries)
+
+        depths = self._depths(read(), PARENT_FIELDS[resource])
+        for level in range(max(depths.values(), default=0) + 1):
+            self._import(
+                resource,
+                (entry for entry in read() if _depth(entry, depths) == level),
+                report,
+                log,
+            )
+
+    @staticmethod
+    def _depths(entries: Iterable, parent_field: str) -> dict:
+        """Returns the depth of every item, by code: 0 for the items whose
+        parent is not imported, and one more than its parent otherwise"""
+        parents = {}
+        for _, _, item in entries:
+            if isinstance(item, dict) and "code" in item:
+                parents[item["code"]] = item.get(parent_field)
+        depths = {}
+        for code in parents:
+            path = []
+            while code in parents and code not in depths and code not in path:
+                path.append(code)
+                code = parents[code]
+            # -1 when the parent is not imported, or on a cycle
+            depth = depths.get(code, -1)
+            for ancestor in reversed(path):
+                depth += 1
+                depths[ancestor] = depth
+        return depths
+
+    def _pool(self, resource: str, item: dict, pools: dict):
+        if resource not in NESTED_RESOURCES:
+            return self.client.resources[resource]
+        parent, method, field = NESTED_RESOURCES[resource]
+        key = item[field]
+        if key not in pools:
+            pools[key] = getattr(self.client.resources[parent], method)(key)
+        return pools[key]
+
+    def _batches(self, resource: str, entries: Iterable, report, log):
+        """Yields (pool, lines, lines metadata) batches, logging the entries
+        which cannot be sent"""
+        pools = {}
+        encoders = {}
+        groups = {}
+        for source, line, item in entries:
+            meta = (source, line, _get_code(item) if isinstance(item, dict) else None)
+            try:
+                if isinstance(item, Exception):
+                    raise item
+                if not isinstance(item, dict):
+                    raise TypeError("Expected an object, got {0!r}".format(item))
+                pool = self._pool(resource, item, pools)
+                if resource in DETACHED_FIELDS:
+                    item = dict(item)
+                    del item[NESTED_RESOURCES[resource][2]]
+                encoder = encoders.get(id(pool))
+                if encoder is None:
+                    encoder = encoders[id(pool)] = BatchEncoder(
+                        self.codec,
+                        max_items=self.batch_size,
+                        max_line_size=pool.MAX_LINE_SIZE,
+                        max_batch_size=pool.MAX_REQUEST_SIZE,
+                        get_code=_get_code,
+                    )
+                line = encoder.encode(item)
+            except Exception as e:
+                self._write(resource, meta, {"message": repr(e)}, report, log)
+                continue
+            group = groups.get(id(pool))
+            if group is not None and not encoder.fits(group[1], line):
+                yield self._unpack(groups.pop(id(pool)))
+                group = None
+            if group is None:
+                group = groups[id(pool)] = (pool, Batch(), [])
+            group[1].add(line)
+            group[2].append(meta)
+            if len(groups) > self.MAX_GROUPS:
+                yield from map(self._unpack, groups.values())
+                groups = {}
+        yield from map(self._unpack, groups.values())
+
+    @staticmethod
+    def _unpack(group):
+        pool, batch, metas = group
+        return pool, batch.lines, metas
+
+    @staticmethod
+    def _send(batch):
+        pool, lines, _ = batch
+        return pool._patch_lines(lines)
+
+    def _import(self, resource: str, entries: Iterable, report, log):
+        for (_, _, metas), future in concurrent_map(
+            self._send,
+            self._batches(resource, entries, report, log),
+            max_workers=self.max_workers,
+            ordered=False,
+        ):
+            try:
+                statuses = future.result()
+            except Exception as e:
+                statuses = [{"message": repr(e)}] * len(metas)
+            for meta, status in zip(metas, statuses):
+                self._write(resource, meta, status, report, log)
+
+    def _write(self, resource: str, meta: tuple, status: dict, report, log):
+        status_code = status.get("status_code")
+        report.add(status_code)
+        if log is None:
+            return
+        source, line, code = meta
+        entry = {
+            "resource": resource,
+            "source": source,
+            "line": line,
+            "code": code,
+            "status_code": status_code,
+        }
+        for key in ("message", "errors"):
+            if key in status:
+                entry[key] = status[key]
+        line = json.dumps(entry) + "\n"
+        with self._log_lock:
+            log.write(line)
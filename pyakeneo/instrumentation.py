@@ -0,0 +1,333 @@
+"""
+Instrumentation of the requests made by Client: subclass Instrumentation,
+or use one of the adapters below, and give it to Client(instrumentation=...).
+
+    from pyakeneo.instrumentation import PrometheusInstrumentation
+    c = Client(AKENEO_URL, ..., instrumentation=PrometheusInstrumentation())
+
+Hooks are called from the threads making the requests, they must be thread
+safe. Errors raised by hooks are ignored, so that they never break requests.
+"""
+import re
+from urllib.parse import urlsplit
+
+import structlog
+
+_API_PATH = re.compile(r"^/api/rest/v1/")
+
+
+def url_template(url: str) -> str:
+    """Returns the path of an API url with its codes replaced by {code},
+    eg /api/rest/v1/attributes/{code}/options/{code}"""
+    path = urlsplit(url).path
+    match = _API_PATH.match(path)
+    if not match:
+        return path
+    segments = path[match.end() :].strip("/").split("/")
+    if segments[0] == "media-files" and len(segments) > 1:
+        # media file codes hold slashes, eg a/b/c/d/hash_name.jpg
+        template = ["media-files", "{code}"]
+        if segments[-1] == "download":
+            template.append("download")
+        return match.group(0) + "/".join(template)
+    template = [
+        segment if i % 2 == 0 else "{code}" for i, segment in enumerate(segments)
+    ]
+    return match.group(0) + "/".join(template)
+
+
+def pool_name(url: str) -> str:
+    """Returns the name of the resource pool of an url, eg products, or
+    oauth for the token requests"""
+    path = urlsplit(url).path
+    match = _API_PATH.match(path)
+    if not match:
+        return "oauth" if "/oauth/" in path else ""
+    return path[match.end() :].split("/", 1)[0]
+
+
+class RequestInfo(object):
+    """
+    What is known about a request, as given to the hooks.
+    status, response_bytes and latency (seconds) are set once the response is
+    received, error if the request failed. Bytes are None when unknown, eg
+    for streamed bodies. request_bytes and response_bytes are the bytes of
+    the bodies on the wire, possibly compressed; the *_decoded_bytes are
+    their sizes once decompressed. retries is the number of retries so far.
+    Instrumentations may keep their own state in context.
+    """
+
+    __slots__ = (
+        "method",
+        "url",
+        "pool",
+        "url_template",
+        "request_bytes",
+        "request_decoded_bytes",
+        "status",
+        "response_bytes",
+        "response_decoded_bytes",
+        "latency",
+        "retries",
+        "error",
+        "context",
+    )
+
+    def __init__(self, method: str, url: str, request_bytes: int | None = None):
+        self.method = method
+        self.url = url
+        self.pool = pool_name(url)
+        self.url_template = url_template(url)
+        self.request_bytes = request_bytes
+        self.request_decoded_bytes = request_bytes
+        self.status = None
+        self.response_bytes = None
+        self.response_decoded_bytes = None
+        self.latency = None
+        self.retries = 0
+        self.error = None
+        self.context = {}
+
+    def as_dict(self) -> dict:
+        return {
+            name: getattr(self, name) for name in self.__slots__ if name != "context"
+        }
+
+
+class Instrumentation(object):
+    """Base class of the instrumentations. Hooks do nothing by default."""
+
+    def before_request(self, info: RequestInfo):
+        """Called before a request is sent, once whatever its retries"""
+
+    def after_request(self, info: RequestInfo):
+        """Called once a request got its final response, or failed"""
+
+    def on_retry(self, info: RequestInfo, delay: float):
+        """Called before a request is retried, after delay seconds. info
+        holds the response (or error) which is retried"""
+
+    def on_token(self, grant_type: str, latency: float, error: Exception | None):
+        """Called once a token was requested, grant_type being password for a
+        new token, or refresh_token for a refreshed one"""
+
+
+class Instrumentations(Instrumentation):
+    """Calls several instrumentations, ignoring their errors"""
+
+    def __init__(self, instrumentations):
+        self.instrumentations = list(instrumentations)
+
+    @classmethod
+    def coerce(cls, instrumentation) -> "Instrumentation | None":
+        """Returns an Instrumentation from an instrumentation, a list of them,
+        or None"""
+        if instrumentation is None or isinstance(instrumentation, Instrumentations):
+            return instrumentation
+        if isinstance(instrumentation, Instrumentation):
+            return cls([instrumentation])
+        return cls(instrumentation)
+
+    def _call(self, hook, *args):
+        for instrumentation in self.instrumentations:
+            try:
+                getattr(instrumentation, hook)(*args)
+            except Exception:
+                pass
+
+    def before_request(self, info: RequestInfo):
+        self._call("before_request", info)
+
+    def after_request(self, info: RequestInfo):
+        self._call("after_request", info)
+
+    def on_retry(self, info: RequestInfo, delay: float):
+        self._call("on_retry", info, delay)
+
+    def on_token(self, grant_type: str, latency: float, error: Exception | None):
+        self._call("on_token", grant_type, latency, error)
+
+
+class StructlogInstrumentation(Instrumentation):
+    """Logs every request, retry and token request with structlog"""
+
+    def __init__(self, logger=None):
+        self.logger = logger or structlog.get_logger("pyakeneo")
+
+    def after_request(self, info: RequestInfo):
+        fields = info.as_dict()
+        fields["error"] = repr(info.error) if info.error else None
+        if info.error or (info.status and info.status >= 400):
+            self.logger.warning("akeneo.request", **fields)
+        else:
+            self.logger.info("akeneo.request", **fields)
+
+    def on_retry(self, info: RequestInfo, delay: float):
+        self.logger.warning(
+            "akeneo.retry",
+            method=info.method,
+            url_template=info.url_template,
+            status=info.status,
+            error=repr(info.error) if info.error else None,
+            retries=info.retries,
+            delay=delay,
+        )
+
+    def on_token(self, grant_type: str, latency: float, error: Exception | None):
+        log = self.logger.warning if error else self.logger.info
+        log(
+            "akeneo.token",
+            grant_type=grant_type,
+            latency=latency,
+            error=repr(error) if error else None,
+        )
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """
+    Exposes Prometheus metrics, with prometheus_client
+    (https://github.com/prometheus/client_python):
+    - <namespace>_requests_total{method, pool, url_template, status}
+    - <namespace>_request_duration_seconds{method, pool, url_template}
+    - <namespace>_request_bytes_total and _response_bytes_total{method, pool},
+      on the wire
+    - <namespace>_request_decoded_bytes_total and
+      _response_decoded_bytes_total{method, pool}, once decompressed
+    - <namespace>_retries_total{method, pool, status}
+    - <namespace>_token_requests_total{grant_type, outcome}
+    """
+
+    def __init__(self, namespace: str = "pyakeneo", registry=None):
+        import prometheus_client
+
+        kwargs = {"namespace": namespace}
+        if registry is not None:
+            kwargs["registry"] = registry
+        self.requests = prometheus_client.Counter(
+            "requests_total",
+            "Requests made to the Akeneo API",
+            ["method", "pool", "url_template", "status"],
+            **kwargs
+        )
+        self.duration = prometheus_client.Histogram(
+            "request_duration_seconds",
+            "Time to receive the response of Akeneo API requests",
+            ["method", "pool", "url_template"],
+            **kwargs
+        )
+        self.request_bytes = prometheus_client.Counter(
+            "request_bytes_total",
+            "Bytes sent to the Akeneo API",
+            ["method", "pool"],
+            **kwargs
+        )
+        self.response_bytes = prometheus_client.Counter(
+            "response_bytes_total",
+            "Bytes received from the Akeneo API",
+            ["method", "pool"],
+            **kwargs
+        )
+        self.request_decoded_bytes = prometheus_client.Counter(
+            "request_decoded_bytes_total",
+            "Bytes sent to the Akeneo API, before compression",
+            ["method", "pool"],
+            **kwargs
+        )
+        self.response_decoded_bytes = prometheus_client.Counter(
+            "response_decoded_bytes_total",
+            "Bytes received from the Akeneo API, after decompression",
+            ["method", "pool"],
+            **kwargs
+        )
+        self.retries = prometheus_client.Counter(
+            "retries_total",
+            "Akeneo API requests retried",
+            ["method", "pool", "status"],
+            **kwargs
+        )
+        self.tokens = prometheus_client.Counter(
+            "token_requests_total",
+            "Akeneo API tokens requested",
+            ["grant_type", "outcome"],
+            **kwargs
+        )
+
+    def after_request(self, info: RequestInfo):
+        status = str(info.status) if info.status else "error"
+        self.requests.labels(info.method, info.pool, info.url_template, status).inc()
+        if info.latency is not None:
+            self.duration.labels(info.method, info.pool, info.url_template).observe(
+                info.latency
+            )
+        if info.request_bytes:
+            self.request_bytes.labels(info.method, info.pool).inc(info.request_bytes)
+        if info.response_bytes:
+            self.response_bytes.labels(info.method, info.pool).inc(info.response_bytes)
+        if info.request_decoded_bytes:
+            self.request_decoded_bytes.labels(info.method, info.pool).inc(
+                info.request_decoded_bytes
+            )
+        if info.response_decoded_bytes:
+            self.response_decoded_bytes.labels(info.method, info.pool).inc(
+                info.response_decoded_bytes
+            )
+
+    def on_retry(self, info: RequestInfo, delay: float):
+        status = str(info.status) if info.status else "error"
+        self.retries.labels(info.method, info.pool, status).inc()
+
+    def on_token(self, grant_type: str, latency: float, error: Exception | None):
+        self.tokens.labels(grant_type, "error" if error else "success").inc()
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """Traces every request in an OpenTelemetry span
+    (https://opentelemetry.io/docs/languages/python/)"""
+
+    def __init__(self, tracer=None):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("pyakeneo")
+
+    def before_request(self, info: RequestInfo):
+        span = self.tracer.start_span(
+            "{0} {1}".format(info.method, info.url_template),
+            kind=self._trace.SpanKind.CLIENT,
+            attributes={
+                "http.request.method": info.method,
+                "url.full": info.url,
+                "url.template": info.url_template,
+                "akeneo.pool": info.pool,
+            },
+        )
+        info.context["otel_span"] = span
+
+    def on_retry(self, info: RequestInfo, delay: float):
+        span = info.context.get("otel_span")
+        if span is not None:
+            span.add_event(
+                "retry",
+                {"http.response.status_code": info.status or 0, "delay": delay},
+            )
+
+    def after_request(self, info: RequestInfo):
+        span = info.context.pop("otel_span", None)
+        if span is None:
+            return
+        if info.status is not None:
+            span.set_attribute("http.response.status_code", info.status)
+        span.set_attribute("http.request.resend_count", info.retries)
+        if info.request_bytes is not None:
+            span.set_attribute("http.request.body.size", info.request_bytes)
+        if info.response_bytes is not None:
+            span.set_attribute("http.response.body.size", info.response_bytes)
+        if info.error is not None:
+            span.record_exception(info.error)
+        if info.error is not None or (info.status or 0) >= 500:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end()
+
+    def on_token(self, grant_type: str, latency: float, error: Exception | None):
+        span = self._trace.get_current_span()
+        span.add_event("akeneo.token", {"grant_type": grant_type, "latency": latency})
@@ -6,10 +6,15 @@ class GettableResourceInterface(abc.ABC):
     def fetch_item(self, code_or_item, args=None):
         pass
 
+    def fetch_items(self, codes, args=None, max_workers=8, ordered=True):
+        pass
+
 
 class ListableResourceInterface(abc.ABC):
     @abc.abstractmethod
-    def fetch_list(self, args=None):
+    def fetch_list(
+        self, args=None, prefetch=0, resume_from=None, stream=False, item_class=None
+    ):
         pass
 
 
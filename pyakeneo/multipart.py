@@ -0,0 +1,85 @@
+"""
+Streaming multipart/form-data encoder, used to upload media files without
+loading them in memory.
+"""
+import mimetypes
+import os
+import uuid
+
+
+class MultipartStream(object):
+    """
+    File-like multipart/form-data body, read by requests while it is being
+    sent. Its length is known beforehand, so that the request has a
+    Content-Length instead of being chunked.
+    fields are (name, value) pairs. A value is either a string, or a
+    (filename, file object, content type) tuple; files are read from their
+    current position, and must be seekable.
+    """
+
+    def __init__(self, fields: list[tuple]):
+        self.boundary = uuid.uuid4().hex
+        self._parts = []
+        for name, value in fields:
+            if isinstance(value, tuple):
+                filename, fileobj, content_type = value
+                header = (
+                    '--{0}\r\nContent-Disposition: form-data; name="{1}"; '
+                    'filename="{2}"\r\nContent-Type: {3}\r\n\r\n'.format(
+                        self.boundary, name, filename, content_type
+                    )
+                )
+                self._parts.append(header.encode("utf-8"))
+                self._parts.append(fileobj)
+                self._parts.append(b"\r\n")
+            else:
+                part = (
+                    '--{0}\r\nContent-Disposition: form-data; name="{1}"'
+                    "\r\n\r\n{2}\r\n".format(self.boundary, name, value)
+                )
+                self._parts.append(part.encode("utf-8"))
+        self._parts.append("--{0}--\r\n".format(self.boundary).encode("utf-8"))
+        self._length = sum(self._part_length(part) for part in self._parts)
+        self._current = 0
+        self._offset = 0
+
+    @property
+    def content_type(self) -> str:
+        return "multipart/form-data; boundary={0}".format(self.boundary)
+
+    @staticmethod
+    def _part_length(part) -> int:
+        if isinstance(part, bytes):
+            return len(part)
+        position = part.tell()
+        end = part.seek(0, os.SEEK_END)
+        part.seek(position)
+        return end - position
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        while self._current < len(self._parts) and size != 0:
+            part = self._parts[self._current]
+            if isinstance(part, bytes):
+                end = len(part) if size < 0 else self._offset + size
+                chunk = part[self._offset : end]
+                self._offset += len(chunk)
+                if self._offset >= len(part):
+                    self._current += 1
+                    self._offset = 0
+            else:
+                chunk = part.read(size)
+                if not chunk:
+                    self._current += 1
+                    continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b"".join(chunks)
+
+
+def guess_content_type(filename: str) -> str:
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
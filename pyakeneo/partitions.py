@@ -0,0 +1,68 @@
+"""
+Builders of disjoint search filters splitting a listing into slices, to be
+scanned in parallel (see ParallelScanResource.scan_parallel).
+https://api.akeneo.com/documentation/filter.html
+"""
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Sequence
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def as_utc(date: datetime) -> datetime:
+    """Returns date as a naive datetime in UTC, the timezone of the dates
+    of Akeneo filters. Naive dates are taken as UTC already."""
+    if date.tzinfo is None:
+        return date
+    return date.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def merge_search(search: Dict | None, partition: Dict) -> Dict:
+    """Returns the search filters restricted to the given partition."""
+    merged = {key: list(filters) for key, filters in (search or {}).items()}
+    for key, filters in partition.items():
+        merged[key] = merged.get(key, []) + list(filters)
+    return merged
+
+
+def by_updated(start: datetime, end: datetime, partitions: int) -> List[Dict]:
+    """Splits the items in partitions of equal `updated` date ranges between
+    start and end. The first and the last partitions are left open, so that
+    together they cover all the items."""
+    if partitions < 1:
+        raise ValueError("Expected at least one partition, {0} provided".format(partitions))
+    if end <= start:
+        raise ValueError("end is expected to be after start")
+    step = (end - start) / partitions
+    bounds = [start + step * i for i in range(1, partitions)]
+    result = []
+    for i in range(partitions):
+        filters = []
+        if i > 0:
+            # dates have a one second precision, and ">" is strict
+            lower = bounds[i - 1] - timedelta(seconds=1)
+            filters.append({"operator": ">", "value": lower.strftime(DATE_FORMAT)})
+        if i < partitions - 1:
+            filters.append({"operator": "<", "value": bounds[i].strftime(DATE_FORMAT)})
+        result.append({"updated": filters} if filters else {})
+    return result
+
+
+def by_codes(field: str, codes: Sequence[str], partitions: int) -> List[Dict]:
+    """Splits the items in partitions by the given codes (eg family or
+    categories), each partition filtering on a share of them."""
+    if partitions < 1:
+        raise ValueError("Expected at least one partition, {0} provided".format(partitions))
+    size = math.ceil(len(codes) / partitions) or 1
+    return [
+        {field: [{"operator": "IN", "value": list(codes[i : i + size])}]}
+        for i in range(0, len(codes), size)
+    ]
+
+
+def by_family(codes: Sequence[str], partitions: int) -> List[Dict]:
+    """Splits the items by family. Items without family are not included."""
+    return by_codes("family", codes, partitions)
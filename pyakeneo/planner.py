@@ -0,0 +1,164 @@
+"""
+Dependency graph between the resources of a catalog, to write them in an
+order where every item only refers to items written before it, while the
+resources which don't depend on each other are written at once.
+
+    from pyakeneo.planner import ResourcePlan
+    plan = ResourcePlan(["products", "families", "attributes", "categories"])
+    plan.levels()  # [["attributes", "categories"], ["families"], ["products"]]
+    results = plan.run(sync_resource, max_workers=4)
+
+A resource starts as soon as the resources it depends on are done, without
+waiting for the rest of their level.
+"""
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable
+
+# What the items of every resource refer to. Attribute options and family
+# variants are nested in attributes and families.
+DEPENDENCIES = {
+    "attribute_groups": (),
+    "attributes": ("attribute_groups",),
+    "attribute_options": ("attributes",),
+    "association_types": (),
+    "categories": (),
+    "channels": ("categories",),
+    "families": ("attributes", "channels"),
+    "family_variants": ("families",),
+    "product_models": (
+        "families",
+        "family_variants",
+        "attribute_options",
+        "categories",
+        "association_types",
+    ),
+    "products": (
+        "families",
+        "product_models",
+        "attribute_options",
+        "categories",
+        "association_types",
+    ),
+}
+
+NodeResult = namedtuple("NodeResult", ["resource", "result", "error"])
+NodeResult.__doc__ = """Outcome of a resource of ResourcePlan.run: either the
+value returned for the resource, or the error raised (a DependencyError if it
+was skipped)."""
+
+
+class DependencyError(Exception):
+    """Raised for the resources skipped because a dependency failed"""
+
+    def __init__(self, resource: str, dependency: str):
+        super(DependencyError, self).__init__(
+            "{0} skipped: {1} failed".format(resource, dependency)
+        )
+        self.resource = resource
+        self.dependency = dependency
+
+
+class ResourcePlan(object):
+    """
+    Orders resources (named as in DEPENDENCIES) by their dependencies. The
+    dependencies on resources missing from the plan go through them: the
+    products still come after the families when there are no product models.
+    Resources unknown to dependencies depend on nothing.
+    """
+
+    def __init__(
+        self, resources: Iterable[str], dependencies: dict[str, Iterable] | None = None
+    ):
+        self.resources = list(dict.fromkeys(resources))
+        self.dependencies = {
+            resource: self._dependencies_of(resource, dependencies or DEPENDENCIES)
+            for resource in self.resources
+        }
+
+    def _dependencies_of(self, resource: str, dependencies: dict) -> tuple:
+        """Returns the nearest resources of the plan resource depends on"""
+        found = []
+        seen = set()
+        stack = list(dependencies.get(resource, ()))
+        while stack:
+            dependency = stack.pop()
+            if dependency in seen or dependency == resource:
+                continue
+            seen.add(dependency)
+            if dependency in self.resources:
+                found.append(dependency)
+            else:
+                stack.extend(dependencies.get(dependency, ()))
+        return tuple(sorted(found, key=self.resources.index))
+
+    def levels(self) -> list[list[str]]:
+        """Returns the resources by level: the first level depends on
+        nothing, and every other on the previous ones only"""
+        levels = []
+        placed = set()
+        remaining = list(self.resources)
+        while remaining:
+            level = [
+                resource
+                for resource in remaining
+                if placed.issuperset(self.dependencies[resource])
+            ]
+            if not level:
+                raise ValueError(
+                    "Circular dependencies between {0}".format(", ".join(remaining))
+                )
+            levels.append(level)
+            placed.update(level)
+            remaining = [resource for resource in remaining if resource not in placed]
+        return levels
+
+    def order(self) -> list[str]:
+        """Returns the resources in an order respecting their dependencies"""
+        return [resource for level in self.levels() for resource in level]
+
+    def run(self, fn: Callable, max_workers: int = 4) -> dict[str, NodeResult]:
+        """
+        Calls fn(resource) for every resource over a pool of threads, as soon
+        as the resources it depends on are done. The resources depending on
+        one which failed are skipped. Returns the NodeResult of every
+        resource, in order.
+        """
+        order = self.order()
+        waiting = {resource: set(self.dependencies[resource]) for resource in order}
+        results = {}
+        running = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+            def submit_ready():
+                for resource in order:
+                    if resource in waiting and not waiting[resource]:
+                        del waiting[resource]
+                        running[executor.submit(fn, resource)] = resource
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    resource = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        results[resource] = NodeResult(resource, future.result(), None)
+                        for dependencies in waiting.values():
+                            dependencies.discard(resource)
+                    else:
+                        results[resource] = NodeResult(resource, None, error)
+                        self._skip_dependents(resource, waiting, results)
+                submit_ready()
+        return {resource: results[resource] for resource in order}
+
+    @staticmethod
+    def _skip_dependents(failed: str, waiting: dict, results: dict):
+        failures = [failed]
+        while failures:
+            failed = failures.pop()
+            for resource in [r for r, deps in waiting.items() if failed in deps]:
+                del waiting[resource]
+                error = DependencyError(resource, failed)
+                results[resource] = NodeResult(resource, None, error)
+                failures.append(resource)
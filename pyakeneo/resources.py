@@ -1,48 +1,285 @@
-import json
+import functools
 import math
+import os
+import queue
+import threading
 
 
-from typing import Any
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable
 from pyakeneo import interfaces
-from pyakeneo.result import Result
+from pyakeneo.batching import BatchEncoder
+from pyakeneo.cache import CachingSession, ResponseCache
+from pyakeneo.codec import JSONCodec, get_codec
+from pyakeneo.compact import CompactItem
+from pyakeneo import partitions as partitioning
+from pyakeneo.multipart import MultipartStream, guess_content_type
+from pyakeneo.result import Cursor, Result, StreamingResult
 from pyakeneo.utils import urljoin
+from pyakeneo.utils import concurrent_map
 from pyakeneo.utils import serialize_structured_params
 
+ItemResult = namedtuple("ItemResult", ["code", "item", "error"])
+ItemResult.__doc__ = """Outcome of fetching one item of fetch_items: either
+the item (as a dict) or the error raised while fetching it."""
+
 
 class CreatableResource(interfaces.CreatableResourceInterface):
     def create_item(self, item):
         url = self._endpoint
-        r = self._session.post(url, data=json.dumps(item, separators=(",", ":")))
+        r = self._session.post(url, data=self._codec.dumps(item))
 
         r.raise_for_status()
 
 
 class ListableResource(interfaces.ListableResourceInterface):
-    def fetch_list(self, args=None):
+    def fetch_list(
+        self,
+        args=None,
+        prefetch: int = 0,
+        resume_from=None,
+        stream: bool = False,
+        item_class: Callable | None = None,
+    ):
         """Send a request with search, etc.
-        Returns an iterable list (Collection)"""
+        Returns an iterable list (Collection)
+
+        With prefetch > 0, up to that many next pages are downloaded in the
+        background while the current one is being iterated.
+        With resume_from, a Cursor (see Result.get_cursor), the listing
+        resumes from the page it points to, and args are ignored.
+        With stream, items are decoded one by one while pages are being
+        downloaded (see StreamingResult). It can't be used with prefetch.
+        With item_class, items are built by item_class(item) instead of
+        being dicts, eg pyakeneo.compact.CompactProduct to hold many products
+        in less memory. CompactItem classes are given the codec of the pool
+        too."""
+        if stream and prefetch:
+            raise ValueError("Streamed pages can't be prefetched")
+        if isinstance(item_class, type) and issubclass(item_class, CompactItem):
+            item_class = functools.partial(item_class, codec=self._codec)
+
+        if resume_from:
+            if stream:
+                link = Cursor.coerce(resume_from).link
+                return StreamingResult.from_link(self._session, link, item_class)
+            return Result.from_cursor(
+                self._session,
+                resume_from,
+                prefetch=prefetch,
+                codec=self._codec,
+                item_class=item_class,
+            )
+
         if args:
             args = serialize_structured_params(params=args)
 
         url = self._endpoint
+        if stream:
+            r = self._session.get(url, params=args, stream=True)
+            r.raise_for_status()
+            return StreamingResult(self._session, r, item_class)
+
         r = self._session.get(url, params=args)
         r.raise_for_status()
 
-        c = Result.from_json_text(self._session, json_text=r.text)
+        c = Result.from_json_text(
+            self._session,
+            json_text=r.content,
+            prefetch=prefetch,
+            codec=self._codec,
+            item_class=item_class,
+        )
         return c
 
 
 class SearchAfterListableResource(ListableResource):
-    def fetch_list(self, args=None):
+    def fetch_list(
+        self,
+        args=None,
+        prefetch: int = 0,
+        resume_from=None,
+        stream: bool = False,
+        item_class: Callable | None = None,
+    ):
         """Send a request with search, etc.
         Returns an iterable list (Collection)"""
+        if resume_from:
+            return super(SearchAfterListableResource, self).fetch_list(
+                prefetch=prefetch,
+                resume_from=resume_from,
+                stream=stream,
+                item_class=item_class,
+            )
+
         params = args
         if not params:
             params = {"pagination_type": "search_after"}
         elif "pagination_type" not in params:
             params["pagination_type"] = "search_after"
 
-        return super(SearchAfterListableResource, self).fetch_list(params)
+        return super(SearchAfterListableResource, self).fetch_list(
+            params, prefetch=prefetch, stream=stream, item_class=item_class
+        )
+
+
+class ParallelScanResource(SearchAfterListableResource):
+    _END = object()
+
+    def scan_parallel(
+        self,
+        partitions: int | list[dict],
+        search: dict | None = None,
+        args: dict[str, Any] | None = None,
+        max_workers: int | None = None,
+        buffer_size: int = 1000,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ):
+        """Iterates over the items matching search by scanning disjoint
+        partitions of them at once, each with its own search_after cursor.
+        partitions are search filters, see pyakeneo.partitions to build them
+        (eg by_updated or by_family). If partitions is a number, items are
+        split in that many ranges of `updated` dates between since and until
+        (now by default), converted to UTC like in changes_since. An item
+        updated during the scan may then be yielded twice: from its former
+        range, and from the last one, which has no upper bound. Items are
+        yielded as soon as they are received, so their order is not
+        deterministic. At most buffer_size items are held waiting for the
+        consumer."""
+        if isinstance(partitions, int):
+            if not since:
+                raise ValueError("since is required to split items by date")
+            partitions = partitioning.by_updated(
+                partitioning.as_utc(since),
+                partitioning.as_utc(until or datetime.now(timezone.utc)),
+                partitions,
+            )
+
+        items = queue.Queue(maxsize=buffer_size)
+        stopped = threading.Event()
+
+        def put(value):
+            while not stopped.is_set():
+                try:
+                    items.put(value, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def scan(partition):
+            try:
+                params = dict(args or {})
+                params["search"] = partitioning.merge_search(search, partition)
+                for item in self.fetch_list(params):
+                    if not put(item):
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                put(self._END)
+
+        semaphore = threading.Semaphore(max_workers or len(partitions))
+
+        def run(partition):
+            with semaphore:
+                if not stopped.is_set():
+                    scan(partition)
+
+        threads = [
+            threading.Thread(
+                target=run, args=(partition,), name="pyakeneo-scan", daemon=True
+            )
+            for partition in partitions
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            remaining = len(threads)
+            while remaining:
+                value = items.get()
+                if value is self._END:
+                    remaining -= 1
+                elif isinstance(value, Exception):
+                    raise value
+                else:
+                    yield value
+        finally:
+            stopped.set()
+
+
+class Changes(object):
+    """
+    Items changed since a checkpoint, as returned by changes_since.
+    Each item is yielded once, even if it is updated again (and so moved)
+    during the scan. Once the iteration is over, `checkpoint` should be saved
+    and given to the next changes_since call.
+    """
+
+    def __init__(self, items: Iterable, checkpoint: str, get_code):
+        self._items = items
+        self._checkpoint = checkpoint
+        self._get_code = get_code
+        self._count = 0
+
+    @property
+    def checkpoint(self) -> str:
+        return self._checkpoint
+
+    @property
+    def count(self) -> int:
+        """Number of distinct items yielded so far"""
+        return self._count
+
+    def __iter__(self):
+        seen = set()
+        for item in self._items:
+            code = self._get_code(item)
+            if code in seen:
+                continue
+            seen.add(code)
+            self._count += 1
+            yield item
+
+
+class UpdatedSinceResource(SearchAfterListableResource):
+    def changes_since(
+        self,
+        checkpoint: str | datetime | None = None,
+        search: dict | None = None,
+        args: dict[str, Any] | None = None,
+        overlap: int = 1,
+        prefetch: int = 0,
+    ) -> Changes:
+        """Returns the items updated since the checkpoint (all the items if
+        checkpoint is None), as Changes whose checkpoint is to be used for
+        the next call. Dates are in UTC, with a one second precision: items
+        updated within `overlap` seconds before the checkpoint are returned
+        again rather than missed. Aware datetimes are converted to UTC,
+        naive ones are taken as UTC."""
+        next_checkpoint = datetime.now(timezone.utc).strftime(
+            partitioning.DATE_FORMAT
+        )
+
+        params = dict(args or {})
+        search = {key: list(filters) for key, filters in (search or {}).items()}
+        if checkpoint:
+            if isinstance(checkpoint, str):
+                checkpoint = datetime.strptime(checkpoint, partitioning.DATE_FORMAT)
+            else:
+                checkpoint = partitioning.as_utc(checkpoint)
+            since = checkpoint - timedelta(seconds=overlap)
+            search.setdefault("updated", []).append(
+                {"operator": ">", "value": since.strftime(partitioning.DATE_FORMAT)}
+            )
+        if search:
+            params["search"] = search
+
+        items = self.fetch_list(params, prefetch=prefetch)
+        return Changes(items, next_checkpoint, self.get_code)
 
 
 class GettableResource(interfaces.GettableResourceInterface):
@@ -61,7 +298,86 @@ class GettableResource(interfaces.GettableResourceInterface):
         r = self._session.get(url, params=args)
         r.raise_for_status()
 
-        return json.loads(r.text)  # returns item as a dict
+        return self._codec.loads(r.content)  # returns item as a dict
+
+    def fetch_items(
+        self,
+        codes: Iterable,
+        args: dict[str, Any] | None = None,
+        max_workers: int = 8,
+        ordered: bool = True,
+    ):
+        """Fetches many items, sending up to max_workers requests at once.
+        Yields an ItemResult per code, in input order if ordered is True, or
+        as soon as it is fetched otherwise. A failure (eg 404) is reported
+        in the error field of its ItemResult instead of being raised."""
+        results = concurrent_map(
+            lambda code: self.fetch_item(code, args),
+            codes,
+            max_workers=max_workers,
+            ordered=ordered,
+        )
+        for code, future in results:
+            error = future.exception()
+            yield ItemResult(code, None if error else future.result(), error)
+
+
+class SearchableByIdentifierResource(GettableResource):
+    IDENTIFIER_FILTER = "identifier"
+    MAX_SEARCH_BATCH = 100
+
+    def fetch_items(
+        self,
+        codes: Iterable,
+        args: dict[str, Any] | None = None,
+        max_workers: int = 8,
+        ordered: bool = True,
+        batch_size: int | None = None,
+    ):
+        """Fetches many items, see GettableResource.fetch_items.
+        With batch_size, codes are grouped into search requests filtering on
+        up to batch_size identifiers at once instead of one GET per code.
+        Codes unknown to the server are then reported with a KeyError."""
+        if not batch_size:
+            yield from super(SearchableByIdentifierResource, self).fetch_items(
+                codes, args=args, max_workers=max_workers, ordered=ordered
+            )
+            return
+
+        batch_size = min(batch_size, self.MAX_SEARCH_BATCH)
+
+        def batches():
+            batch = []
+            for code in codes:
+                code = code if isinstance(code, str) else self.get_code(code)
+                batch.append(code)
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        def search(batch):
+            params = dict(args or {})
+            params["search"] = {
+                self.IDENTIFIER_FILTER: [{"operator": "IN", "value": batch}]
+            }
+            params["limit"] = len(batch)
+            return {self.get_code(item): item for item in self.fetch_list(params)}
+
+        results = concurrent_map(
+            search, batches(), max_workers=max_workers, ordered=ordered
+        )
+        for batch, future in results:
+            error = future.exception()
+            found = {} if error else future.result()
+            for code in batch:
+                if error:
+                    yield ItemResult(code, None, error)
+                elif code in found:
+                    yield ItemResult(code, found[code], None)
+                else:
+                    yield ItemResult(code, None, KeyError(code))
 
 
 class DeletableResource(interfaces.DeletableResourceInterface):
@@ -84,50 +400,82 @@ class UpdatableResource(interfaces.UpdatableResourceInterface):
             code = self.get_code(item_values)
 
         url = urljoin(self._endpoint, code)
-        r = self._session.patch(
-            url, data=json.dumps(item_values, separators=(",", ":"))
-        )
+        r = self._session.patch(url, data=self._codec.dumps(item_values))
         r.raise_for_status()
 
         return r.headers.get("Location")
 
 
 class UpdatableListResource(interfaces.UpdatableResourceInterface):
-    def update_create_list(self, items, code=None):
-        url = self._endpoint
-        data = ""
-        for item in items:
-            data += json.dumps(item, separators=(",", ":")) + "\n"
-        r = self._session.patch(
-            url,
-            data=data,
-            headers={"Content-type": "application/vnd.akeneo.collection+json"},
+    MAX_ITEMS_PER_REQUEST = 100
+    # Akeneo rejects the lines (items) longer than that, in characters
+    MAX_LINE_SIZE = 1000000
+    # Bodies are packed up to that many bytes, if set. Otherwise, batches
+    # are only split once the server answers them with a 413.
+    MAX_REQUEST_SIZE = None
+    COLLECTION_CONTENT_TYPE = "application/vnd.akeneo.collection+json"
+
+    def update_create_list(self, items, code=None, max_workers: int = 1):
+        """Creates or updates the given items. Returns the list of statuses
+        returned by the server, one per item, in the order of the items.
+        All the items are encoded before the first chunk is sent, so that an
+        item longer than MAX_LINE_SIZE raises an ItemTooLargeError before
+        anything is written. See iter_update_create_list to stream items."""
+        batches = list(self.batch_encoder().batches(items))
+        return list(self._patch_batches(batches, max_workers, ordered=True))
+
+    def iter_update_create_list(
+        self, items: Iterable, max_workers: int = 4, ordered: bool = True
+    ):
+        """Creates or updates the given items, that may be any iterable.
+        Items are sent by chunks of MAX_ITEMS_PER_REQUEST, up to max_workers
+        chunks at once. Yields the status of each item as soon as its chunk
+        has been processed, in the order of the items if ordered is True.
+        Items are encoded as they are sent: an item longer than MAX_LINE_SIZE
+        raises an ItemTooLargeError once it is reached, when the chunks
+        before it may have been sent already."""
+        return self._patch_batches(
+            self.batch_encoder().batches(items), max_workers, ordered
         )
 
-        if r.status_code == 413:
-            # TODO handle 413
-            # Request Entity Too Large
-            # There are too many resources to process (max 100)
-            # =>>>>> or the line of JSON is too long (max 1 000 000 characters)
-            # split the list in several chunks
-            num = 100
-            n = math.ceil(len(items) / num)
+    def _patch_batches(self, batches: Iterable, max_workers: int, ordered: bool):
+        results = concurrent_map(
+            self._patch_lines, batches, max_workers=max_workers, ordered=ordered
+        )
+        for _, future in results:
+            yield from future.result()
+
+    def batch_encoder(self) -> BatchEncoder:
+        """Returns the BatchEncoder packing items to the limits of the pool"""
+        return BatchEncoder(
+            self._codec,
+            max_items=self.MAX_ITEMS_PER_REQUEST,
+            max_line_size=self.MAX_LINE_SIZE,
+            max_batch_size=self.MAX_REQUEST_SIZE,
+            get_code=self.get_code,
+        )
+
+    @staticmethod
+    def chunk_lines(items: Iterable, size: int, codec: JSONCodec | None = None):
+        """Encodes items as NDJSON lines, grouped in lists of size lines."""
+        return BatchEncoder(codec, max_items=size).batches(items)
 
-            itemss = [items[i : i + num] for i in range(0, (n - 1) * num, num)]
-            itemss.append(items[(n - 1) * num :])
+    def _patch_lines(self, lines):
+        r = self._session.patch(
+            self._endpoint,
+            data=b"".join(lines),
+            headers={"Content-type": self.COLLECTION_CONTENT_TYPE},
+        )
 
-            return [
-                item
-                for those_items in itemss
-                for item in self.update_create_list(those_items)
-            ]
+        if r.status_code == 413 and len(lines) > 1:
+            # Request Entity Too Large: the server accepts less than we
+            # expected, so split the chunk in two
+            half = math.ceil(len(lines) / 2)
+            return self._patch_lines(lines[:half]) + self._patch_lines(lines[half:])
 
         r.raise_for_status()
 
-        statuses = []
-        for line in r.text.split("\n"):
-            statuses.append(json.loads(line))
-        return statuses
+        return [self._codec.loads(line) for line in r.content.split(b"\n") if line]
 
 
 class IdentifierBasedResource(interfaces.CodeBasedResourceInterface):
@@ -145,22 +493,60 @@ class EnterpriseEditionResource:
 
 
 class ResourcePool:
-    def __init__(self, endpoint, session):
-        """Initialize the ResourcePool to the given endpoint. Eg: products"""
+    # Name of the pool in ResponseCache.ttls. Only the pools having one
+    # (the reference data) are cached.
+    CACHE_NAME = None
+
+    def __init__(
+        self,
+        endpoint,
+        session,
+        codec: JSONCodec | None = None,
+        cache: ResponseCache | None = None,
+    ):
+        """Initialize the ResourcePool to the given endpoint. Eg: products
+        codec is the JSONCodec (or its name) of request and response bodies.
+        cache is the ResponseCache of the reference data pools (none by
+        default)."""
         self._endpoint = endpoint
+        self._codec = get_codec(codec)
+        self._cache = cache
+        if cache is not None and self.CACHE_NAME:
+            session = CachingSession(
+                session, cache, endpoint, cache.ttl_for(self.CACHE_NAME)
+            )
         self._session = session
 
     def get_url(self):
         return self._endpoint
 
+    def invalidate_cache(self):
+        """Drops the cached responses of this pool (and of its sub-pools)"""
+        if self._cache is not None:
+            self._cache.invalidate(self._endpoint)
+
+    def _make_sub_pool(self, pool_class, *path):
+        """Returns a pool of pool_class nested in this one, eg the variants
+        of a family, sharing its session and configuration."""
+        session = self._session
+        if isinstance(session, CachingSession):
+            session = session.session
+        return pool_class(
+            urljoin(self._endpoint, *path),
+            session,
+            codec=self._codec,
+            cache=self._cache,
+        )
+
 
 class ProductsPool(
     ResourcePool,
     IdentifierBasedResource,
     CreatableResource,
     DeletableResource,
-    GettableResource,
-    SearchAfterListableResource,
+    SearchableByIdentifierResource,
+    ParallelScanResource,
+    UpdatedSinceResource,
     UpdatableResource,
     UpdatableListResource,
 ):
@@ -172,11 +558,13 @@ class ProductsPool(
 
 class ProductModelsPool(
     ResourcePool,
-    IdentifierBasedResource,
+    CodeBasedResource,
     CreatableResource,
     GettableResource,
-    SearchAfterListableResource,
+    ParallelScanResource,
+    UpdatedSinceResource,
     UpdatableResource,
+    UpdatableListResource,
 ):
     """https://api.akeneo.com/api-reference.html#Productmodel"""
 
@@ -186,8 +574,8 @@ class ProductModelsPool(
 class PublishedProductsPool(
     ResourcePool,
     IdentifierBasedResource,
-    GettableResource,
-    SearchAfterListableResource,
+    SearchableByIdentifierResource,
+    UpdatedSinceResource,
     EnterpriseEditionResource,
 ):
     """https://api.akeneo.com/api-reference.html#Publishedproduct"""
@@ -206,7 +594,7 @@ class CategoriesPool(
 ):
     """https://api.akeneo.com/api-reference.html#Category"""
 
-    pass
+    CACHE_NAME = "categories"
 
 
 class FamilyVariantsPool(
@@ -215,10 +603,11 @@ class FamilyVariantsPool(
     CreatableResource,
     GettableResource,
     ListableResource,
+    UpdatableListResource,
 ):
     """https://api.akeneo.com/api-reference.html#Familyvariant"""
 
-    pass
+    CACHE_NAME = "family_variants"
 
 
 class FamiliesPool(
@@ -233,10 +622,10 @@ class FamiliesPool(
 ):
     """https://api.akeneo.com/api-reference.html#Family"""
 
+    CACHE_NAME = "families"
+
     def variants(self, code):
-        return FamilyVariantsPool(
-            urljoin(self._endpoint, code, "variants/"), self._session
-        )
+        return self._make_sub_pool(FamilyVariantsPool, code, "variants/")
 
 
 class AttributeOptionsPool(
@@ -246,10 +635,11 @@ class AttributeOptionsPool(
     GettableResource,
     ListableResource,
     UpdatableResource,
+    UpdatableListResource,
 ):
     """https://api.akeneo.com/api-reference.html#Attributeoptions"""
 
-    pass
+    CACHE_NAME = "attribute_options"
 
 
 class AttributesPool(
@@ -263,10 +653,10 @@ class AttributesPool(
 ):
     """https://api.akeneo.com/api-reference.html#Attributes"""
 
+    CACHE_NAME = "attributes"
+
     def options(self, code):
-        return AttributeOptionsPool(
-            urljoin(self._endpoint, code, "options/"), self._session
-        )
+        return self._make_sub_pool(AttributeOptionsPool, code, "options/")
 
 
 class AttributeGroupsPool(
@@ -280,7 +670,7 @@ class AttributeGroupsPool(
 ):
     """https://api.akeneo.com/api-reference.html#Attributegroups"""
 
-    pass
+    CACHE_NAME = "attribute_groups"
 
 
 class MediaFilesPool(
@@ -292,9 +682,110 @@ class MediaFilesPool(
 ):
     """https://api.akeneo.com/api-reference.html#Mediafiles"""
 
-    def download(self, code):
-        # TODO: implement this method
-        raise NotImplementedError()
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+    def download(self, code, dest, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> int:
+        """Downloads the media file into dest, a path or a binary file object,
+        chunk_size bytes at a time. A path is written to a temporary file
+        first, then renamed, so that it never holds a partial download.
+        Returns the number of bytes written."""
+        url = urljoin(self._endpoint, code, "download")
+        r = self._session.get(url, stream=True)
+        try:
+            r.raise_for_status()
+            if hasattr(dest, "write"):
+                return self._write_chunks(r, dest, chunk_size)
+
+            partial = "{0}.part".format(dest)
+            try:
+                with open(partial, "wb") as f:
+                    written = self._write_chunks(r, f, chunk_size)
+                os.replace(partial, dest)
+            except BaseException:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+            return written
+        finally:
+            r.close()
+
+    @staticmethod
+    def _write_chunks(response, f, chunk_size: int) -> int:
+        written = 0
+        for chunk in response.iter_content(chunk_size):
+            f.write(chunk)
+            written += len(chunk)
+        return written
+
+    def download_many(
+        self,
+        codes: Iterable[str],
+        dest_dir: str,
+        max_workers: int = 8,
+        skip_existing: bool = False,
+    ):
+        """Downloads the media files into dest_dir, with up to max_workers
+        downloads at once. As media file codes look like "a/b/c/d/hash_name.jpg",
+        each file is written at dest_dir/code.
+        Yields an ItemResult per code as soon as it is downloaded (or failed),
+        item being the path of the file. With skip_existing, files already
+        in dest_dir are not downloaded again."""
+        root = os.path.abspath(dest_dir)
+
+        def download(code):
+            path = os.path.abspath(os.path.join(root, code))
+            if os.path.commonpath([root, path]) != root or path == root:
+                raise ValueError("Invalid media file code {0}".format(code))
+            if skip_existing and os.path.exists(path):
+                return path
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.download(code, path)
+            return path
+
+        for code, future in concurrent_map(
+            download, codes, max_workers=max_workers, ordered=False
+        ):
+            error = future.exception()
+            yield ItemResult(code, None if error else future.result(), error)
+
+    def upload(
+        self,
+        file,
+        product: dict | None = None,
+        product_model: dict | None = None,
+        filename: str | None = None,
+        content_type: str | None = None,
+    ) -> str:
+        """Uploads a media file, streaming it from file, a path or a seekable
+        binary file object, and returns its code.
+        product ({"identifier", "attribute", "scope", "locale"}) or
+        product_model ({"code", "attribute", "scope", "locale"}) is the value
+        the file is attached to."""
+        if (product is None) == (product_model is None):
+            raise ValueError("Expect either a product or a product model")
+
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, "rb") as f:
+                return self.upload(
+                    f,
+                    product,
+                    product_model,
+                    filename or os.path.basename(file),
+                    content_type,
+                )
+
+        filename = filename or os.path.basename(getattr(file, "name", "file"))
+        if product is not None:
+            field = ("product", self._codec.dumps(product).decode("utf-8"))
+        else:
+            field = ("product_model", self._codec.dumps(product_model).decode("utf-8"))
+        content_type = content_type or guess_content_type(filename)
+        body = MultipartStream([field, ("file", (filename, file, content_type))])
+        r = self._session.post(
+            self._endpoint, data=body, headers={"Content-Type": body.content_type}
+        )
+        r.raise_for_status()
+        return r.headers["Location"].rstrip("/").split("/media-files/", 1)[1]
 
 
 class LocalesPool(
@@ -305,7 +796,7 @@ class LocalesPool(
 ):
     """https://api.akeneo.com/api-reference.html#Locales"""
 
-    pass
+    CACHE_NAME = "locales"
 
 
 class ChannelsPool(
@@ -318,7 +809,7 @@ class ChannelsPool(
 ):
     """https://api.akeneo.com/api-reference.html#Channels"""
 
-    pass
+    CACHE_NAME = "channels"
 
 
 class CurrenciesPool(
@@ -329,7 +820,7 @@ class CurrenciesPool(
 ):
     """https://api.akeneo.com/api-reference.html#Currencies"""
 
-    pass
+    CACHE_NAME = "currencies"
 
 
 class MeasureFamiliesPool(
@@ -340,7 +831,7 @@ class MeasureFamiliesPool(
 ):
     """https://api.akeneo.com/api-reference.html#Measurefamilies"""
 
-    pass
+    CACHE_NAME = "measure_families"
 
 
 class AssociationTypesPool(
@@ -354,7 +845,7 @@ class AssociationTypesPool(
 ):
     """https://api.akeneo.com/api-reference.html#Associationtypes"""
 
-    pass
+    CACHE_NAME = "association_types"
 
 
 class AssetsPool(
@@ -377,7 +868,7 @@ class AssetFamilyPool(
     UpdatableResource,
 ):
     def assets(self, code):
-        return AssetsPool(urljoin(self._endpoint, code, "assets/"), self._session)
+        return self._make_sub_pool(AssetsPool, code, "assets/")
 
 
 class ReferenceEntityRecordPool(
@@ -409,8 +900,8 @@ class ReferenceEntityAttributePool(
     UpdatableResource,
 ):
     def options(self, code):
-        return ReferenceEntityAttributeOptionsPool(
-            urljoin(self._endpoint, code, "options/"), self._session
+        return self._make_sub_pool(
+            ReferenceEntityAttributeOptionsPool, code, "options/"
         )
 
 
@@ -422,11 +913,9 @@ class ReferenceEntityPool(
     UpdatableResource,
 ):
     def records(self, entity_code):
-        return ReferenceEntityRecordPool(
-            urljoin(self._endpoint, entity_code, "records/"), self._session
-        )
+        return self._make_sub_pool(ReferenceEntityRecordPool, entity_code, "records/")
 
     def attributes(self, entity_code):
-        return ReferenceEntityAttributePool(
-            urljoin(self._endpoint, entity_code, "attributes/"), self._session
+        return self._make_sub_pool(
+            ReferenceEntityAttributePool, entity_code, "attributes/"
         )
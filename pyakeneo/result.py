@@ -1,10 +1,146 @@
 from __future__ import annotations
 
 import json
-from typing import Dict, Iterable
+import queue
+import threading
+from typing import Callable, Dict, Iterable
+from urllib.parse import parse_qsl, urlsplit
 
 import requests
 
+from pyakeneo.codec import JSONCodec, get_codec
+from pyakeneo.streaming import PageStream
+
+
+class Cursor(object):
+    """
+    Position in a paginated listing, that can be saved (eg as json) and used
+    later to resume the listing from that page, with Result.from_cursor or
+    fetch_list(resume_from=...).
+    It wraps the link to the page, which holds all the query parameters
+    (search, limit, search_after token, page number...).
+    """
+
+    def __init__(self, link: str):
+        if not link:
+            raise ValueError("A cursor requires a link to a page")
+        self._link = link
+
+    @property
+    def link(self) -> str:
+        return self._link
+
+    @property
+    def params(self) -> Dict[str, str]:
+        """Query parameters of the page"""
+        return dict(parse_qsl(urlsplit(self._link).query))
+
+    @property
+    def search_after(self) -> str | None:
+        return self.params.get("search_after")
+
+    @property
+    def page(self) -> int | None:
+        page = self.params.get("page")
+        return int(page) if page else None
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"link": self._link}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> "Cursor":
+        return cls(data["link"])
+
+    @classmethod
+    def from_json(cls, json_text: str) -> "Cursor":
+        return cls.from_dict(json.loads(json_text))
+
+    @classmethod
+    def coerce(cls, cursor: "Cursor | dict | str") -> "Cursor":
+        """Returns a Cursor from a Cursor, its dict form or a link"""
+        if isinstance(cursor, Cursor):
+            return cursor
+        if isinstance(cursor, dict):
+            return cls.from_dict(cursor)
+        return cls(cursor)
+
+    def __eq__(self, other):
+        return isinstance(other, Cursor) and other._link == self._link
+
+    def __hash__(self):
+        return hash(self._link)
+
+    def __repr__(self):
+        return "Cursor({0!r})".format(self._link)
+
+
+class _PagePrefetcher(object):
+    """
+    Downloads the pages following a given link on a background thread, so
+    that the next pages are already available once the current one has been
+    consumed. At most `depth` pages are held in memory ahead of the consumer.
+    """
+
+    _END = object()
+
+    def __init__(
+        self,
+        session: requests.Session,
+        link: str,
+        depth: int,
+        codec: JSONCodec,
+        item_class: Callable | None = None,
+    ):
+        self._session = session
+        self._codec = codec
+        self._item_class = item_class
+        self._queue = queue.Queue(maxsize=depth)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(link,), name="pyakeneo-prefetch", daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, value) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, link: str):
+        try:
+            while link and not self._stopped.is_set():
+                page = Result.request_page(
+                    self._session, link, codec=self._codec, item_class=self._item_class
+                )
+                if not self._put(page):
+                    break
+                link = page["link_next"]
+        except Exception as e:
+            self._put(e)
+        finally:
+            self._put(self._END)
+
+    def get(self) -> Dict | None:
+        """Returns the next page, or None once there is no page left.
+        Re-raises any error met by the background thread."""
+        value = self._queue.get()
+        if value is self._END:
+            self._queue.put(self._END)  # any further call reports the end too
+            return None
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def stop(self):
+        self._stopped.set()
+
 
 class Result(object):
     """
@@ -15,6 +151,12 @@ class Result(object):
 
     The next page will be loaded once the user iterated over the whole current page.
     The content of the new page will replace the content of the previous page.
+
+    With `prefetch` > 0, up to `prefetch` next pages are downloaded on a
+    background thread while the current page is being consumed.
+
+    With `item_class`, items are the item_class(item) of the decoded items,
+    eg pyakeneo.compact.CompactProduct.
     """
 
     def __init__(
@@ -26,8 +168,13 @@ class Result(object):
         link_first: str,
         link_next: str,
         link_self: str,
+        prefetch: int = 0,
+        codec: JSONCodec | None = None,
+        item_class: Callable | None = None,
     ):
         self._session = session
+        self._codec = get_codec(codec)
+        self._item_class = item_class
         self._items = items
         self._count = count
         self._link_next = link_next
@@ -37,6 +184,22 @@ class Result(object):
         self._page_iterator = iter(self._items)
         self._reached_the_end = False
 
+        self._prefetcher = None
+        if prefetch > 0 and self._link_next:
+            self._prefetcher = _PagePrefetcher(
+                session, self._link_next, prefetch, self._codec, item_class
+            )
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Stops the background download of the next pages, if any."""
+        prefetcher = getattr(self, "_prefetcher", None)
+        if prefetcher is not None:
+            prefetcher.stop()
+            self._prefetcher = None
+
     def __iter__(self):
         while not self._reached_the_end:
             for item in self._page_iterator:
@@ -57,23 +220,32 @@ class Result(object):
         return self._items
 
     def fetch_next_page(self):
-        """Return True if a next page exists. Returns False otherwise."""
+        """Return True if a next page exists. Returns False otherwise.
+        Throws if the next page could not be fetched."""
+        next_page = None
         if self._link_next:
-            response = self._session.get(self._link_next)
-            if response.ok:
-                next_page = Result.parse_page(json.loads(response.text))
-                self._items = next_page["items"]
-                self._count = next_page["count"]
-                self._link_next = next_page["link_next"]
-                self._link_self = next_page["link_self"]
-                self._link_first = next_page["link_first"]
-
-                self._page_iterator = iter(self._items)
-                self._reached_the_end = False
+            if self._prefetcher is not None:
+                next_page = self._prefetcher.get()
             else:
-                self._reached_the_end = True
+                next_page = Result.request_page(
+                    self._session,
+                    self._link_next,
+                    codec=self._codec,
+                    item_class=self._item_class,
+                )
+
+        if next_page is not None:
+            self._items = next_page["items"]
+            self._count = next_page["count"]
+            self._link_next = next_page["link_next"]
+            self._link_self = next_page["link_self"]
+            self._link_first = next_page["link_first"]
+
+            self._page_iterator = iter(self._items)
+            self._reached_the_end = False
         else:
             self._reached_the_end = True
+            self.close()
         return not self._reached_the_end
 
     def get_count(self):
@@ -88,15 +260,60 @@ class Result(object):
     def get_first_link(self):
         return self._link_first
 
+    def get_cursor(self, current: bool = False) -> Cursor | None:
+        """Returns a Cursor to resume the listing from the next page, or from
+        the current page if current is True. Returns None once there is no
+        page left."""
+        link = self._link_self if current else self._link_next
+        return Cursor(link) if link else None
+
     @classmethod
-    def parse_page(cls, json_data: dict) -> Dict:
+    def from_cursor(
+        cls,
+        session: requests.Session,
+        cursor: Cursor | dict | str,
+        prefetch: int = 0,
+        codec: JSONCodec | None = None,
+        item_class: Callable | None = None,
+    ) -> "Result":
+        """Resumes a listing from the page the given cursor points to."""
+        cursor = Cursor.coerce(cursor)
+        response = session.get(cursor.link)
+        response.raise_for_status()
+        return cls.from_json_text(
+            session,
+            response.content,
+            prefetch=prefetch,
+            codec=codec,
+            item_class=item_class,
+        )
+
+    @classmethod
+    def request_page(
+        cls,
+        session: requests.Session,
+        link: str,
+        codec: JSONCodec | None = None,
+        item_class: Callable | None = None,
+    ) -> Dict:
+        """Downloads and parses the page at the given link.
+        Throws if the server did not answer with a page."""
+        response = session.get(link)
+        response.raise_for_status()
+        return cls.parse_page(get_codec(codec).loads(response.content), item_class)
+
+    @classmethod
+    def parse_page(cls, json_data: dict, item_class: Callable | None = None) -> Dict:
         """Returns (next link, retrieved items, count of items)"""
         final_next_link = None
         next_link = json_data["_links"].get("next")
         if next_link:
             final_next_link = next_link["href"]
+        items = json_data["_embedded"]["items"]
+        if item_class is not None:
+            items = [item_class(item) for item in items]
         return {
-            "items": json_data["_embedded"]["items"],
+            "items": items,
             "count": json_data.get("items_count"),
             "link_first": json_data["_links"]["first"]["href"],
             "link_next": final_next_link,
@@ -104,30 +321,166 @@ class Result(object):
         }
 
     @classmethod
-    def parse_result(cls, session: requests.Session, json_data: dict | list):
+    def parse_result(
+        cls,
+        session: requests.Session,
+        json_data: dict | list,
+        prefetch: int = 0,
+        codec: JSONCodec | None = None,
+        item_class: Callable | None = None,
+    ):
         if cls.is_paginated(json_data):
-            return cls(session, **cls.parse_page(json_data))
+            page = cls.parse_page(json_data, item_class)
         else:
-            return cls(session, **cls.parse_non_paginated(json_data))
+            page = cls.parse_non_paginated(json_data, item_class)
+        return cls(
+            session, prefetch=prefetch, codec=codec, item_class=item_class, **page
+        )
 
-    @staticmethod
-    def from_json_text(session: requests.Session, json_text: str) -> "Result":
-        json_data = json.loads(json_text)
-        return Result.parse_result(session, json_data)
+    @classmethod
+    def from_json_text(
+        cls,
+        session: requests.Session,
+        json_text: str | bytes,
+        prefetch: int = 0,
+        codec: JSONCodec | None = None,
+        item_class: Callable | None = None,
+    ) -> "Result":
+        json_data = get_codec(codec).loads(json_text)
+        return cls.parse_result(
+            session, json_data, prefetch=prefetch, codec=codec, item_class=item_class
+        )
 
     @classmethod
     def is_paginated(cls, json_data: dict | list):
         return isinstance(json_data, dict) and "_links" in json_data
 
     @classmethod
-    def parse_non_paginated(cls, json_data: list) -> Dict:
+    def parse_non_paginated(
+        cls, json_data: list, item_class: Callable | None = None
+    ) -> Dict:
         link_self = ""
         if json_data and "_links" in json_data[0]:
             link_self = json_data[0]["_links"]["self"]["href"]
+        items = json_data
+        if item_class is not None:
+            items = [item_class(item) for item in items]
         return {
-            "items": json_data,
+            "items": items,
             "count": len(json_data),
             "link_first": "",
             "link_next": "",
             "link_self": link_self,
         }
+
+
+class StreamingResult(Result):
+    """
+    Result whose pages are parsed while they are being downloaded: items are
+    decoded one by one from the response, so that memory does not depend on
+    the size of the pages. The links of a page are known once all its items
+    were read, so get_page_items() and the get_*_link() methods load the
+    rest of the current page in memory.
+    """
+
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        session: requests.Session,
+        response: requests.Response,
+        item_class: Callable | None = None,
+    ):
+        super(StreamingResult, self).__init__(
+            session,
+            items=[],
+            count=None,
+            link_first="",
+            link_next="",
+            link_self="",
+            item_class=item_class,
+        )
+        self._load(response)
+
+    def _load(self, response: requests.Response):
+        self._response = response
+        self._stream = PageStream(response.iter_content(self.STREAM_CHUNK_SIZE))
+        self._items = None
+        self._page_iterator = self._stream.items()
+        if self._item_class is not None:
+            self._page_iterator = map(self._item_class, self._page_iterator)
+        self._page_loaded = False
+
+    def _load_links(self, keep_items: bool = True):
+        """Reads the rest of the current page, to know its links"""
+        if self._page_loaded:
+            return
+        if keep_items:
+            self._items = list(self._page_iterator)
+            self._page_iterator = iter(self._items)
+        fields = self._stream.finish()
+        self._response.close()
+        self._page_loaded = True
+
+        if Result.is_paginated(fields):
+            links = fields["_links"]
+            self._link_next = links.get("next", {}).get("href")
+            self._link_self = links["self"]["href"]
+            self._link_first = links["first"]["href"]
+            self._count = fields.get("items_count")
+        else:
+            self._link_next = None
+            self._count = len(self._items) if self._items is not None else None
+
+    def get_page_items(self):
+        self._load_links()
+        return self._items
+
+    def fetch_next_page(self):
+        """Return True if a next page exists. Returns False otherwise.
+        Throws if the next page could not be fetched.
+        Items of the current page that were not consumed yet are skipped."""
+        self._load_links(keep_items=False)
+        if not self._link_next:
+            self._reached_the_end = True
+            return False
+
+        response = self._session.get(self._link_next, stream=True)
+        response.raise_for_status()
+        self._load(response)
+        self._reached_the_end = False
+        return True
+
+    def close(self):
+        super(StreamingResult, self).close()
+        response = getattr(self, "_response", None)
+        if response is not None:
+            response.close()
+
+    def get_count(self):
+        self._load_links()
+        return self._count
+
+    def get_next_link(self):
+        self._load_links()
+        return self._link_next
+
+    def get_self_link(self):
+        self._load_links()
+        return self._link_self
+
+    def get_first_link(self):
+        self._load_links()
+        return self._link_first
+
+    def get_cursor(self, current: bool = False) -> Cursor | None:
+        self._load_links()
+        return super(StreamingResult, self).get_cursor(current=current)
+
+    @classmethod
+    def from_link(
+        cls, session: requests.Session, link: str, item_class: Callable | None = None
+    ) -> "StreamingResult":
+        response = session.get(link, stream=True)
+        response.raise_for_status()
+        return cls(session, response, item_class)
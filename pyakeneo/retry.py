@@ -0,0 +1,114 @@
+import email.utils
+import random
+import threading
+from time import monotonic, sleep, time
+
+import requests
+
+
+class RetryPolicy:
+    """
+    Decides which requests are retried, and how long to wait before that.
+
+    Responses with a status in `statuses` are retried with an exponential
+    backoff with full jitter, unless the server tells how long to wait with
+    a Retry-After header. Only idempotent methods are retried after a
+    connection error or a 5XX, as the server may have processed them already.
+    A 429 means the request was rejected before being processed, so it is
+    retried whatever the method.
+    """
+
+    RETRY_STATUSES = frozenset({429, 502, 503, 504})
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"})
+
+    def __init__(
+        self,
+        max_retries: int = 5,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 60,
+        jitter: bool = True,
+        statuses=RETRY_STATUSES,
+        idempotent_methods=IDEMPOTENT_METHODS,
+        respect_retry_after: bool = True,
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.idempotent_methods = frozenset(idempotent_methods)
+        self.respect_retry_after = respect_retry_after
+
+    def should_retry_response(self, method: str, response, attempt: int) -> bool:
+        if attempt >= self.max_retries or response.status_code not in self.statuses:
+            return False
+        return response.status_code == 429 or method.upper() in self.idempotent_methods
+
+    def should_retry_error(self, method: str, error: Exception, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        return method.upper() in self.idempotent_methods and isinstance(
+            error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+        )
+
+    def backoff(self, attempt: int, response=None) -> float:
+        """Returns the number of seconds to wait before the given retry
+        (starting at 0)."""
+        if self.respect_retry_after and response is not None:
+            retry_after = self.parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        delay = min(self.max_backoff, self.backoff_factor * (2**attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    @staticmethod
+    def parse_retry_after(value):
+        """Returns the delay in seconds of a Retry-After header, or None."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, date.timestamp() - time())
+
+
+class RateLimiter:
+    """
+    Token bucket capping the rate of requests sent by a client, shared by
+    all its threads: up to `burst` requests at once, then `rate` per second.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        if rate <= 0:
+            raise ValueError("rate is expected to be positive, {0} provided".format(rate))
+        self._rate = float(rate)
+        self._capacity = float(burst or max(1, int(rate)))
+        self._tokens = self._capacity
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes a token, and returns how long to wait before it is available."""
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            sleep(delay)
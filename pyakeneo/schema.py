@@ -0,0 +1,302 @@
+"""
+In-memory snapshot of the catalog structure (attributes and their options,
+families and their variants, categories, channels and locales), indexed for
+the lookups made when validating or transforming product values.
+"""
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+from typing import Mapping
+
+import requests
+
+from pyakeneo.partitions import DATE_FORMAT
+from pyakeneo.utils import concurrent_map
+
+SELECT_TYPES = frozenset(["pim_catalog_simpleselect", "pim_catalog_multiselect"])
+
+_EMPTY = MappingProxyType({})
+
+
+def _freeze(items: Mapping) -> Mapping:
+    return MappingProxyType(dict(items))
+
+
+def _fetch_all(pool, search: dict | None = None) -> dict:
+    """Returns all the items of pool, by code"""
+    params = {"limit": 100}
+    if search:
+        params["search"] = search
+    return {item["code"]: item for item in pool.fetch_list(params)}
+
+
+class CatalogSchema(object):
+    """
+    Immutable snapshot of the catalog structure, see Client.load_schema.
+    Lookups are dict based and never hit the API. The mappings are read only,
+    but the items (as returned by the API) are shared: don't modify them.
+    Use refresh() to get an up to date snapshot.
+    """
+
+    __slots__ = (
+        "_attributes",
+        "_options",
+        "_families",
+        "_variants",
+        "_categories",
+        "_channels",
+        "_locales",
+        "_loaded_at",
+        "_family_attributes",
+        "_attributes_by_type",
+        "_category_children",
+    )
+
+    def __init__(
+        self,
+        attributes: Mapping[str, dict],
+        options: Mapping[str, Mapping[str, dict]],
+        families: Mapping[str, dict],
+        variants: Mapping[str, Mapping[str, dict]],
+        categories: Mapping[str, dict],
+        channels: Mapping[str, dict],
+        locales: Mapping[str, dict],
+        loaded_at: datetime,
+    ):
+        """options and variants are the attribute options by attribute, and
+        the family variants by family. loaded_at is the time the loading
+        started, which next refresh() picks up the changes from."""
+        self._attributes = _freeze(attributes)
+        self._options = _freeze(
+            {code: _freeze(items) for code, items in options.items()}
+        )
+        self._families = _freeze(families)
+        self._variants = _freeze(
+            {code: _freeze(items) for code, items in variants.items()}
+        )
+        self._categories = _freeze(categories)
+        self._channels = _freeze(channels)
+        self._locales = _freeze(locales)
+        self._loaded_at = loaded_at
+
+        self._family_attributes = _freeze(
+            {
+                code: frozenset(family.get("attributes") or ())
+                for code, family in self._families.items()
+            }
+        )
+        by_type = {}
+        for code, attribute in self._attributes.items():
+            by_type.setdefault(attribute.get("type"), set()).add(code)
+        self._attributes_by_type = _freeze(
+            {type_: frozenset(codes) for type_, codes in by_type.items()}
+        )
+        children = {}
+        for code, category in self._categories.items():
+            children.setdefault(category.get("parent"), []).append(code)
+        self._category_children = _freeze(
+            {parent: tuple(sorted(codes)) for parent, codes in children.items()}
+        )
+
+    def __setattr__(self, name, value):
+        if hasattr(self, "_category_children"):
+            raise AttributeError("CatalogSchema is immutable")
+        super(CatalogSchema, self).__setattr__(name, value)
+
+    def __repr__(self):
+        return (
+            "<CatalogSchema {0} attributes, {1} families, {2} categories, "
+            "loaded at {3}>".format(
+                len(self._attributes),
+                len(self._families),
+                len(self._categories),
+                self._loaded_at.isoformat(),
+            )
+        )
+
+    @property
+    def loaded_at(self) -> datetime:
+        return self._loaded_at
+
+    @property
+    def attributes(self) -> Mapping[str, dict]:
+        return self._attributes
+
+    @property
+    def families(self) -> Mapping[str, dict]:
+        return self._families
+
+    @property
+    def categories(self) -> Mapping[str, dict]:
+        return self._categories
+
+    @property
+    def channels(self) -> Mapping[str, dict]:
+        return self._channels
+
+    @property
+    def locales(self) -> Mapping[str, dict]:
+        return self._locales
+
+    def attribute(self, code: str) -> dict:
+        return self._attributes[code]
+
+    def attribute_type(self, code: str) -> str:
+        return self._attributes[code]["type"]
+
+    def attributes_of_type(self, type_: str) -> frozenset:
+        return self._attributes_by_type.get(type_, frozenset())
+
+    def options(self, attribute: str) -> Mapping[str, dict]:
+        """Returns the options of the attribute, by code. Only the options of
+        the simple and multi select attributes are loaded."""
+        return self._options.get(attribute, _EMPTY)
+
+    def has_option(self, attribute: str, option: str) -> bool:
+        return option in self.options(attribute)
+
+    def family(self, code: str) -> dict:
+        return self._families[code]
+
+    def family_attributes(self, family: str) -> frozenset:
+        return self._family_attributes[family]
+
+    def family_requirements(self, family: str, channel: str) -> frozenset:
+        """Returns the attributes required by the family on the channel"""
+        requirements = self._families[family].get("attribute_requirements") or {}
+        return frozenset(requirements.get(channel) or ())
+
+    def family_variants(self, family: str) -> Mapping[str, dict]:
+        return self._variants.get(family, _EMPTY)
+
+    def category(self, code: str) -> dict:
+        return self._categories[code]
+
+    def category_roots(self) -> tuple:
+        return self._category_children.get(None, ())
+
+    def category_children(self, code: str) -> tuple:
+        return self._category_children.get(code, ())
+
+    def category_ancestors(self, code: str) -> tuple:
+        """Returns the parents of the category, from its parent to the root"""
+        ancestors = []
+        parent = self._categories[code].get("parent")
+        while parent is not None:
+            ancestors.append(parent)
+            parent = self._categories[parent].get("parent")
+        return tuple(ancestors)
+
+    @property
+    def enabled_locales(self) -> frozenset:
+        return frozenset(
+            code for code, locale in self._locales.items() if locale.get("enabled")
+        )
+
+    @classmethod
+    def load(cls, client, max_workers: int = 8) -> "CatalogSchema":
+        """Downloads the catalog structure with up to max_workers requests
+        at once. See Client.load_schema."""
+        loaded_at = datetime.now(timezone.utc)
+        pools = {
+            "attributes": client.attributes,
+            "families": client.families,
+            "categories": client.categories,
+            "channels": client.channels,
+            "locales": client.locales,
+        }
+        loaded = cls._fetch_pools(pools, {}, max_workers)
+        options, variants = cls._fetch_nested(
+            client, loaded["attributes"], loaded["families"], max_workers
+        )
+        return cls(options=options, variants=variants, loaded_at=loaded_at, **loaded)
+
+    def refresh(
+        self, client, max_workers: int = 8, nested: bool = False
+    ) -> "CatalogSchema":
+        """
+        Returns a new snapshot, with the attributes, families and categories
+        updated since this one was loaded. Channels and locales, which are
+        few, are downloaded again.
+        The options of the updated attributes and the variants of the updated
+        families are downloaded again; with nested, the options and variants
+        of all of them are, since updating those does not update the
+        attribute or the family.
+        Deleted items are only noticed by a new load().
+        """
+        loaded_at = datetime.now(timezone.utc)
+        since = (self._loaded_at - timedelta(seconds=1)).strftime(DATE_FORMAT)
+        search = {"updated": [{"operator": ">", "value": since}]}
+        pools = {
+            "attributes": client.attributes,
+            "families": client.families,
+            "categories": client.categories,
+            "channels": client.channels,
+            "locales": client.locales,
+        }
+        searches = {"attributes": search, "families": search, "categories": search}
+        changes = self._fetch_pools(pools, searches, max_workers)
+
+        attributes = {**self._attributes, **changes["attributes"]}
+        families = {**self._families, **changes["families"]}
+        if nested:
+            updated_attributes, updated_families = attributes, families
+        else:
+            updated_attributes = changes["attributes"]
+            updated_families = changes["families"]
+        options, variants = self._fetch_nested(
+            client, updated_attributes, updated_families, max_workers
+        )
+        return self.__class__(
+            attributes=attributes,
+            options={**self._options, **options},
+            families=families,
+            variants={**self._variants, **variants},
+            categories={**self._categories, **changes["categories"]},
+            channels=changes["channels"],
+            locales=changes["locales"],
+            loaded_at=loaded_at,
+        )
+
+    @staticmethod
+    def _fetch_pools(pools: dict, searches: dict, max_workers: int) -> dict:
+        """Downloads the items of the pools by name. The items of a pool
+        rejecting the search of searches are all downloaded."""
+
+        def fetch(name):
+            search = searches.get(name)
+            try:
+                return _fetch_all(pools[name], search)
+            except requests.HTTPError as e:
+                if not search or e.response is None or e.response.status_code != 422:
+                    raise
+                return _fetch_all(pools[name])
+
+        return {
+            name: future.result()
+            for name, future in concurrent_map(fetch, pools, max_workers)
+        }
+
+    @staticmethod
+    def _fetch_nested(
+        client, attributes: Mapping, families: Mapping, max_workers: int
+    ) -> tuple[dict, dict]:
+        """Downloads the options of the select attributes, and the variants
+        of the families, at once"""
+        tasks = [
+            ("options", code)
+            for code, attribute in attributes.items()
+            if attribute.get("type") in SELECT_TYPES
+        ]
+        tasks += [("variants", code) for code in families]
+
+        def fetch(task):
+            kind, code = task
+            if kind == "options":
+                return _fetch_all(client.attributes.options(code))
+            return _fetch_all(client.families.variants(code))
+
+        nested = {"options": {}, "variants": {}}
+        for (kind, code), future in concurrent_map(fetch, tasks, max_workers):
+            nested[kind][code] = future.result()
+        return nested["options"], nested["variants"]
+
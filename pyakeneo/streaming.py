@@ -0,0 +1,165 @@
+"""
+Incremental parsing of listing pages, so that items are decoded one at a
+time while the response is being downloaded, instead of holding the raw
+page, its decoded text and all its items in memory at once.
+"""
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Dict, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader(object):
+    """Buffered reader of JSON tokens over chunks of bytes"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decoder_json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read_more(self, at_least: int = 1) -> bool:
+        """Appends chunks to the buffer until it grew by at_least
+        characters. Returns False if the end of the stream was reached."""
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        target = len(self._buffer) + at_least
+        while len(self._buffer) < target:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._buffer += self._decoder.decode(b"", final=True)
+                self._eof = True
+                return False
+            self._buffer += self._decoder.decode(chunk)
+        return True
+
+    def peek(self) -> str:
+        """Returns the next non-whitespace character, without consuming it.
+        Returns an empty string at the end of the stream."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise json.decoder.JSONDecodeError(
+                "Expecting {0!r}, found {1!r}".format(char, found), self._buffer, self._pos
+            )
+        self._pos += 1
+
+    def value(self):
+        """Decodes the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder_json.raw_decode(self._buffer, self._pos)
+            except json.decoder.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # a number might continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            # double the buffer, so that a long value is decoded in linear time
+            self._read_more(max(len(self._buffer) - self._pos, 1 << 16))
+
+    def string(self) -> str:
+        if self.peek() != '"':
+            self.expect('"')
+        return self.value()
+
+
+class PageStream(object):
+    """
+    Parses a listing page while it is being received. items() yields the
+    items of `_embedded.items` (or of a top-level list) one by one, and
+    fields holds the other top-level fields (eg `_links`) once the whole page
+    was parsed, see finish().
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._reader = _Reader(chunks)
+        self._fields = {}
+        self._items = self._parse()
+
+    @property
+    def fields(self) -> Dict:
+        return self._fields
+
+    def items(self) -> Iterator:
+        return self._items
+
+    def finish(self) -> Dict:
+        """Parses the rest of the page, skipping the items not consumed yet,
+        and returns the top-level fields."""
+        for _ in self._items:
+            pass
+        return self._fields
+
+    def _array(self):
+        reader = self._reader
+        reader.expect("[")
+        if reader.peek() == "]":
+            reader.expect("]")
+            return
+        while True:
+            yield reader.value()
+            if reader.peek() == ",":
+                reader.expect(",")
+            else:
+                reader.expect("]")
+                return
+
+    def _object(self, on_key):
+        """Iterates over the members of an object, on_key(key) either
+        returning an iterator of items (consuming the value) or None."""
+        reader = self._reader
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.expect("}")
+            return
+        while True:
+            key = reader.string()
+            reader.expect(":")
+            items = on_key(key)
+            if items is not None:
+                yield from items
+            if reader.peek() == ",":
+                reader.expect(",")
+            else:
+                reader.expect("}")
+                return
+
+    def _parse(self):
+        reader = self._reader
+        if reader.peek() == "[":
+            yield from self._array()
+        else:
+
+            def embedded_key(key):
+                if key == "items":
+                    return self._array()
+                embedded[key] = reader.value()
+
+            def top_key(key):
+                if key == "_embedded" and reader.peek() == "{":
+                    return self._object(embedded_key)
+                self._fields[key] = reader.value()
+
+            embedded = {}
+            yield from self._object(top_key)
+            if embedded:
+                self._fields["_embedded"] = embedded
+        if reader.peek() != "":
+            raise json.decoder.JSONDecodeError("Extra data", reader._buffer, reader._pos)
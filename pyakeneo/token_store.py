@@ -0,0 +1,106 @@
+import abc
+import contextlib
+import json
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+    import msvcrt
+
+
+class TokenStore(abc.ABC):
+    """
+    Keeps the tokens obtained by Auth so that they can be reused by other
+    Auth instances, processes or runs until they expire.
+    Tokens are dicts with access_token, refresh_token, expiry_date and
+    expires_in keys, stored under a key identifying the credentials.
+    """
+
+    @abc.abstractmethod
+    def load(self, key):
+        """Returns the token stored under key, or None."""
+        pass
+
+    @abc.abstractmethod
+    def save(self, key, token):
+        pass
+
+    def lock(self, key):
+        """Context manager held while a token is requested, so that a single
+        token request is made among the users of the store."""
+        return contextlib.nullcontext()
+
+
+class MemoryTokenStore(TokenStore):
+    """Shares tokens between the Auth instances of a process."""
+
+    def __init__(self):
+        self._tokens = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def load(self, key):
+        return self._tokens.get(key)
+
+    def save(self, key, token):
+        self._tokens[key] = dict(token)
+
+    def lock(self, key):
+        with self._guard:
+            return self._locks.setdefault(key, threading.RLock())
+
+
+class FileTokenStore(TokenStore):
+    """
+    Shares tokens between processes through a JSON file. A lock file next to
+    it makes sure only one process requests a token at a time.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._lock_path = path + ".lock"
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        with open(self._lock_path, "a+") as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:  # pragma: no cover
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:  # pragma: no cover
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read(self):
+        try:
+            with open(self._path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.decoder.JSONDecodeError):
+            return {}
+
+    def load(self, key):
+        return self._read().get(key)
+
+    def save(self, key, token):
+        tokens = self._read()
+        tokens[key] = dict(token)
+        directory = os.path.dirname(os.path.abspath(self._path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".pyakeneo-token-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(tokens, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -1,6 +1,9 @@
 import json
-from collections import namedtuple
-from typing import Any
+from collections import deque, namedtuple
+from collections.abc import Sequence
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator
 
 
 def urljoin(*args):
@@ -12,6 +15,16 @@ def urljoin(*args):
     return "/".join(map(lambda x: str(x).strip("/").rstrip("/"), args))
 
 
+# Record types built by json2object, by fields. Akeneo objects share a few
+# shapes (a product, a value, a link...), so that a small cache covers them.
+RECORD_TYPES_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=RECORD_TYPES_CACHE_SIZE)
+def _record_type(fields: tuple):
+    return namedtuple("X", fields, rename=False)
+
+
 def _json_object_hook(data):
     """https://stackoverflow.com/a/15882054"""
     try:
@@ -22,14 +35,106 @@ def _json_object_hook(data):
         data["embedded"] = data.pop("_embedded")
     except KeyError as e:
         pass
-    return namedtuple("X", data.keys(), rename=False)(*data.values())
+    return _record_type(tuple(data))(*data.values())
 
 
-def json2object(data):
-    """https://stackoverflow.com/a/15882054"""
+def json2object(data, lazy: bool = False):
+    """https://stackoverflow.com/a/15882054
+    With lazy, returns a LazyObject instead: objects are only wrapped when
+    they are accessed, which is cheaper when a few fields are read."""
+    if lazy:
+        return _wrap(json.loads(data))
     return json.loads(data, object_hook=_json_object_hook)
 
 
+def _wrap(value):
+    if isinstance(value, dict):
+        return LazyObject(value)
+    if isinstance(value, list):
+        return LazyList(value)
+    return value
+
+
+class LazyObject(object):
+    """
+    Attribute access to a decoded JSON object, as json2object records
+    (item.links.self.href), wrapping nested objects on access only.
+    """
+
+    __slots__ = ("_data",)
+
+    _RENAMED = {"links": "_links", "embedded": "_embedded"}
+
+    def __init__(self, data: dict):
+        self._data = data
+
+    def _key(self, name):
+        if name not in self._data and name in self._RENAMED:
+            return self._RENAMED[name]
+        return name
+
+    def __getattr__(self, name):
+        if name == "_data" or name.startswith("__"):
+            # eg looked up by copy and pickle before _data is set
+            raise AttributeError(name)
+        try:
+            return _wrap(self._data[self._key(name)])
+        except KeyError:
+            raise AttributeError(name)
+
+    def __getitem__(self, name):
+        return _wrap(self._data[self._key(name)])
+
+    def __contains__(self, name):
+        return self._key(name) in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyObject):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "LazyObject({0!r})".format(self._data)
+
+    def _asdict(self) -> dict:
+        return self._data
+
+
+class LazyList(Sequence):
+    """List of a LazyObject, wrapping its items on access"""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: list):
+        self._data = data
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyList(self._data[index])
+        return _wrap(self._data[index])
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyList):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "LazyList({0!r})".format(self._data)
+
+
 def serialize_structured_params(params: dict[str, Any]) -> dict[str, str]:
     result = {}
     for key, value in params.items():
@@ -39,3 +144,50 @@ def serialize_structured_params(params: dict[str, Any]) -> dict[str, str]:
             result[key] = json.dumps(value)
 
     return result
+
+
+def concurrent_map(
+    fn: Callable,
+    iterable: Iterable,
+    max_workers: int = 8,
+    ordered: bool = True,
+    max_pending: int | None = None,
+) -> Iterator:
+    """
+    Calls fn on every element of iterable over a pool of threads.
+    Yields (element, future) pairs once each future is done, in input order
+    if ordered is True, or as they complete otherwise. At most max_pending
+    calls (default: twice max_workers) are submitted ahead of the consumer,
+    so that the iterable is consumed lazily.
+    """
+    max_pending = max_pending or max_workers * 2
+    iterator = iter(iterable)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def fill():
+            while len(pending) < max_pending:
+                try:
+                    element = next(iterator)
+                except StopIteration:
+                    return
+                pending.append((element, executor.submit(fn, element)))
+
+        try:
+            fill()
+            while pending:
+                if ordered:
+                    element, future = pending.popleft()
+                    wait([future])
+                    yield element, future
+                else:
+                    done, _ = wait(
+                        [future for _, future in pending], return_when=FIRST_COMPLETED
+                    )
+                    for element, future in [p for p in pending if p[1] in done]:
+                        pending.remove((element, future))
+                        yield element, future
+                fill()
+        finally:
+            for _, future in pending:
+                future.cancel()
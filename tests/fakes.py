@@ -0,0 +1,76 @@
+import json
+import threading
+
+import requests
+
+from pyakeneo.codec import JSONCodec
+
+
+def make_response(status_code=200, body=None, headers=None, url=""):
+    """Builds a requests.Response as it would come back from the server."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = url
+    response.headers.update(headers or {})
+    if body is None:
+        body = b""
+    elif isinstance(body, (dict, list)):
+        body = json.dumps(body).encode("utf-8")
+    elif isinstance(body, str):
+        body = body.encode("utf-8")
+    response._content = body
+    response._content_consumed = True
+    response.encoding = "utf-8"
+    return response
+
+
+def make_page(base_url, items, page, last_page):
+    """Builds a paginated listing as returned by Akeneo."""
+    links = {
+        "self": {"href": "{0}?page={1}".format(base_url, page)},
+        "first": {"href": "{0}?page=1".format(base_url)},
+    }
+    if page < last_page:
+        links["next"] = {"href": "{0}?page={1}".format(base_url, page + 1)}
+    return {"_links": links, "current_page": page, "_embedded": {"items": items}}
+
+
+class FakeSession(requests.Session):
+    """
+    Session answering from a routing table instead of the network.
+    Routes map (method, url) to a response, a list of responses (served in
+    order) or a callable(method, url, **kwargs) returning a response.
+    Requests matching no route are answered by fallback, or with a 404.
+    """
+
+    def __init__(self, routes=None, fallback=None):
+        super(FakeSession, self).__init__()
+        self.routes = routes or {}
+        self.fallback = fallback
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self.calls.append((method.upper(), url, kwargs))
+            route = self.routes.get((method.upper(), url))
+            if isinstance(route, list):
+                route = route.pop(0) if len(route) > 1 else route[0]
+        if route is None:
+            route = self.fallback
+        if route is None:
+            return make_response(404, {"code": 404, "message": "Not found"}, url=url)
+        if callable(route):
+            return route(method.upper(), url, **kwargs)
+        return route
+
+
+class CountingCodec(JSONCodec):
+    """Codec counting the objects it encodes"""
+
+    def __init__(self):
+        self.dumped = 0
+
+    def dumps(self, obj) -> bytes:
+        self.dumped += 1
+        return super(CountingCodec, self).dumps(obj)
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import unittest
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+BASE_URL = "http://localhost:8080"
+
+
+def make_page(path, items, page, last_page):
+    url = BASE_URL + path
+    links = {
+        "self": {"href": "{0}?page={1}".format(url, page)},
+        "first": {"href": "{0}?page=1".format(url)},
+    }
+    if page < last_page:
+        links["next"] = {"href": "{0}?page={1}".format(url, page + 1)}
+    return {"_links": links, "current_page": page, "_embedded": {"items": items}}
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncClient(unittest.TestCase):
+    def setUp(self):
+        self.token_requests = 0
+
+    def handler(self, request):
+        if request.url.path == "/api/oauth/v1/token":
+            self.token_requests += 1
+            body = json.loads(request.content)
+            self.assertEqual(body["grant_type"], "password")
+            return httpx.Response(
+                200,
+                json={
+                    "access_token": "token",
+                    "refresh_token": "refresh",
+                    "expires_in": 3600,
+                },
+            )
+        self.assertEqual(request.headers["Authorization"], "Bearer token")
+        if request.url.path.startswith("/api/rest/v1/products/"):
+            identifier = request.url.path.rsplit("/", 1)[1]
+            if identifier == "missing":
+                return httpx.Response(404, json={"code": 404})
+            return httpx.Response(200, json={"identifier": identifier})
+        if request.url.path == "/api/rest/v1/families":
+            page = int(request.url.params.get("page", 1))
+            items = [{"code": "family_{0}_{1}".format(page, i)} for i in range(2)]
+            return httpx.Response(
+                200, json=make_page("/api/rest/v1/families", items, page, 3)
+            )
+        return httpx.Response(404)
+
+    def make_client(self):
+        from pyakeneo.async_auth import AsyncAuth
+        from pyakeneo.async_client import AsyncClient
+        from pyakeneo.auth import Auth
+
+        session = httpx.AsyncClient(
+            transport=httpx.MockTransport(self.handler),
+            auth=AsyncAuth(Auth(BASE_URL, "client_id", "secret", "admin", "admin")),
+        )
+        return AsyncClient(BASE_URL, session=session)
+
+    def test_fetch_items_concurrently_with_one_token_request(self):
+        async def run():
+            async with self.make_client() as akeneo:
+                return await asyncio.gather(
+                    *[akeneo.products.fetch_item(str(i)) for i in range(20)]
+                )
+
+        items = asyncio.run(run())
+        self.assertEqual([item["identifier"] for item in items], [str(i) for i in range(20)])
+        self.assertEqual(self.token_requests, 1)
+
+    def test_fetch_item_error(self):
+        async def run():
+            async with self.make_client() as akeneo:
+                await akeneo.products.fetch_item("missing")
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            asyncio.run(run())
+
+    def test_fetch_list_async_iteration(self):
+        async def run():
+            async with self.make_client() as akeneo:
+                result = await akeneo.families.fetch_list()
+                return [item["code"] async for item in result]
+
+        codes = asyncio.run(run())
+        self.assertEqual(len(codes), 6)
+        self.assertEqual(codes[0], "family_1_0")
+        self.assertEqual(codes[-1], "family_3_1")
+
+    def test_client_auth_invalid(self):
+        from pyakeneo.async_client import AsyncClient
+
+        with self.assertRaises(ValueError):
+            AsyncClient(BASE_URL, "secret")
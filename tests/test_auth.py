@@ -1,14 +1,17 @@
 import json
 import logging
+import threading
+import unittest
 
 import structlog
-from time import time
+from time import sleep, time
 
 import requests
 from vcr_unittest import VCRTestCase
 
 from pyakeneo.auth import Auth
 from pyakeneo.utils import urljoin
+from tests.fakes import FakeSession, make_response
 
 logger = structlog.getLogger()
 
@@ -64,3 +67,75 @@ class TestAuthIntegrationMock(VCRTestCase):
         )
         r = requests.get(urljoin(self.base_url, "/api/rest/v1/products"), auth=auth)
         json_data = json.loads(r.text)
+
+
+class TestAuthConcurrency(unittest.TestCase):
+    base_url = "http://localhost:8080"
+
+    def setUp(self):
+        self.grants = []
+
+        def token(method, url, data=None, **kwargs):
+            self.grants.append(json.loads(data)["grant_type"])
+            sleep(0.05)
+            return make_response(
+                200,
+                {
+                    "access_token": "token{0}".format(len(self.grants)),
+                    "refresh_token": "refresh",
+                    "expires_in": 3600,
+                },
+            )
+
+        self.auth = Auth(self.base_url, "client_id", "secret", "admin", "admin")
+        self.auth.session = FakeSession(
+            {("POST", urljoin(self.base_url, Auth.TOKEN_PATH)): token}
+        )
+
+    def authenticate(self):
+        return self.auth(requests.Request("GET", self.base_url).prepare())
+
+    def test_single_token_request_across_threads(self):
+        threads = [threading.Thread(target=self.authenticate) for _ in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.grants, ["password"])
+
+    def test_background_refresh_before_expiry(self):
+        self.authenticate()
+        self.auth._expiry_date = time() + Auth.TOKEN_BACKGROUND_REFRESH / 2
+
+        r = self.authenticate()
+
+        # the request did not wait for the new token
+        self.assertEqual(r.headers["Authorization"], "Bearer token1")
+        self.auth._refresh_thread.join(2)
+        self.assertEqual(self.grants, ["password", "refresh_token"])
+        self.assertEqual(self.authenticate().headers["Authorization"], "Bearer token2")
+        self.assertFalse(self.auth._should_refresh_in_background())
+
+    def test_failed_background_refresh_backs_off(self):
+        self.authenticate()
+        self.auth.session.routes = {}  # the token requests fail with a 404
+        self.auth._expiry_date = time() + Auth.TOKEN_BACKGROUND_REFRESH / 2
+
+        for _ in range(5):
+            r = self.authenticate()
+            self.auth._refresh_thread.join(2)
+
+        self.assertEqual(r.headers["Authorization"], "Bearer token1")
+        self.assertEqual(len(self.auth.session.calls), 2)
+        self.assertIsNotNone(self.auth._background_failed_at)
+        self.assertFalse(self.auth._should_refresh_in_background())
+
+        self.auth._background_failed_at -= Auth.TOKEN_BACKGROUND_RETRY
+        self.assertTrue(self.auth._should_refresh_in_background())
+
+    def test_synchronous_refresh_once_expired(self):
+        self.authenticate()
+        self.auth._expiry_date = time() - 1
+        r = self.authenticate()
+        self.assertEqual(r.headers["Authorization"], "Bearer token2")
+        self.assertEqual(self.grants, ["password", "refresh_token"])
@@ -0,0 +1,51 @@
+import json
+import unittest
+
+from pyakeneo.batching import BatchEncoder, ItemTooLargeError
+from pyakeneo.codec import JSONCodec
+from tests.fakes import CountingCodec
+
+
+class TestBatchEncoder(unittest.TestCase):
+    def test_batches_by_items(self):
+        codec = CountingCodec()
+        encoder = BatchEncoder(codec, max_items=3)
+        batches = list(encoder.batches({"code": str(i)} for i in range(7)))
+
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 1])
+        self.assertEqual(batches[0][0], b'{"code":"0"}\n')
+        self.assertEqual(codec.dumped, 7)
+
+    def test_batches_by_size(self):
+        # every line is 13 bytes long
+        encoder = BatchEncoder(max_items=100, max_batch_size=40)
+        batches = list(encoder.batches({"code": str(i)} for i in range(7)))
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 1])
+
+        # a line larger than max_batch_size still goes alone
+        encoder = BatchEncoder(max_batch_size=5)
+        self.assertEqual(len(list(encoder.batches([{"code": "a"}] * 2))), 2)
+
+    def test_too_large(self):
+        encoder = BatchEncoder(max_line_size=30, get_code=lambda item: item["code"])
+        item = {"code": "big", "label": "x" * 30}
+        with self.assertRaises(ItemTooLargeError) as error:
+            encoder.encode(item)
+        self.assertIsInstance(error.exception, ValueError)
+        self.assertEqual(error.exception.code, "big")
+        self.assertEqual(error.exception.size, 55)
+        self.assertIn("'big'", str(error.exception))
+
+        with self.assertRaises(ItemTooLargeError):
+            list(encoder.batches([{"code": "a"}, item]))
+
+    def test_size_in_characters(self):
+        class Utf8Codec(JSONCodec):
+            def dumps(self, obj) -> bytes:
+                return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+        encoder = BatchEncoder(Utf8Codec(), max_line_size=30)
+        # 21 characters, 31 bytes
+        self.assertEqual(len(encoder.encode({"a": "é" * 10 + "xx"})), 32)
+        with self.assertRaises(ItemTooLargeError):
+            encoder.encode({"a": "é" * 30})
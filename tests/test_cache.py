@@ -0,0 +1,139 @@
+import unittest
+from unittest import mock
+
+from pyakeneo.cache import ResponseCache
+from pyakeneo.resources import AttributesPool, FamiliesPool, ProductsPool
+from tests.fakes import FakeSession, make_page, make_response
+
+URL = "http://akeneo/api/rest/v1/families/"
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", b"1", {}, 60)
+        cache.put("b", b"2", {}, 60)
+        cache.get("a")
+        cache.put("c", b"3", {}, 60)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    def test_max_bytes(self):
+        cache = ResponseCache(max_bytes=10)
+        cache.put("a", b"12345", {}, 60)
+        cache.put("b", b"123456", {}, 60)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.size, 6)
+        cache.put("c", b"12345678901", {}, 60)
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(cache.size, 6)
+
+    def test_invalidate(self):
+        cache = ResponseCache()
+        cache.put(URL + "a", b"1", {}, 60)
+        cache.put(URL + "a/variants/v", b"2", {}, 60)
+        cache.put("http://akeneo/api/rest/v1/channels/", b"3", {}, 60)
+        cache.invalidate(URL)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_ttls(self):
+        cache = ResponseCache(ttl=10, ttls={"families": 3600})
+        self.assertEqual(cache.ttl_for("families"), 3600)
+        self.assertEqual(cache.ttl_for("channels"), 10)
+
+
+class TestCachedPools(unittest.TestCase):
+    def setUp(self):
+        self.session = FakeSession(
+            {
+                ("GET", URL + "shoes"): make_response(200, {"code": "shoes"}),
+                ("PATCH", URL + "shoes"): make_response(204),
+                ("GET", URL): make_response(200, make_page(URL, [{"code": "a"}], 1, 1)),
+            }
+        )
+        self.cache = ResponseCache()
+        self.pool = FamiliesPool(URL, self.session, cache=self.cache)
+
+    def get_calls(self):
+        return [call for call in self.session.calls if call[0] == "GET"]
+
+    def test_fetch_item_is_cached(self):
+        self.assertEqual(self.pool.fetch_item("shoes"), {"code": "shoes"})
+        self.assertEqual(self.pool.fetch_item("shoes"), {"code": "shoes"})
+        self.assertEqual(len(self.get_calls()), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_fetch_list_is_cached(self):
+        self.assertEqual(list(self.pool.fetch_list()), [{"code": "a"}])
+        self.assertEqual(list(self.pool.fetch_list()), [{"code": "a"}])
+        self.assertEqual(len(self.get_calls()), 1)
+        list(self.pool.fetch_list({"limit": 10}))
+        self.assertEqual(len(self.get_calls()), 2)
+
+    def test_stream_is_not_cached(self):
+        list(self.pool.fetch_list(stream=True))
+        list(self.pool.fetch_list(stream=True))
+        self.assertEqual(len(self.get_calls()), 2)
+
+    def test_write_invalidates(self):
+        self.pool.fetch_item("shoes")
+        self.pool.fetch_list()
+        self.pool.update_create_item({"code": "shoes", "labels": {}})
+        self.assertEqual(len(self.cache), 0)
+        self.pool.fetch_item("shoes")
+        self.assertEqual(len(self.get_calls()), 3)
+
+    def test_expired_entries(self):
+        cache = ResponseCache(ttls={"families": 60})
+        pool = FamiliesPool(URL, self.session, cache=cache)
+        with mock.patch("pyakeneo.cache.monotonic", return_value=0):
+            pool.fetch_item("shoes")
+        with mock.patch("pyakeneo.cache.monotonic", return_value=59):
+            pool.fetch_item("shoes")
+        self.assertEqual(len(self.get_calls()), 1)
+        with mock.patch("pyakeneo.cache.monotonic", return_value=61):
+            pool.fetch_item("shoes")
+        self.assertEqual(len(self.get_calls()), 2)
+
+    def test_revalidation(self):
+        def answer(method, url, headers=None, **kwargs):
+            if headers.get("If-None-Match") == '"v1"':
+                return make_response(304)
+            return make_response(200, {"code": "shoes"}, headers={"ETag": '"v1"'})
+
+        self.session.routes[("GET", URL + "shoes")] = answer
+        cache = ResponseCache(ttl=0)
+        pool = FamiliesPool(URL, self.session, cache=cache)
+        self.assertEqual(pool.fetch_item("shoes"), {"code": "shoes"})
+        self.assertEqual(pool.fetch_item("shoes"), {"code": "shoes"})
+        self.assertEqual(len(self.get_calls()), 2)
+        self.assertEqual(cache.revalidations, 1)
+
+    def test_sub_pools_share_the_cache(self):
+        url = "http://akeneo/api/rest/v1/attributes/"
+        options_url = url + "color/options/"
+        self.session.routes[("GET", options_url + "red")] = make_response(
+            200, {"code": "red"}
+        )
+        self.session.routes[("PATCH", url + "color")] = make_response(204)
+        pool = AttributesPool(url, self.session, cache=self.cache)
+        options = pool.options("color")
+        options.fetch_item("red")
+        options.fetch_item("red")
+        self.assertEqual(len(self.get_calls()), 1)
+        pool.update_create_item({"code": "color"})
+        self.assertEqual(len(self.cache), 0)
+
+    def test_products_are_not_cached(self):
+        url = "http://akeneo/api/rest/v1/products/"
+        self.session.routes[("GET", url + "sku")] = make_response(
+            200, {"identifier": "sku"}
+        )
+        pool = ProductsPool(url, self.session, cache=self.cache)
+        pool.fetch_item("sku")
+        pool.fetch_item("sku")
+        self.assertEqual(len(self.get_calls()), 2)
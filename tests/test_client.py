@@ -1,6 +1,7 @@
 import logging
 import structlog
 import sys
+import unittest
 
 from vcr_unittest import VCRTestCase
 
@@ -292,3 +293,48 @@ class TestClient(VCRTestCase):
         item = akeneo.products.fetch_item("1111111137")
 
     valid_product = """{"identifier":"myawesometshirt","enabled":true,"family":"clothing","categories":["master_men_blazers"],"groups":[],"parent":null,"values":{"collection":[{"data":["summer_2017"],"locale":null,"scope":null}],"color":[{"data":"white","locale":null,"scope":null}],"description":[{"data":"Biker jacket","locale":"en_US","scope":"ecommerce"}],"ean":[{"data":"1234567946367","locale":null,"scope":null}],"material":[{"data":"polyester","locale":null,"scope":null}],"name":[{"data":"Biker jacket","locale":null,"scope":null}],"price":[{"data":[{"amount":null,"currency":"EUR"},{"amount":null,"currency":"USD"}],"locale":null,"scope":null}],"size":[{"data":"xl","locale":null,"scope":null}],"variation_name":[{"data":"Biker jacket polyester","locale":"en_US","scope":null}]}}"""
+
+
+class TestClientConnections(unittest.TestCase):
+    base_url = "http://localhost:8080"
+
+    def test_connection_pools(self):
+        akeneo = Client(
+            self.base_url,
+            "client_id",
+            "secret",
+            "admin",
+            "admin",
+            pool_maxsize=32,
+            pool_block=True,
+            max_retries=3,
+        )
+        for session in (akeneo._session, akeneo._session.auth.session):
+            adapter = session.get_adapter(self.base_url)
+            self.assertEqual(adapter._pool_maxsize, 32)
+            self.assertTrue(adapter._pool_block)
+            self.assertEqual(adapter.max_retries.total, 3)
+            self.assertEqual(session.headers["Connection"], "keep-alive")
+
+    def test_compression(self):
+        akeneo = Client(
+            self.base_url,
+            "client_id",
+            "secret",
+            "admin",
+            "admin",
+            compress_requests=True,
+            accept_encoding="gzip",
+        )
+        adapter = akeneo._session.get_adapter(self.base_url)
+        self.assertTrue(adapter.compress_requests)
+        self.assertEqual(adapter.accept_encoding, "gzip")
+        adapter = akeneo._session.auth.session.get_adapter(self.base_url)
+        self.assertFalse(adapter.compress_requests)
+
+    def test_no_keep_alive(self):
+        akeneo = Client(
+            self.base_url, "client_id", "secret", "admin", "admin", keep_alive=False
+        )
+        self.assertEqual(akeneo._session.headers["Connection"], "close")
+        self.assertEqual(akeneo._session.auth.session.headers["Connection"], "close")
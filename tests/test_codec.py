@@ -0,0 +1,67 @@
+import unittest
+
+from pyakeneo.codec import DEFAULT_CODEC, JSONCodec, get_codec
+from pyakeneo.resources import ProductsPool
+from pyakeneo.result import Result
+from tests.fakes import FakeSession, make_response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class TestCodec(unittest.TestCase):
+    def test_get_codec(self):
+        self.assertIs(get_codec(), DEFAULT_CODEC)
+        codec = JSONCodec()
+        self.assertIs(get_codec(codec), codec)
+        self.assertIsInstance(get_codec("json"), JSONCodec)
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+    def test_json_round_trip(self):
+        codec = get_codec("json")
+        data = codec.dumps({"identifier": "é", "values": [1, 2.5, None]})
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(
+            data, b'{"identifier":"\\u00e9","values":[1,2.5,null]}'
+        )
+        self.assertEqual(codec.loads(data)["identifier"], "é")
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_orjson_round_trip(self):
+        codec = get_codec("orjson")
+        item = {"identifier": "é", "values": {"a": [1, 2.5, None]}}
+        self.assertEqual(codec.loads(codec.dumps(item)), item)
+        self.assertEqual(codec.loads(JSONCodec().dumps(item)), item)
+
+    def test_pool_uses_codec(self):
+        class RecordingCodec(JSONCodec):
+            def __init__(self):
+                self.calls = []
+
+            def dumps(self, obj):
+                self.calls.append("dumps")
+                return super().dumps(obj)
+
+            def loads(self, data):
+                self.calls.append("loads")
+                return super().loads(data)
+
+        codec = RecordingCodec()
+        url = "http://akeneo/api/rest/v1/products/"
+        session = FakeSession(
+            {
+                ("GET", url + "a"): make_response(200, {"identifier": "a"}),
+                ("POST", url): make_response(201),
+            }
+        )
+        pool = ProductsPool(url, session, codec=codec)
+        self.assertEqual(pool.fetch_item("a"), {"identifier": "a"})
+        pool.create_item({"identifier": "b"})
+        self.assertEqual(codec.calls, ["loads", "dumps"])
+
+    def test_result_from_bytes(self):
+        result = Result.from_json_text(None, b'[{"code": "x"}]', codec=JSONCodec())
+        self.assertEqual(result.get_page_items(), [{"code": "x"}])
@@ -1,4 +1,5 @@
 import copy
+import json
 import logging
 import structlog
 from vcr_unittest import VCRTestCase
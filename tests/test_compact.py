@@ -0,0 +1,134 @@
+import copy
+import pickle
+import unittest
+
+from pyakeneo.compact import CompactProduct, CompactProductModel
+from pyakeneo.resources import ProductModelsPool, ProductsPool
+from tests.fakes import CountingCodec, FakeSession, make_page, make_response
+
+BASE_URL = "http://localhost:8080/api/rest/v1"
+
+
+def make_product(identifier, **fields):
+    product = {
+        "identifier": identifier,
+        "enabled": True,
+        "family": "".join(["sho", "es"]),
+        "categories": ["men", "".join(["sho", "es"])],
+        "groups": [],
+        "values": {
+            "name": [{"locale": "en_US", "scope": None, "data": identifier}],
+            "price": [
+                {
+                    "locale": None,
+                    "scope": "ecommerce",
+                    "data": [{"amount": "10.00", "currency": "EUR"}],
+                }
+            ],
+        },
+    }
+    product.update(fields)
+    return product
+
+
+class TestCompactProduct(unittest.TestCase):
+    def test_round_trip(self):
+        data = make_product("sku", updated="2024-01-01T00:00:00+00:00", extra=1)
+        product = CompactProduct(data)
+        self.assertEqual(product.to_dict(), data)
+        self.assertEqual(product, data)
+        self.assertEqual(product.get_code(), "sku")
+
+    def test_dict_access(self):
+        product = CompactProduct(make_product("sku", extra=1))
+        self.assertEqual(product["family"], "shoes")
+        self.assertEqual(product["categories"], ("men", "shoes"))
+        self.assertEqual(product["extra"], 1)
+        self.assertEqual(product["values"]["name"][0]["data"], "sku")
+        # missing fields read as None, but are not part of the item
+        self.assertIsNone(product.parent)
+        self.assertIsNone(product.get("parent"))
+        with self.assertRaises(KeyError):
+            product["parent"]
+        self.assertNotIn("parent", product.to_dict())
+        with self.assertRaises(AttributeError):
+            product.unknown
+
+    def test_values_are_decoded_lazily(self):
+        product = CompactProduct(make_product("sku"))
+        self.assertIsNone(product._values)
+        self.assertIsInstance(product._encoded_values, bytes)
+        self.assertEqual(product.values["name"][0]["locale"], "en_US")
+        self.assertIsNone(product._encoded_values)
+        product.values = {}
+        self.assertEqual(product.to_dict()["values"], {})
+
+    def test_codes_are_interned(self):
+        first = CompactProduct(make_product("a"))
+        second = CompactProduct(make_product("b"))
+        self.assertIs(first.family, second.family)
+        self.assertIs(first.categories[1], second.categories[1])
+        first_keys = list(first.values)
+        second_keys = list(second.values)
+        self.assertIs(first_keys[0], second_keys[0])
+        self.assertIs(
+            first.values["name"][0]["locale"], second.values["name"][0]["locale"]
+        )
+
+    def test_copies(self):
+        data = make_product("sku", extra=1)
+        product = CompactProduct(data)
+        for copied in [copy.copy(product), pickle.loads(pickle.dumps(product))]:
+            self.assertEqual(copied.to_dict(), data)
+            self.assertNotIn("parent", copied.to_dict())
+            self.assertIs(copied.family, product.family)
+
+    def test_product_model(self):
+        data = {"code": "model", "family_variant": "by_size", "values": {}}
+        model = CompactProductModel(data)
+        self.assertEqual(model.get_code(), "model")
+        self.assertEqual(model.to_dict(), data)
+
+
+class TestFetchListItemClass(unittest.TestCase):
+    URL = BASE_URL + "/products"
+
+    def setUp(self):
+        pages = [
+            make_page(self.URL, [make_product("a"), make_product("b")], 1, 2),
+            make_page(self.URL, [make_product("c")], 2, 2),
+        ]
+
+        def answer(method, url, params=None, **kwargs):
+            page = 2 if url.endswith("page=2") else 1
+            return make_response(200, pages[page - 1])
+
+        self.pool = ProductsPool(self.URL, FakeSession(fallback=answer))
+
+    def test_fetch_list(self):
+        for options in [{}, {"prefetch": 2}, {"stream": True}]:
+            items = list(self.pool.fetch_list(item_class=CompactProduct, **options))
+            self.assertEqual([item.identifier for item in items], ["a", "b", "c"])
+            self.assertTrue(all(isinstance(i, CompactProduct) for i in items))
+
+    def test_codec_of_the_pool(self):
+        codec = CountingCodec()
+        self.pool = ProductsPool(self.URL, self.pool._session, codec=codec)
+        for options in [{}, {"stream": True}]:
+            items = list(self.pool.fetch_list(item_class=CompactProduct, **options))
+            self.assertTrue(all(item._codec is codec for item in items))
+
+    def test_other_item_classes(self):
+        items = list(self.pool.fetch_list(item_class=dict))
+        self.assertEqual([item["identifier"] for item in items], ["a", "b", "c"])
+        self.assertNotIn("codec", items[0])
+
+    def test_non_paginated(self):
+        session = FakeSession(
+            fallback=lambda *args, **kwargs: make_response(
+                200, [{"code": "model", "values": {}}]
+            )
+        )
+        pool = ProductModelsPool(BASE_URL + "/product-models", session)
+        result = pool.fetch_list(item_class=CompactProductModel)
+        self.assertEqual([item.code for item in result], ["model"])
@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import unittest
+
+from pyakeneo.client import Client
+from pyakeneo.export import Exporter, read_part
+from tests.fakes import FakeSession, make_page, make_response
+
+BASE_URL = "http://akeneo"
+API_URL = BASE_URL + "/api/rest/v1/"
+
+
+def listing(items, page_size=2):
+    """Routes serving items in pages of page_size, by page link"""
+    pages = [items[i : i + page_size] for i in range(0, len(items), page_size)]
+    pages = pages or [[]]
+
+    def answer(method, url, params=None, **kwargs):
+        page = int(url.rsplit("page=", 1)[1]) if "page=" in url else 1
+        body = make_page(url.split("?")[0], pages[page - 1], page, len(pages))
+        return make_response(200, body)
+
+    return answer
+
+
+class TestExporter(unittest.TestCase):
+    def setUp(self):
+        self.families = [{"code": "family_{0}".format(i)} for i in range(5)]
+        self.channels = [{"code": "ecommerce"}]
+        self.routes = {
+            "families": listing(self.families),
+            "channels": listing(self.channels),
+        }
+        self.session = FakeSession(fallback=self.route)
+        self.client = Client(BASE_URL, session=self.session)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def route(self, method, url, **kwargs):
+        resource = url[len(API_URL) :].split("?")[0]
+        return self.routes[resource](method, url, **kwargs)
+
+    def exporter(self, **kwargs):
+        kwargs.setdefault("resources", ["families", "channels"])
+        return Exporter(self.client, self.directory.name, **kwargs)
+
+    def test_export(self):
+        report = self.exporter(prefetch=0).run()
+
+        self.assertEqual(report.failed, [])
+        self.assertEqual(report.items, 6)
+        by_resource = report.by_resource()
+        self.assertEqual(by_resource["families"]["items"], 5)
+        self.assertEqual(by_resource["families"]["pages"], 3)
+        path = os.path.join(self.directory.name, "families", "part-0000.ndjson.gz")
+        self.assertEqual(list(read_part(path)), self.families)
+
+    def test_uncompressed(self):
+        self.exporter(compress=False).run()
+        path = os.path.join(self.directory.name, "channels", "part-0000.ndjson")
+        with open(path) as f:
+            self.assertEqual([json.loads(line) for line in f], self.channels)
+
+    def test_resume_after_failure(self):
+        serve = self.routes["families"]
+        failures = [make_response(500, {"message": "oops"})]
+
+        def failing(method, url, **kwargs):
+            if "page=3" in url and failures:
+                return failures.pop()
+            return serve(method, url, **kwargs)
+
+        self.routes["families"] = failing
+        report = self.exporter(prefetch=0).run()
+        self.assertEqual([part.resource for part in report.failed], ["families"])
+        self.assertEqual(report.by_resource()["families"]["items"], 4)
+
+        self.session.calls = []
+        report = self.exporter(prefetch=0).run()
+        self.assertEqual(report.failed, [])
+        # only the missing page was requested, the channels were done
+        self.assertEqual(
+            [call[1] for call in self.session.calls], [API_URL + "families?page=3"]
+        )
+        path = os.path.join(self.directory.name, "families", "part-0000.ndjson.gz")
+        self.assertEqual(list(read_part(path)), self.families)
+
+        report = self.exporter().run(resume=False)
+        self.assertEqual(report.items, 6)
+        self.assertEqual(list(read_part(path)), self.families)
+
+    def test_partitions(self):
+        searches = []
+        serve = self.routes["families"]
+
+        def record(method, url, params=None, **kwargs):
+            if params:
+                searches.append(json.loads(params["search"]))
+            return serve(method, url, params=params, **kwargs)
+
+        self.routes["families"] = record
+        partitions = [
+            {"code": [{"operator": "IN", "value": ["family_0"]}]},
+            {"code": [{"operator": "NOT IN", "value": ["family_0"]}]},
+        ]
+        exporter = self.exporter(
+            resources=["families"], partitions={"families": partitions}
+        )
+        report = exporter.run()
+        self.assertEqual(
+            [(part.resource, part.part) for part in report.parts],
+            [("families", 0), ("families", 1)],
+        )
+        self.assertEqual(
+            sorted(searches, key=json.dumps), sorted(partitions, key=json.dumps)
+        )
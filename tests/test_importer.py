@@ -0,0 +1,255 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from pyakeneo.client import Client
+from pyakeneo.importer import Importer, export_sources, read_items
+from pyakeneo.planner import DependencyError
+from tests.fakes import FakeSession, make_response
+
+BASE_URL = "http://akeneo"
+API_URL = BASE_URL + "/api/rest/v1/"
+
+
+class FakeBulkEndpoint(object):
+    """Answers bulk PATCH requests, recording the items of each of them.
+    Items with an invalid field are answered with a 422."""
+
+    def __init__(self):
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, method, url, data=None, **kwargs):
+        items = [json.loads(line) for line in data.split(b"\n") if line]
+        with self._lock:
+            self.requests.append((url[len(API_URL) :], items))
+        statuses = []
+        for line, item in enumerate(items, 1):
+            status = {"line": line, "code": item.get("code"), "status_code": 201}
+            if "invalid" in item:
+                status.update(status_code=422, message="Validation failed.")
+            statuses.append(json.dumps(status))
+        return make_response(200, "\n".join(statuses))
+
+
+class TestReadItems(unittest.TestCase):
+    def test_ndjson(self):
+        f = io.BytesIO(b'{"code": "a"}\n\n{"code": \n{"code": "b"}\n')
+        entries = list(read_items(f))
+        self.assertEqual(entries[0], ("<file>", 1, {"code": "a"}))
+        self.assertIsInstance(entries[1][2], ValueError)
+        self.assertEqual(entries[1][1], 3)
+        self.assertEqual(entries[2], ("<file>", 4, {"code": "b"}))
+
+    def test_csv(self):
+        f = io.BytesIO(
+            b"code,enabled,categories,parent\n"
+            b'a,true,"[""master""]",\n'
+            b"001,false,[],b\n"
+        )
+        self.assertEqual(
+            list(read_items(f, format="csv")),
+            [
+                ("<file>", 2, {"code": "a", "enabled": True, "categories": ["master"]}),
+                (
+                    "<file>",
+                    3,
+                    {"code": "001", "enabled": False, "categories": [], "parent": "b"},
+                ),
+            ],
+        )
+        self.assertFalse(f.closed)
+
+    def test_iterables_and_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "items.ndjson.gz")
+            with gzip.open(path, "wb") as f:
+                f.write(b'{"code": "b"}\n')
+            entries = list(read_items([[{"code": "a"}], path]))
+        self.assertEqual(
+            entries, [("<items>", 1, {"code": "a"}), (path, 1, {"code": "b"})]
+        )
+
+
+class TestImporter(unittest.TestCase):
+    def setUp(self):
+        self.endpoint = FakeBulkEndpoint()
+        self.client = Client(BASE_URL, session=FakeSession(fallback=self.endpoint))
+        self.log = io.StringIO()
+
+    def importer(self, **kwargs):
+        return Importer(self.client, log=self.log, **kwargs)
+
+    def logged(self):
+        return [json.loads(line) for line in self.log.getvalue().splitlines()]
+
+    def test_batches(self):
+        products = [{"identifier": "sku-{0}".format(i)} for i in range(250)]
+        products[42]["invalid"] = True
+        report = self.importer(max_workers=2).import_resource("products", products)
+
+        self.assertEqual(
+            [len(items) for _, items in self.endpoint.requests], [100, 100, 50]
+        )
+        self.assertEqual((report.lines, report.created, report.failed), (250, 249, 1))
+        logged = sorted(self.logged(), key=lambda entry: entry["line"])
+        self.assertEqual([entry["line"] for entry in logged], list(range(1, 251)))
+        self.assertEqual(
+            logged[42],
+            {
+                "resource": "products",
+                "source": "<items>",
+                "line": 43,
+                "code": "sku-42",
+                "status_code": 422,
+                "message": "Validation failed.",
+            },
+        )
+
+    def test_local_errors(self):
+        items = io.BytesIO(
+            b'{"code": "a"}\n'
+            b'"not an object"\n'
+            b'{"code": "b", "labels": {"en_US": "' + b"x" * 1000000 + b'"}}\n'
+        )
+        report = self.importer().import_resource("families", items)
+
+        self.assertEqual((report.lines, report.failed), (3, 2))
+        self.assertEqual(len(self.endpoint.requests), 1)
+        errors = [entry for entry in self.logged() if entry["status_code"] is None]
+        self.assertEqual([entry["line"] for entry in errors], [2, 3])
+        self.assertIn("ItemTooLargeError", errors[1]["message"])
+
+    def test_failed_batch(self):
+        self.client = Client(
+            BASE_URL, session=FakeSession(fallback=lambda *a, **k: make_response(500))
+        )
+        report = self.importer().import_resource("families", [{"code": "a"}] * 3)
+        self.assertEqual(report.failed, 3)
+        self.assertIn("500", self.logged()[0]["message"])
+
+    def test_unknown_resource(self):
+        with self.assertRaises(ValueError):
+            self.importer().import_resource("currencies", [])
+
+    def test_dependency_order(self):
+        report = self.importer().run(
+            {
+                "products": [{"identifier": "sku"}],
+                "families": [{"code": "shoes"}],
+                "attribute_options": [
+                    {"code": "red", "attribute": "color"},
+                    {"code": "s", "attribute": "size"},
+                    {"code": "blue", "attribute": "color"},
+                ],
+                "attributes": [{"code": "color"}, {"code": "size"}],
+                "family_variants": [{"code": "by_size", "family": "shoes"}],
+            },
+            max_resources=4,
+        )
+
+        urls = [url for url, _ in self.endpoint.requests]
+        self.assertEqual(len(urls), 6)
+        self.assertEqual(urls[0], "attributes")
+        self.assertEqual(urls[-1], "products")
+        self.assertLess(urls.index("families"), urls.index("families/shoes/variants"))
+        self.assertEqual(
+            sorted(urls[1:-1]),
+            [
+                "attributes/color/options",
+                "attributes/size/options",
+                "families",
+                "families/shoes/variants",
+            ],
+        )
+        items = dict(self.endpoint.requests)
+        self.assertEqual(
+            [item["code"] for item in items["attributes/color/options"]],
+            ["red", "blue"],
+        )
+        self.assertEqual(items["families/shoes/variants"], [{"code": "by_size"}])
+        self.assertEqual(
+            list(report.by_resource()),
+            # by level, in the order of the sources
+            [
+                "attributes",
+                "families",
+                "attribute_options",
+                "family_variants",
+                "products",
+            ],
+        )
+        self.assertEqual(report.lines, 8)
+        self.assertEqual(report.errors, {})
+
+    def test_failed_resource(self):
+        report = self.importer().run(
+            {
+                "attributes": "/nowhere/attributes.ndjson",
+                "products": [{"identifier": "sku"}],
+                "channels": [{"code": "ecommerce"}],
+            }
+        )
+
+        self.assertEqual(list(report.by_resource()), ["channels"])
+        self.assertIsInstance(report.errors["attributes"], FileNotFoundError)
+        self.assertIsInstance(report.errors["products"], DependencyError)
+
+    def test_parents_first(self):
+        categories = [
+            {"code": "men_shoes", "parent": "men"},
+            {"code": "men", "parent": "master"},
+            {"code": "women", "parent": "master"},
+            {"code": "master", "parent": None},
+            {"code": "orphan", "parent": "elsewhere"},
+        ]
+        self.importer().import_resource("categories", categories)
+
+        self.assertEqual(
+            [[item["code"] for item in items] for _, items in self.endpoint.requests],
+            [["master", "orphan"], ["men", "women"], ["men_shoes"]],
+        )
+
+    def test_parents_first_from_files(self):
+        categories = [
+            {"code": "men", "parent": "master"},
+            {"code": "master", "parent": None},
+        ]
+        data = b"".join(json.dumps(item).encode() + b"\n" for item in categories)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "categories.ndjson")
+            with open(path, "wb") as f:
+                f.write(data)
+            for source in [path, io.BytesIO(data), iter(categories)]:
+                self.endpoint.requests = []
+                report = self.importer().import_resource("categories", source)
+                requests = self.endpoint.requests
+                self.assertEqual(
+                    [[item["code"] for item in items] for _, items in requests],
+                    [["master"], ["men"]],
+                )
+                self.assertEqual(report.lines, 2)
+
+    def test_export_sources(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for resource, part in [("families", 0), ("products", 1), ("products", 0)]:
+                os.makedirs(os.path.join(directory, resource), exist_ok=True)
+                path = os.path.join(
+                    directory, resource, "part-{0:04d}.ndjson.gz".format(part)
+                )
+                with gzip.open(path, "wb") as f:
+                    f.write(b'{"identifier": "sku", "code": "shoes"}\n')
+            sources = export_sources(directory)
+            self.assertEqual(
+                {resource: len(paths) for resource, paths in sources.items()},
+                {"families": 1, "products": 2},
+            )
+            self.assertTrue(sources["products"][0].endswith("part-0000.ndjson.gz"))
+
+            report = self.importer().run(sources)
+        self.assertEqual(report.lines, 3)
+        self.assertEqual(report.failed, 0)
@@ -0,0 +1,223 @@
+import unittest
+from unittest import mock
+
+import requests
+from requests.adapters import HTTPAdapter
+from structlog.testing import capture_logs
+
+from pyakeneo.adapters import AkeneoAdapter
+from pyakeneo.auth import Auth
+from pyakeneo.instrumentation import (
+    Instrumentation,
+    Instrumentations,
+    StructlogInstrumentation,
+    pool_name,
+    url_template,
+)
+from pyakeneo.retry import RetryPolicy
+from tests.fakes import FakeSession, make_response
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover
+    prometheus_client = None
+
+API_URL = "http://localhost/api/rest/v1/"
+
+
+class Recorder(Instrumentation):
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, info):
+        self.events.append(("before", info.method, info.url_template))
+
+    def after_request(self, info):
+        self.events.append(
+            ("after", info.status, info.retries, type(info.error).__name__)
+        )
+        self.info = info
+
+    def on_retry(self, info, delay):
+        self.events.append(("retry", info.status, info.retries, delay))
+
+    def on_token(self, grant_type, latency, error):
+        self.events.append(("token", grant_type, type(error).__name__))
+
+
+class TestUrlTemplate(unittest.TestCase):
+    def test_templates(self):
+        cases = {
+            "products": "products",
+            "products/sku-1?with_count=true": "products/{code}",
+            "attributes/color/options/red": "attributes/{code}/options/{code}",
+            "media-files/a/b/c/d/x.jpg": "media-files/{code}",
+            "media-files/a/b/x.jpg/download": "media-files/{code}/download",
+        }
+        for path, template in cases.items():
+            self.assertEqual(url_template(API_URL + path), "/api/rest/v1/" + template)
+        self.assertEqual(pool_name(API_URL + "attributes/color/options"), "attributes")
+        self.assertEqual(pool_name("http://localhost/api/oauth/v1/token"), "oauth")
+
+
+class TestAdapterInstrumentation(unittest.TestCase):
+    def send(self, method, url, responses, data=None):
+        recorder = Recorder()
+        adapter = AkeneoAdapter(
+            retry_policy=RetryPolicy(backoff_factor=0),
+            instrumentation=Instrumentations([recorder]),
+        )
+        request = requests.Request(method, url, data=data).prepare()
+        with mock.patch.object(HTTPAdapter, "send", side_effect=responses):
+            try:
+                adapter.send(request)
+            except Exception:
+                pass
+        return recorder
+
+    def test_request_with_retries(self):
+        recorder = self.send(
+            "PATCH",
+            API_URL + "products/sku",
+            [
+                make_response(503),
+                make_response(204, headers={"Content-Length": "0"}),
+            ],
+            data=b'{"identifier": "sku"}',
+        )
+        self.assertEqual(
+            recorder.events,
+            [
+                ("before", "PATCH", "/api/rest/v1/products/{code}"),
+                ("retry", 503, 0, 0),
+                ("after", 204, 1, "NoneType"),
+            ],
+        )
+        info = recorder.info
+        self.assertEqual(info.pool, "products")
+        self.assertEqual(info.request_bytes, 21)
+        self.assertEqual(info.response_bytes, 0)
+        self.assertGreaterEqual(info.latency, 0)
+
+    def test_compressed_bytes(self):
+        recorder = Recorder()
+        adapter = AkeneoAdapter(
+            instrumentation=Instrumentations([recorder]), compress_requests=True
+        )
+        body = b'{"identifier": "sku"}\n' * 100
+        request = requests.Request("PATCH", API_URL + "products", data=body).prepare()
+        response = make_response(200, b"x" * 300, headers={"Content-Length": "40"})
+        with mock.patch.object(HTTPAdapter, "send", return_value=response):
+            adapter.send(request, stream=False)
+
+        info = recorder.info
+        self.assertEqual(info.request_decoded_bytes, len(body))
+        self.assertLess(info.request_bytes, len(body) / 10)
+        self.assertEqual(info.response_bytes, 40)
+        self.assertEqual(info.response_decoded_bytes, 300)
+
+    def test_failed_request(self):
+        recorder = self.send(
+            "POST", API_URL + "products", [requests.exceptions.ConnectionError()]
+        )
+        self.assertEqual(recorder.events[-1], ("after", None, 0, "ConnectionError"))
+
+    def test_retried_error_then_success(self):
+        recorder = self.send(
+            "GET",
+            API_URL + "products",
+            [requests.exceptions.ConnectionError(), make_response(200)],
+        )
+        self.assertEqual(recorder.events[-1], ("after", 200, 1, "NoneType"))
+        self.assertIsNone(recorder.info.error)
+
+    def test_hook_errors_are_ignored(self):
+        class Broken(Instrumentation):
+            def before_request(self, info):
+                raise RuntimeError()
+
+        recorder = Recorder()
+        instrumentations = Instrumentations.coerce([Broken(), recorder])
+        adapter = AkeneoAdapter(instrumentation=instrumentations)
+        request = requests.Request("GET", API_URL + "products").prepare()
+        with mock.patch.object(HTTPAdapter, "send", return_value=make_response(200)):
+            self.assertEqual(adapter.send(request).status_code, 200)
+        self.assertEqual(len(recorder.events), 2)
+
+
+class TestTokenInstrumentation(unittest.TestCase):
+    def test_token_events(self):
+        recorder = Recorder()
+        auth = Auth(
+            "http://localhost",
+            "id",
+            "secret",
+            "user",
+            "password",
+            background_refresh=False,
+            instrumentation=recorder,
+        )
+        auth.session = FakeSession(
+            {
+                ("POST", "http://localhost/api/oauth/v1/token"): [
+                    make_response(
+                        200,
+                        {"access_token": "a", "refresh_token": "r", "expires_in": 3600},
+                    ),
+                    make_response(400, {"message": "invalid"}),
+                ]
+            }
+        )
+        auth._request_a_token()
+        with self.assertRaises(requests.HTTPError):
+            auth._request_a_token("refresh_token")
+        self.assertEqual(
+            recorder.events,
+            [
+                ("token", "password", "NoneType"),
+                ("token", "refresh_token", "HTTPError"),
+            ],
+        )
+
+
+class TestStructlogInstrumentation(unittest.TestCase):
+    def test_logs(self):
+        instrumentation = StructlogInstrumentation()
+        recorder = Recorder()
+        adapter = AkeneoAdapter(
+            retry_policy=RetryPolicy(backoff_factor=0),
+            instrumentation=Instrumentations([instrumentation, recorder]),
+        )
+        request = requests.Request("GET", API_URL + "families/shoes").prepare()
+        responses = [make_response(429), make_response(200)]
+        with capture_logs() as logs:
+            with mock.patch.object(HTTPAdapter, "send", side_effect=responses):
+                adapter.send(request)
+        self.assertEqual(
+            [log["event"] for log in logs], ["akeneo.retry", "akeneo.request"]
+        )
+        self.assertEqual(logs[1]["url_template"], "/api/rest/v1/families/{code}")
+        self.assertEqual(logs[1]["status"], 200)
+        self.assertEqual(logs[1]["retries"], 1)
+
+
+@unittest.skipIf(prometheus_client is None, "prometheus_client is not installed")
+class TestPrometheusInstrumentation(unittest.TestCase):
+    def test_metrics(self):
+        from pyakeneo.instrumentation import PrometheusInstrumentation
+
+        registry = prometheus_client.CollectorRegistry()
+        instrumentation = PrometheusInstrumentation(registry=registry)
+        adapter = AkeneoAdapter(instrumentation=Instrumentations([instrumentation]))
+        request = requests.Request("GET", API_URL + "products/sku").prepare()
+        with mock.patch.object(HTTPAdapter, "send", return_value=make_response(200)):
+            adapter.send(request)
+        labels = {
+            "method": "GET",
+            "pool": "products",
+            "url_template": "/api/rest/v1/products/{code}",
+            "status": "200",
+        }
+        self.assertEqual(
+            registry.get_sample_value("pyakeneo_requests_total", labels), 1
+        )
@@ -0,0 +1,81 @@
+import threading
+import unittest
+
+from pyakeneo.planner import DependencyError, ResourcePlan
+
+
+class TestResourcePlan(unittest.TestCase):
+    def test_levels(self):
+        plan = ResourcePlan(
+            [
+                "products",
+                "families",
+                "attributes",
+                "categories",
+                "attribute_options",
+                "product_models",
+                "family_variants",
+                "attribute_groups",
+            ]
+        )
+        self.assertEqual(
+            plan.levels(),
+            [
+                ["categories", "attribute_groups"],
+                ["attributes"],
+                ["families", "attribute_options"],
+                ["family_variants"],
+                ["product_models"],
+                ["products"],
+            ],
+        )
+
+    def test_missing_resources_are_gone_through(self):
+        # families depend on the categories through the channels
+        plan = ResourcePlan(["families", "categories", "assets"])
+        self.assertEqual(plan.dependencies["families"], ("categories",))
+        self.assertEqual(plan.levels(), [["categories", "assets"], ["families"]])
+
+    def test_cycle(self):
+        plan = ResourcePlan(["a", "b"], {"a": ("b",), "b": ("a",)})
+        with self.assertRaises(ValueError):
+            plan.levels()
+
+    def test_run(self):
+        plan = ResourcePlan(["a", "b", "c", "d"], {"c": ("a",), "d": ("b",)})
+        b_done = threading.Event()
+        started = []
+
+        def sync(resource):
+            started.append(resource)
+            if resource == "b":
+                b_done.wait(5)
+            if resource == "c":
+                # c starts once a is done, while b is still running
+                b_done.set()
+            return resource.upper()
+
+        results = plan.run(sync, max_workers=2)
+
+        self.assertEqual(list(results), ["a", "b", "c", "d"])
+        self.assertEqual(
+            [result.result for result in results.values()], ["A", "B", "C", "D"]
+        )
+        self.assertLess(started.index("c"), started.index("d"))
+
+    def test_failures_skip_dependents(self):
+        plan = ResourcePlan(
+            ["a", "b", "c", "d"], {"b": ("a",), "c": ("b",), "d": ()}
+        )
+
+        def sync(resource):
+            if resource == "a":
+                raise RuntimeError("boom")
+            return resource
+
+        results = plan.run(sync)
+
+        self.assertIsInstance(results["a"].error, RuntimeError)
+        self.assertIsInstance(results["b"].error, DependencyError)
+        self.assertEqual(results["c"].error.dependency, "b")
+        self.assertEqual(results["d"].result, "d")
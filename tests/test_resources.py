@@ -0,0 +1,429 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import requests
+
+from pyakeneo import partitions as partitioning
+from pyakeneo.batching import ItemTooLargeError
+from pyakeneo.multipart import MultipartStream
+from pyakeneo.resources import (
+    FamiliesPool,
+    MediaFilesPool,
+    ProductModelsPool,
+    ProductsPool,
+)
+from tests.fakes import CountingCodec, FakeSession, make_response
+
+BASE_URL = "http://localhost:8080/api/rest/v1"
+
+
+class TestFetchItems(unittest.TestCase):
+    def test_fetch_items_reports_errors_in_order(self):
+        routes = {
+            ("GET", BASE_URL + "/families/" + code): make_response(200, {"code": code})
+            for code in ["a", "b", "d"]
+        }
+        pool = FamiliesPool(BASE_URL + "/families/", FakeSession(routes))
+
+        results = list(pool.fetch_items(["a", "b", "c", "d"], max_workers=3))
+
+        self.assertEqual([r.code for r in results], ["a", "b", "c", "d"])
+        self.assertEqual(results[0].item, {"code": "a"})
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[2].item)
+        self.assertIsInstance(results[2].error, requests.HTTPError)
+
+    def test_fetch_items_as_completed(self):
+        routes = {
+            ("GET", BASE_URL + "/families/" + str(i)): make_response(
+                200, {"code": str(i)}
+            )
+            for i in range(20)
+        }
+        pool = FamiliesPool(BASE_URL + "/families/", FakeSession(routes))
+        results = list(pool.fetch_items([str(i) for i in range(20)], ordered=False))
+        self.assertEqual(sorted(r.code for r in results), sorted(str(i) for i in range(20)))
+
+    def test_fetch_products_by_search_batches(self):
+        def search(method, url, params=None, **kwargs):
+            search = json.loads(params["search"])
+            identifiers = search["identifier"][0]["value"]
+            self.assertLessEqual(len(identifiers), 2)
+            items = [{"identifier": i} for i in identifiers if i != "missing"]
+            return make_response(
+                200,
+                {
+                    "_links": {
+                        "self": {"href": url},
+                        "first": {"href": url},
+                    },
+                    "_embedded": {"items": items},
+                },
+            )
+
+        session = FakeSession({("GET", BASE_URL + "/products/"): search})
+        pool = ProductsPool(BASE_URL + "/products/", session)
+
+        results = list(
+            pool.fetch_items(["p1", "missing", "p2", "p3", "p4"], batch_size=2)
+        )
+
+        self.assertEqual(len(session.calls), 3)
+        self.assertEqual([r.code for r in results], ["p1", "missing", "p2", "p3", "p4"])
+        self.assertEqual(results[0].item, {"identifier": "p1"})
+        self.assertIsInstance(results[1].error, KeyError)
+        self.assertEqual(results[4].item, {"identifier": "p4"})
+
+
+class TestUpdateCreateList(unittest.TestCase):
+    def patch(self, method, url, data=None, **kwargs):
+        lines = data.decode("utf-8").split("\n")[:-1]
+        if len(lines) > self.server_limit:
+            return make_response(413, {"code": 413})
+        statuses = [
+            json.dumps({"line": i + 1, "identifier": json.loads(line)["identifier"], "status_code": 201})
+            for i, line in enumerate(lines)
+        ]
+        return make_response(200, "\n".join(statuses))
+
+    def make_pool(self, server_limit=100):
+        self.server_limit = server_limit
+        self.session = FakeSession({("PATCH", BASE_URL + "/products/"): self.patch})
+        return ProductsPool(BASE_URL + "/products/", self.session)
+
+    def test_items_are_sent_by_chunks(self):
+        pool = self.make_pool()
+        items = [{"identifier": "p{0}".format(i)} for i in range(250)]
+
+        statuses = pool.update_create_list(items)
+
+        self.assertEqual(len(self.session.calls), 3)
+        self.assertEqual([s["identifier"] for s in statuses], [i["identifier"] for i in items])
+
+    def test_iter_update_create_list_accepts_generators(self):
+        pool = self.make_pool()
+        items = ({"identifier": "p{0}".format(i)} for i in range(1000))
+
+        statuses = pool.iter_update_create_list(items, max_workers=4)
+
+        self.assertEqual(next(statuses)["identifier"], "p0")
+        self.assertEqual(len(list(statuses)), 999)
+        self.assertEqual(len(self.session.calls), 10)
+
+    def test_chunks_are_split_on_413(self):
+        pool = self.make_pool(server_limit=30)
+        items = [{"identifier": "p{0}".format(i)} for i in range(100)]
+
+        statuses = pool.update_create_list(items)
+
+        self.assertEqual([s["identifier"] for s in statuses], [i["identifier"] for i in items])
+
+    def test_items_are_encoded_once(self):
+        codec = CountingCodec()
+        self.server_limit = 30
+        self.session = FakeSession({("PATCH", BASE_URL + "/products/"): self.patch})
+        pool = ProductsPool(BASE_URL + "/products/", self.session, codec=codec)
+        items = [{"identifier": "p{0}".format(i)} for i in range(100)]
+
+        pool.update_create_list(items)
+
+        self.assertGreater(len(self.session.calls), 4)
+        self.assertEqual(codec.dumped, 100)
+
+    def test_too_large_items_are_not_sent(self):
+        pool = self.make_pool()
+        items = [{"identifier": "p0"}, {"identifier": "p1", "x": "x" * 1000000}]
+
+        with self.assertRaises(ItemTooLargeError) as error:
+            pool.update_create_list(items)
+
+        self.assertEqual(error.exception.code, "p1")
+        self.assertEqual(self.session.calls, [])
+
+    def test_too_large_items_in_later_chunks_are_not_sent(self):
+        pool = self.make_pool()
+        items = [{"identifier": "p{0}".format(i)} for i in range(150)]
+        items.append({"identifier": "big", "x": "x" * 1000000})
+
+        with self.assertRaises(ItemTooLargeError) as error:
+            pool.update_create_list(items)
+
+        self.assertEqual(error.exception.code, "big")
+        self.assertEqual(self.session.calls, [])
+
+    def test_batches_are_packed_to_max_request_size(self):
+        pool = self.make_pool()
+        pool.MAX_REQUEST_SIZE = 100
+        items = [{"identifier": "p{0}".format(i)} for i in range(20)]
+
+        statuses = pool.update_create_list(items)
+
+        self.assertEqual(len(statuses), 20)
+        # lines are 20 bytes long, 21 from p10
+        self.assertEqual(len(self.session.calls), 5)
+        self.assertTrue(all(len(c[2]["data"]) <= 100 for c in self.session.calls))
+
+
+class TestScanParallel(unittest.TestCase):
+    def setUp(self):
+        self.products = [
+            {"identifier": "p{0:03d}".format(i), "family": "f{0}".format(i % 4)}
+            for i in range(95)
+        ]
+
+    def search(self, method, url, params=None, **kwargs):
+        search = json.loads(params["search"])
+        families = search["family"][0]["value"]
+        items = [p for p in self.products if p["family"] in families]
+        after = params.get("search_after", "")
+        items = [p for p in items if p["identifier"] > after][:10]
+        links = {"self": {"href": url}, "first": {"href": url}}
+        if len(items) == 10:
+            next_params = dict(params, search_after=items[-1]["identifier"])
+            links["next"] = {"href": url + "?" + urlencode(next_params)}
+        return make_response(200, {"_links": links, "_embedded": {"items": items}})
+
+    def route(self, method, url, params=None, **kwargs):
+        if params is None:
+            query = urlparse(url)
+            params = {k: v[0] for k, v in parse_qs(query.query).items()}
+            url = url.split("?")[0]
+        return self.search(method, url, params=params)
+
+    def test_partitions_are_merged(self):
+        session = FakeSession(fallback=self.route)
+        pool = ProductsPool(BASE_URL + "/products", session)
+
+        items = list(
+            pool.scan_parallel(
+                partitioning.by_family(["f0", "f1", "f2", "f3"], 4),
+                search={"enabled": [{"operator": "=", "value": True}]},
+            )
+        )
+
+        self.assertEqual(
+            sorted(item["identifier"] for item in items),
+            [p["identifier"] for p in self.products],
+        )
+
+    def test_errors_are_raised(self):
+        session = FakeSession()
+        pool = ProductsPool(BASE_URL + "/products", session)
+        with self.assertRaises(requests.HTTPError):
+            list(pool.scan_parallel(partitioning.by_family(["f0", "f1"], 2)))
+
+    def test_aware_dates_in_utc(self):
+        searches = []
+
+        def search(method, url, params=None, **kwargs):
+            searches.append(json.loads(params["search"]))
+            links = {"self": {"href": url}, "first": {"href": url}}
+            return make_response(200, {"_links": links, "_embedded": {"items": []}})
+
+        pool = ProductsPool(BASE_URL + "/products", FakeSession(fallback=search))
+        paris = timezone(timedelta(hours=2))
+        since = datetime(2023, 1, 1, 2, tzinfo=paris)
+        self.assertEqual(list(pool.scan_parallel(4, since=since)), [])
+
+        until = datetime(2023, 1, 3, 2, tzinfo=paris)
+        list(pool.scan_parallel(2, since=since, until=until))
+        self.assertCountEqual(
+            searches[-2:],
+            [
+                {"updated": [{"operator": "<", "value": "2023-01-02 00:00:00"}]},
+                {"updated": [{"operator": ">", "value": "2023-01-01 23:59:59"}]},
+            ],
+        )
+
+    def test_by_updated(self):
+        partitions = partitioning.by_updated(
+            datetime(2023, 1, 1), datetime(2023, 1, 4), 3
+        )
+        self.assertEqual(
+            partitions,
+            [
+                {"updated": [{"operator": "<", "value": "2023-01-02 00:00:00"}]},
+                {
+                    "updated": [
+                        {"operator": ">", "value": "2023-01-01 23:59:59"},
+                        {"operator": "<", "value": "2023-01-03 00:00:00"},
+                    ]
+                },
+                {"updated": [{"operator": ">", "value": "2023-01-02 23:59:59"}]},
+            ],
+        )
+        self.assertEqual(partitioning.by_updated(datetime(2023, 1, 1), datetime(2023, 1, 4), 1), [{}])
+
+
+class TestChangesSince(unittest.TestCase):
+    def test_changes_since_checkpoint(self):
+        def search(method, url, params=None, **kwargs):
+            self.params = params
+            items = [{"identifier": "p1"}, {"identifier": "p2"}, {"identifier": "p1"}]
+            links = {"self": {"href": url}, "first": {"href": url}}
+            return make_response(200, {"_links": links, "_embedded": {"items": items}})
+
+        pool = ProductsPool(
+            BASE_URL + "/products/",
+            FakeSession({("GET", BASE_URL + "/products/"): search}),
+        )
+
+        changes = pool.changes_since(
+            "2023-05-01 10:00:00",
+            search={"enabled": [{"operator": "=", "value": True}]},
+        )
+
+        self.assertEqual([item["identifier"] for item in changes], ["p1", "p2"])
+        self.assertEqual(changes.count, 2)
+        self.assertEqual(
+            json.loads(self.params["search"]),
+            {
+                "enabled": [{"operator": "=", "value": True}],
+                "updated": [{"operator": ">", "value": "2023-05-01 09:59:59"}],
+            },
+        )
+        self.assertEqual(self.params["pagination_type"], "search_after")
+        self.assertGreater(
+            datetime.strptime(changes.checkpoint, "%Y-%m-%d %H:%M:%S"),
+            datetime(2023, 5, 1, 10),
+        )
+
+    def test_aware_checkpoint_in_utc(self):
+        def search(method, url, params=None, **kwargs):
+            self.params = params
+            links = {"self": {"href": url}, "first": {"href": url}}
+            return make_response(200, {"_links": links, "_embedded": {"items": []}})
+
+        pool = ProductsPool(
+            BASE_URL + "/products/",
+            FakeSession({("GET", BASE_URL + "/products/"): search}),
+        )
+        paris = timezone(timedelta(hours=2))
+        list(pool.changes_since(datetime(2023, 5, 1, 12, tzinfo=paris)))
+        self.assertEqual(
+            json.loads(self.params["search"]),
+            {"updated": [{"operator": ">", "value": "2023-05-01 09:59:59"}]},
+        )
+
+    def test_product_models(self):
+        def search(method, url, params=None, **kwargs):
+            items = [{"code": "m1"}, {"code": "m2"}, {"code": "m1"}]
+            links = {"self": {"href": url}, "first": {"href": url}}
+            return make_response(200, {"_links": links, "_embedded": {"items": items}})
+
+        pool = ProductModelsPool(
+            BASE_URL + "/product-models/",
+            FakeSession({("GET", BASE_URL + "/product-models/"): search}),
+        )
+        changes = pool.changes_since("2023-05-01 10:00:00")
+        self.assertEqual([item["code"] for item in changes], ["m1", "m2"])
+
+    def test_first_run_fetches_everything(self):
+        def search(method, url, params=None, **kwargs):
+            self.params = params
+            links = {"self": {"href": url}, "first": {"href": url}}
+            return make_response(200, {"_links": links, "_embedded": {"items": []}})
+
+        pool = ProductsPool(
+            BASE_URL + "/products/",
+            FakeSession({("GET", BASE_URL + "/products/"): search}),
+        )
+        self.assertEqual(list(pool.changes_since(None)), [])
+        self.assertNotIn("search", self.params)
+
+
+class TestMediaFiles(unittest.TestCase):
+    URL = BASE_URL + "/media-files/"
+    CODE = "a/b/c/d/abc_image.jpg"
+
+    def setUp(self):
+        self.content = os.urandom(200 * 1024)
+        self.session = FakeSession(
+            {
+                ("GET", self.URL + self.CODE + "/download"): make_response(
+                    200, self.content
+                )
+            }
+        )
+        self.pool = MediaFilesPool(self.URL, self.session)
+
+    def test_download_to_file_object(self):
+        dest = io.BytesIO()
+        self.assertEqual(self.pool.download(self.CODE, dest), len(self.content))
+        self.assertEqual(dest.getvalue(), self.content)
+        self.assertTrue(self.session.calls[0][2]["stream"])
+
+    def test_download_to_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "image.jpg")
+            self.pool.download(self.CODE, path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), self.content)
+            self.assertEqual(os.listdir(directory), ["image.jpg"])
+
+            with self.assertRaises(requests.HTTPError):
+                self.pool.download("missing.jpg", os.path.join(directory, "x"))
+            self.assertEqual(os.listdir(directory), ["image.jpg"])
+
+    def test_download_many(self):
+        with tempfile.TemporaryDirectory() as directory:
+            results = {
+                r.code: r
+                for r in self.pool.download_many(
+                    [self.CODE, "missing.jpg", "../outside.jpg"], directory
+                )
+            }
+            path = os.path.join(directory, self.CODE)
+            self.assertEqual(results[self.CODE].item, path)
+            self.assertTrue(os.path.exists(path))
+            self.assertIsInstance(results["missing.jpg"].error, requests.HTTPError)
+            self.assertIsInstance(results["../outside.jpg"].error, ValueError)
+
+            list(self.pool.download_many([self.CODE], directory, skip_existing=True))
+            self.assertEqual(len(self.session.calls), 2)
+
+    def test_upload(self):
+        sent = {}
+
+        def create(method, url, data=None, headers=None, **kwargs):
+            sent["request"] = requests.Request(
+                method, url, data=data, headers=headers
+            ).prepare()
+            sent["body"] = data.read(1000)
+            sent["body"] += data.read()
+            return make_response(
+                201, headers={"Location": self.URL + "1/2/3/4/abc_image.jpg"}
+            )
+
+        self.session.routes[("POST", self.URL)] = create
+        product = {"identifier": "sku", "attribute": "picture"}
+        code = self.pool.upload(
+            io.BytesIO(self.content), product=product, filename="image.jpg"
+        )
+
+        self.assertEqual(code, "1/2/3/4/abc_image.jpg")
+        request, body = sent["request"], sent["body"]
+        self.assertEqual(int(request.headers["Content-Length"]), len(body))
+        self.assertNotIn("Transfer-Encoding", request.headers)
+        boundary = request.headers["Content-Type"].split("boundary=")[1]
+        self.assertIn(b'name="product"\r\n\r\n{"identifier":"sku"', body)
+        self.assertIn(b'filename="image.jpg"\r\nContent-Type: image/jpeg', body)
+        self.assertIn(self.content, body)
+        self.assertTrue(body.endswith("--{0}--\r\n".format(boundary).encode()))
+
+        with self.assertRaises(ValueError):
+            self.pool.upload(io.BytesIO(b""))
+
+    def test_multipart_stream_reads_from_file_position(self):
+        f = io.BytesIO(b"skipped content")
+        f.seek(8)
+        body = MultipartStream([("file", ("a.txt", f, "text/plain"))])
+        data = body.read()
+        self.assertEqual(len(data), len(body))
+        self.assertIn(b"\r\n\r\ncontent\r\n", data)
+        self.assertEqual(body.read(), b"")
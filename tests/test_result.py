@@ -0,0 +1,104 @@
+import threading
+import unittest
+
+import requests
+
+from pyakeneo.result import Cursor, Result
+from tests.fakes import FakeSession, make_page, make_response
+
+BASE_URL = "http://localhost:8080/api/rest/v1/families"
+
+
+def make_session(pages, page_size=3):
+    routes = {}
+    for page in range(1, pages + 1):
+        items = [
+            {"code": "family_{0}_{1}".format(page, i)} for i in range(page_size)
+        ]
+        routes[("GET", "{0}?page={1}".format(BASE_URL, page))] = make_response(
+            200, make_page(BASE_URL, items, page, pages)
+        )
+    return FakeSession(routes)
+
+
+class TestResultPrefetch(unittest.TestCase):
+    def first_page(self, session, prefetch):
+        response = session.get("{0}?page=1".format(BASE_URL))
+        return Result.from_json_text(session, response.text, prefetch=prefetch)
+
+    def test_prefetch_yields_all_items_in_order(self):
+        expected = [item["code"] for item in self.first_page(make_session(5), 0)]
+        result = self.first_page(make_session(5), 2)
+        self.assertEqual([item["code"] for item in result], expected)
+        self.assertEqual(len(expected), 15)
+
+    def test_prefetch_downloads_next_page_in_background(self):
+        session = make_session(3)
+        fetched = threading.Event()
+        route = session.routes[("GET", "{0}?page=2".format(BASE_URL))]
+
+        def answer(method, url, **kwargs):
+            fetched.set()
+            return route
+
+        session.routes[("GET", "{0}?page=2".format(BASE_URL))] = answer
+        result = self.first_page(session, 1)
+        self.assertTrue(fetched.wait(2))
+        self.assertEqual(result.get_self_link(), "{0}?page=1".format(BASE_URL))
+        result.close()
+
+    def test_prefetch_raises_on_error_page(self):
+        session = make_session(3)
+        session.routes[("GET", "{0}?page=3".format(BASE_URL))] = make_response(500)
+        result = self.first_page(session, 2)
+        items = []
+        with self.assertRaises(requests.HTTPError):
+            for item in result:
+                items.append(item)
+        self.assertEqual(len(items), 6)
+
+    def test_error_page_is_not_the_end(self):
+        session = make_session(3)
+        session.routes[("GET", "{0}?page=2".format(BASE_URL))] = make_response(503)
+        result = self.first_page(session, 0)
+        with self.assertRaises(requests.HTTPError):
+            result.fetch_next_page()
+
+
+class TestCursor(unittest.TestCase):
+    def test_resume_from_cursor(self):
+        session = make_session(4)
+        response = session.get("{0}?page=1".format(BASE_URL))
+        result = Result.from_json_text(session, response.text)
+        self.assertTrue(result.fetch_next_page())
+
+        saved = result.get_cursor().to_json()
+
+        resumed = Result.from_cursor(make_session(4), Cursor.from_json(saved))
+        self.assertEqual(
+            [item["code"] for item in resumed][0], "family_3_0"
+        )
+        self.assertIsNone(resumed.get_cursor())
+        self.assertEqual(resumed.get_cursor(current=True).page, 4)
+
+    def test_cursor_params(self):
+        cursor = Cursor(
+            BASE_URL
+            + "?pagination_type=search_after&limit=10&search_after=qaXbcde%3D%3D"
+        )
+        self.assertEqual(cursor.search_after, "qaXbcde==")
+        self.assertEqual(cursor.params["limit"], "10")
+        self.assertIsNone(cursor.page)
+        self.assertEqual(Cursor.coerce(cursor.to_dict()), cursor)
+        self.assertEqual(Cursor.coerce(cursor.link), cursor)
+        with self.assertRaises(ValueError):
+            Cursor("")
+
+    def test_fetch_list_resume_from(self):
+        from pyakeneo.resources import FamiliesPool
+
+        pool = FamiliesPool(BASE_URL + "/", make_session(3))
+        result = pool.fetch_list(
+            {"limit": 3}, resume_from="{0}?page=2".format(BASE_URL)
+        )
+        self.assertEqual(len(list(result)), 6)
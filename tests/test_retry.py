@@ -0,0 +1,145 @@
+import gzip
+import unittest
+from time import monotonic
+from unittest import mock
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pyakeneo.adapters import AkeneoAdapter
+from pyakeneo.retry import RateLimiter, RetryPolicy
+from tests.fakes import make_response
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_idempotency(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.should_retry_response("GET", make_response(503), 0))
+        self.assertTrue(policy.should_retry_response("PATCH", make_response(502), 0))
+        self.assertFalse(policy.should_retry_response("POST", make_response(503), 0))
+        self.assertTrue(policy.should_retry_response("POST", make_response(429), 0))
+        self.assertFalse(policy.should_retry_response("GET", make_response(404), 0))
+        self.assertFalse(policy.should_retry_response("GET", make_response(503), 5))
+        error = requests.exceptions.ConnectionError()
+        self.assertTrue(policy.should_retry_error("GET", error, 0))
+        self.assertFalse(policy.should_retry_error("POST", error, 0))
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=10, jitter=False)
+        self.assertEqual(policy.backoff(0), 1)
+        self.assertEqual(policy.backoff(3), 8)
+        self.assertEqual(policy.backoff(10), 10)
+        self.assertEqual(
+            policy.backoff(0, make_response(429, headers={"Retry-After": "7"})), 7
+        )
+        jittered = RetryPolicy(backoff_factor=1)
+        self.assertTrue(all(0 <= jittered.backoff(2) <= 4 for _ in range(20)))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(RetryPolicy.parse_retry_after("3"), 3)
+        self.assertIsNone(RetryPolicy.parse_retry_after(None))
+        self.assertIsNone(RetryPolicy.parse_retry_after("soon"))
+        self.assertEqual(
+            RetryPolicy.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0
+        )
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_rate(self):
+        limiter = RateLimiter(rate=50, burst=5)
+        start = monotonic()
+        for _ in range(15):
+            limiter.acquire()
+        # 5 requests at once, then 10 at 50 per second
+        self.assertGreaterEqual(monotonic() - start, 0.18)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            RateLimiter(rate=0)
+
+
+class TestAkeneoAdapter(unittest.TestCase):
+    def send(self, method, responses, policy=None):
+        adapter = AkeneoAdapter(
+            retry_policy=policy or RetryPolicy(backoff_factor=0)
+        )
+        request = requests.Request(method, "http://localhost/api").prepare()
+        with mock.patch.object(HTTPAdapter, "send", side_effect=responses) as send:
+            try:
+                return adapter.send(request), send.call_count
+            except Exception as e:
+                return e, send.call_count
+
+    def test_retries_until_success(self):
+        response, calls = self.send(
+            "GET", [make_response(503), make_response(429), make_response(200)]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(calls, 3)
+
+    def test_gives_up_after_max_retries(self):
+        response, calls = self.send(
+            "GET",
+            [make_response(503)] * 3,
+            RetryPolicy(max_retries=2, backoff_factor=0),
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(calls, 3)
+
+    def test_post_is_not_retried_on_server_error(self):
+        response, calls = self.send("POST", [make_response(503), make_response(201)])
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(calls, 1)
+
+    def test_connection_errors(self):
+        error = requests.exceptions.ConnectionError()
+        response, calls = self.send("GET", [error, make_response(200)])
+        self.assertEqual(response.status_code, 200)
+        result, calls = self.send("POST", [error, make_response(201)])
+        self.assertIs(result, error)
+        self.assertEqual(calls, 1)
+
+
+class TestRequestCompression(unittest.TestCase):
+    BODY = b'{"identifier":"sku"}\n' * 100
+
+    def send(self, adapter, method, body, responses):
+        request = requests.Request(
+            method, "http://localhost/api", data=body, headers={"X": "1"}
+        ).prepare()
+        with mock.patch.object(HTTPAdapter, "send", side_effect=responses) as send:
+            response = adapter.send(request)
+        return response, [call.args[0] for call in send.call_args_list]
+
+    def test_large_bodies_are_compressed(self):
+        adapter = AkeneoAdapter(compress_requests=True)
+        _, sent = self.send(adapter, "PATCH", self.BODY, [make_response(200)])
+
+        self.assertEqual(sent[0].headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(sent[0].body), self.BODY)
+        self.assertEqual(sent[0].headers["Content-Length"], str(len(sent[0].body)))
+
+    def test_small_bodies_and_reads_are_not_compressed(self):
+        adapter = AkeneoAdapter(compress_requests=True)
+        for method, body in [("PATCH", b"{}"), ("GET", None)]:
+            _, sent = self.send(adapter, method, body, [make_response(200)])
+            self.assertNotIn("Content-Encoding", sent[0].headers)
+        adapter = AkeneoAdapter()
+        _, sent = self.send(adapter, "PATCH", self.BODY, [make_response(200)])
+        self.assertEqual(sent[0].body, self.BODY)
+
+    def test_falls_back_when_unsupported(self):
+        adapter = AkeneoAdapter(compress_requests=True)
+        response, sent = self.send(
+            adapter, "PATCH", self.BODY, [make_response(415), make_response(200)]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sent[1].body, self.BODY)
+        self.assertNotIn("Content-Encoding", sent[1].headers)
+        self.assertFalse(adapter.compress_requests)
+
+    def test_accept_encoding(self):
+        adapter = AkeneoAdapter(accept_encoding="identity")
+        _, sent = self.send(adapter, "GET", None, [make_response(200)])
+        self.assertEqual(sent[0].headers["Accept-Encoding"], "identity")
@@ -0,0 +1,127 @@
+import json
+import unittest
+from datetime import datetime, timezone
+
+from pyakeneo.client import Client
+from pyakeneo.schema import CatalogSchema
+from tests.fakes import FakeSession, make_page, make_response
+
+BASE_URL = "http://akeneo"
+API_URL = BASE_URL + "/api/rest/v1/"
+
+ATTRIBUTES = [
+    {"code": "sku", "type": "pim_catalog_identifier"},
+    {"code": "name", "type": "pim_catalog_text"},
+    {"code": "color", "type": "pim_catalog_simpleselect"},
+]
+FAMILIES = [
+    {
+        "code": "shoes",
+        "attributes": ["sku", "name", "color"],
+        "attribute_requirements": {"ecommerce": ["sku", "name"]},
+    }
+]
+CATEGORIES = [
+    {"code": "master", "parent": None},
+    {"code": "men", "parent": "master"},
+    {"code": "men_shoes", "parent": "men"},
+]
+
+
+class Catalog(object):
+    """Answers the listings of the catalog structure, recording their search"""
+
+    def __init__(self):
+        self.listings = {
+            "attributes/": ATTRIBUTES,
+            "families/": FAMILIES,
+            "categories/": CATEGORIES,
+            "channels/": [{"code": "ecommerce"}],
+            "locales/": [
+                {"code": "en_US", "enabled": True},
+                {"code": "fr_FR", "enabled": False},
+            ],
+            "attributes/color/options/": [{"code": "red"}, {"code": "blue"}],
+            "families/shoes/variants/": [{"code": "shoes_by_size"}],
+        }
+        self.searches = []
+
+    def __call__(self, method, url, params=None, **kwargs):
+        path = url[len(API_URL):] + "/"
+        if params and "search" in params:
+            self.searches.append((path, json.loads(params["search"])))
+        if path not in self.listings:
+            return make_response(404, {"code": 404, "message": "Not found"})
+        return make_response(200, make_page(url, self.listings[path], 1, 1))
+
+
+class TestCatalogSchema(unittest.TestCase):
+    def setUp(self):
+        self.catalog = Catalog()
+        self.session = FakeSession(fallback=self.catalog)
+        self.client = Client(BASE_URL, session=self.session)
+
+    def test_load(self):
+        schema = self.client.load_schema(max_workers=4)
+        self.assertEqual(schema.attribute_type("color"), "pim_catalog_simpleselect")
+        self.assertEqual(schema.attributes_of_type("pim_catalog_text"), {"name"})
+        self.assertEqual(set(schema.options("color")), {"red", "blue"})
+        self.assertTrue(schema.has_option("color", "red"))
+        self.assertFalse(schema.has_option("name", "red"))
+        self.assertEqual(schema.family_attributes("shoes"), {"sku", "name", "color"})
+        self.assertEqual(
+            schema.family_requirements("shoes", "ecommerce"), {"sku", "name"}
+        )
+        self.assertEqual(set(schema.family_variants("shoes")), {"shoes_by_size"})
+        self.assertEqual(schema.category_roots(), ("master",))
+        self.assertEqual(schema.category_children("master"), ("men",))
+        self.assertEqual(schema.category_ancestors("men_shoes"), ("men", "master"))
+        self.assertEqual(schema.enabled_locales, {"en_US"})
+        self.assertEqual(set(schema.channels), {"ecommerce"})
+        # 5 listings, options of the only select attribute, variants of the family
+        self.assertEqual(len(self.session.calls), 7)
+
+    def test_immutable(self):
+        schema = self.client.load_schema()
+        with self.assertRaises(TypeError):
+            schema.attributes["new"] = {}
+        with self.assertRaises(AttributeError):
+            schema._attributes = {}
+
+    def test_refresh(self):
+        schema = CatalogSchema.load(self.client)
+        schema = CatalogSchema(
+            attributes=schema.attributes,
+            options={"color": schema.options("color")},
+            families=schema.families,
+            variants={"shoes": schema.family_variants("shoes")},
+            categories=schema.categories,
+            channels=schema.channels,
+            locales=schema.locales,
+            loaded_at=datetime(2024, 5, 1, 10, 0, 0, tzinfo=timezone.utc),
+        )
+        self.catalog.listings["attributes/"] = [
+            {"code": "size", "type": "pim_catalog_simpleselect"}
+        ]
+        self.catalog.listings["attributes/size/options/"] = [{"code": "42"}]
+        self.catalog.listings["families/"] = []
+        self.catalog.listings["categories/"] = []
+        self.session.calls = []
+
+        refreshed = schema.refresh(self.client)
+
+        # the listings are made concurrently
+        self.assertCountEqual(
+            self.catalog.searches,
+            [
+                (path, {"updated": [{"operator": ">", "value": "2024-05-01 09:59:59"}]})
+                for path in ["attributes/", "families/", "categories/"]
+            ],
+        )
+        self.assertEqual(set(refreshed.attributes), {"sku", "name", "color", "size"})
+        self.assertEqual(set(refreshed.options("size")), {"42"})
+        self.assertEqual(set(refreshed.options("color")), {"red", "blue"})
+        self.assertEqual(set(refreshed.family_variants("shoes")), {"shoes_by_size"})
+        self.assertGreater(refreshed.loaded_at, schema.loaded_at)
+        # 5 listings and the options of the updated attribute
+        self.assertEqual(len(self.session.calls), 6)
@@ -0,0 +1,80 @@
+import json
+import unittest
+
+from pyakeneo.resources import FamiliesPool
+from pyakeneo.result import StreamingResult
+from pyakeneo.streaming import PageStream
+from tests.fakes import FakeSession, make_page, make_response
+from tests import test_collection
+
+BASE_URL = "http://localhost:8080/api/rest/v1/families"
+
+
+def chunked(data, size):
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+class TestPageStream(unittest.TestCase):
+    def test_items_and_fields(self):
+        data = test_collection.TestCollectionMock.json_text.encode("utf-8")
+        expected = json.loads(data)
+        for size in (1, 3, 1000, len(data)):
+            stream = PageStream(chunked(data, size))
+            self.assertEqual(list(stream.items()), expected["_embedded"]["items"])
+            self.assertEqual(stream.finish()["_links"], expected["_links"])
+            self.assertEqual(stream.fields["current_page"], 1)
+
+    def test_links_first(self):
+        page = make_page(BASE_URL, [{"code": "a"}, {"code": "b", "n": 12345}], 1, 2)
+        page["items_count"] = 2
+        stream = PageStream(chunked(json.dumps(page, indent=2).encode("utf-8"), 4))
+        self.assertEqual(list(stream.items()), page["_embedded"]["items"])
+        self.assertEqual(stream.fields["items_count"], 2)
+
+    def test_finish_skips_items(self):
+        page = make_page(BASE_URL, [{"code": str(i)} for i in range(10)], 1, 1)
+        stream = PageStream(chunked(json.dumps(page).encode("utf-8"), 16))
+        next(stream.items())
+        self.assertEqual(stream.finish()["_links"], page["_links"])
+
+    def test_top_level_list(self):
+        stream = PageStream([b'[{"code": "a"},', b' {"code": "b"}]'])
+        self.assertEqual([item["code"] for item in stream.items()], ["a", "b"])
+
+    def test_invalid_json(self):
+        with self.assertRaises(json.decoder.JSONDecodeError):
+            list(PageStream([b'{"_embedded": {"items": [{"code"']).items())
+
+
+class TestStreamingResult(unittest.TestCase):
+    def make_pool(self, pages=3):
+        routes = {}
+        for page in range(1, pages + 1):
+            items = [{"code": "{0}_{1}".format(page, i)} for i in range(4)]
+            response = make_response(200, make_page(BASE_URL, items, page, pages))
+            routes[("GET", "{0}?page={1}".format(BASE_URL, page))] = response
+        routes[("GET", BASE_URL)] = routes[("GET", "{0}?page=1".format(BASE_URL))]
+        return FamiliesPool(BASE_URL, FakeSession(routes))
+
+    def test_iterate_streamed_pages(self):
+        result = self.make_pool().fetch_list(stream=True)
+        self.assertIsInstance(result, StreamingResult)
+        codes = [item["code"] for item in result]
+        self.assertEqual(len(codes), 12)
+        self.assertEqual(codes[4], "2_0")
+
+    def test_links_load_the_page(self):
+        result = self.make_pool().fetch_list(stream=True)
+        self.assertEqual(result.get_next_link(), "{0}?page=2".format(BASE_URL))
+        self.assertEqual(len(result.get_page_items()), 4)
+        self.assertEqual(len(list(result)), 12)
+
+    def test_fetch_next_page_skips_current_items(self):
+        result = self.make_pool().fetch_list(stream=True)
+        self.assertTrue(result.fetch_next_page())
+        self.assertEqual(result.get_page_items()[0]["code"], "2_0")
+        self.assertEqual(result.get_cursor().page, 3)
+
+    def test_stream_and_prefetch(self):
+        with self.assertRaises(ValueError):
+            self.make_pool().fetch_list(stream=True, prefetch=1)
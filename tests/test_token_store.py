@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+from time import time
+
+import requests
+
+from pyakeneo.auth import Auth
+from pyakeneo.token_store import FileTokenStore, MemoryTokenStore
+from pyakeneo.utils import urljoin
+from tests.fakes import FakeSession, make_response
+
+
+class TestTokenStore(unittest.TestCase):
+    base_url = "http://localhost:8080"
+
+    def setUp(self):
+        self.grants = []
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "tokens.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def token(self, method, url, data=None, **kwargs):
+        self.grants.append(json.loads(data)["grant_type"])
+        return make_response(
+            200,
+            {
+                "access_token": "token{0}".format(len(self.grants)),
+                "refresh_token": "refresh",
+                "expires_in": 3600,
+            },
+        )
+
+    def make_auth(self, store, username="admin"):
+        auth = Auth(
+            self.base_url, "client_id", "secret", username, "admin", token_store=store
+        )
+        auth.session = FakeSession(
+            {("POST", urljoin(self.base_url, Auth.TOKEN_PATH)): self.token}
+        )
+        return auth
+
+    def authenticate(self, auth):
+        r = auth(requests.Request("GET", self.base_url).prepare())
+        return r.headers["Authorization"]
+
+    def test_file_store_shares_token(self):
+        first = self.make_auth(FileTokenStore(self.path))
+        self.assertEqual(self.authenticate(first), "Bearer token1")
+
+        # eg another process, or the next run of a cron job
+        second = self.make_auth(FileTokenStore(self.path))
+        self.assertEqual(self.authenticate(second), "Bearer token1")
+        self.assertEqual(self.grants, ["password"])
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_expired_stored_token_is_refreshed_and_saved(self):
+        first = self.make_auth(FileTokenStore(self.path))
+        self.authenticate(first)
+        first._expiry_date = time() - 1
+        first._save_stored_token()
+
+        second = self.make_auth(FileTokenStore(self.path))
+        self.assertEqual(self.authenticate(second), "Bearer token2")
+        self.assertEqual(self.grants, ["password", "refresh_token"])
+
+        third = self.make_auth(FileTokenStore(self.path))
+        self.assertEqual(self.authenticate(third), "Bearer token2")
+        self.assertEqual(len(self.grants), 2)
+
+    def test_tokens_are_stored_per_user(self):
+        store = MemoryTokenStore()
+        self.authenticate(self.make_auth(store))
+        self.authenticate(self.make_auth(store))
+        self.authenticate(self.make_auth(store, username="other"))
+        self.assertEqual(self.grants, ["password", "password"])
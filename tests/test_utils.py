@@ -1,4 +1,6 @@
+import copy
 import logging
+import pickle
 import structlog
 import unittest
 
@@ -25,3 +27,59 @@ class TestUtils(unittest.TestCase):
             pyakeneo.utils.urljoin("http://a.com/", "/b/", "c", "d"),
             "http://a.com/b/c/d",
         )
+
+    def test_concurrent_map(self):
+        results = list(
+            pyakeneo.utils.concurrent_map(lambda x: x * 2, range(50), max_workers=4)
+        )
+        self.assertEqual([element for element, _ in results], list(range(50)))
+        self.assertEqual([future.result() for _, future in results], list(range(0, 100, 2)))
+
+    def test_concurrent_map_reports_exceptions(self):
+        def fail_on_odd(x):
+            if x % 2:
+                raise ValueError(x)
+            return x
+
+        results = dict(
+            pyakeneo.utils.concurrent_map(fail_on_odd, range(10), ordered=False)
+        )
+        self.assertEqual(sorted(results), list(range(10)))
+        self.assertIsInstance(results[3].exception(), ValueError)
+        self.assertEqual(results[4].result(), 4)
+
+    def test_json2object_reuses_record_types(self):
+        page = (
+            '{"_links": {"self": {"href": "a"}}, "_embedded": {"items": '
+            '[{"identifier": "a", "family": "f"}, {"identifier": "b", "family": "f"}]}}'
+        )
+        result = pyakeneo.utils.json2object(page)
+        first, second = result.embedded.items
+        self.assertEqual((first.identifier, second.identifier), ("a", "b"))
+        self.assertEqual(result.links.self.href, "a")
+        self.assertIs(type(first), type(second))
+        again = pyakeneo.utils.json2object(page).embedded.items[0]
+        self.assertIs(type(first), type(again))
+        self.assertLessEqual(
+            pyakeneo.utils._record_type.cache_info().currsize,
+            pyakeneo.utils.RECORD_TYPES_CACHE_SIZE,
+        )
+
+    def test_json2object_lazy(self):
+        page = '{"_links": {"self": {"href": "a"}}, "items": [{"identifier": "a"}]}'
+        result = pyakeneo.utils.json2object(page, lazy=True)
+        self.assertEqual(result.links.self.href, "a")
+        self.assertEqual(result.items[0].identifier, "a")
+        self.assertEqual(result["items"][0]["identifier"], "a")
+        self.assertEqual(len(result.items), 1)
+        self.assertIn("links", result)
+        with self.assertRaises(AttributeError):
+            result.missing
+        self.assertEqual(result.items, [{"identifier": "a"}])
+
+    def test_json2object_lazy_copy(self):
+        page = '{"items": [{"identifier": "a"}]}'
+        result = pyakeneo.utils.json2object(page, lazy=True)
+        for copied in [copy.copy(result), pickle.loads(pickle.dumps(result))]:
+            self.assertEqual(copied, result)
+            self.assertEqual(copied.items[0].identifier, "a")